@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Airtime-Scheduler-Modul für das Meshtastic ↔ Telegram Gateway
+Schätzt die Sendezeit jeder Nachricht anhand des Modem-Presets und begrenzt
+die ausgehende Last über ein Token-Bucket-Budget (Duty-Cycle).
+Befehlsantworten und private Nachrichten haben Vorrang vor Gruppen-Nachrichten.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+
+import file_logger
+
+# Prioritäten (kleinere Zahl = höhere Priorität)
+PRIORITY_COMMAND = 0    # Antworten auf !help, !btc, !secret ...
+PRIORITY_PRIVATE = 1    # Private Chat-Nachrichten an eine Node
+PRIORITY_BROADCAST = 2  # Gruppen-Nachrichten an den Kanal
+
+PRIORITY_NAMES = {
+    PRIORITY_COMMAND: "command",
+    PRIORITY_PRIVATE: "private",
+    PRIORITY_BROADCAST: "broadcast",
+}
+
+# Modem-Presets: Name -> (Spreading Factor, Bandbreite in Hz, Coding-Rate-Nenner)
+MODEM_PRESETS = {
+    'SHORT_TURBO': (7, 500000, 5),
+    'SHORT_FAST': (7, 250000, 5),
+    'SHORT_SLOW': (8, 250000, 5),
+    'MEDIUM_FAST': (9, 250000, 5),
+    'MEDIUM_SLOW': (10, 250000, 5),
+    'LONG_FAST': (11, 250000, 5),
+    'LONG_MODERATE': (11, 125000, 8),
+    'LONG_SLOW': (12, 125000, 8),
+    'VERY_LONG_SLOW': (12, 62500, 8),
+}
+
+DEFAULT_PRESET = 'LONG_FAST'
+PREAMBLE_SYMBOLS = 16      # Meshtastic verwendet eine Präambel von 16 Symbolen
+MESH_PACKET_OVERHEAD = 20  # Meshtastic-Header (16 Bytes) + Protobuf-Rahmen
+
+
+def estimate_airtime(payload_bytes, preset=DEFAULT_PRESET):
+    """Berechnet die LoRa-Sendezeit in Sekunden (Semtech-Formel, expliziter Header, CRC an)"""
+    sf, bandwidth, cr_denominator = MODEM_PRESETS.get(preset, MODEM_PRESETS[DEFAULT_PRESET])
+    symbol_time = (2 ** sf) / bandwidth
+    low_data_rate = 1 if symbol_time > 0.016 else 0
+    coding_rate = cr_denominator - 4
+
+    preamble_time = (PREAMBLE_SYMBOLS + 4.25) * symbol_time
+    numerator = 8 * payload_bytes - 4 * sf + 28 + 16
+    denominator = 4 * (sf - 2 * low_data_rate)
+    payload_symbols = 8 + max(math.ceil(numerator / denominator) * (coding_rate + 4), 0)
+    return preamble_time + payload_symbols * symbol_time
+
+
+def estimate_message_airtime(text, preset=DEFAULT_PRESET):
+    """Schätzt die Sendezeit einer Textnachricht inklusive Paket-Overhead"""
+    return estimate_airtime(len(text.encode('utf-8')) + MESH_PACKET_OVERHEAD, preset)
+
+
+class _OutboundJob:
+    """Eintrag in der Sende-Warteschlange"""
+    __slots__ = ('priority', 'seq', 'text', 'destination_id', 'airtime', 'future', 'enqueued', 'cancelled', 'trace')
+
+    def __init__(self, priority, seq, text, destination_id, airtime, future, trace=None):
+        self.priority = priority
+        self.seq = seq
+        self.text = text
+        self.destination_id = destination_id
+        self.airtime = airtime
+        self.future = future
+        self.enqueued = time.monotonic()
+        self.cancelled = False
+        self.trace = trace  # Optionaler Trace (tracing.Trace) der Nachricht
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AirtimeScheduler:
+    """Priorisierte Sende-Warteschlange mit Token-Bucket-Budget für die Sendezeit"""
+
+    def __init__(self, send_func, preset=DEFAULT_PRESET, duty_cycle_percent=10,
+                 burst_seconds=15, max_queue_size=200):
+        self._send_func = send_func
+        self.preset = preset if preset in MODEM_PRESETS else DEFAULT_PRESET
+        self.refill_rate = max(duty_cycle_percent, 0.1) / 100.0  # Sekunden Airtime pro Sekunde
+        self.capacity = max(float(burst_seconds), 0.1)
+        self.max_queue_size = max_queue_size
+
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._heap = []
+        self._depth = {p: 0 for p in PRIORITY_NAMES}
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._task = None
+
+        self.airtime_sent = 0.0
+        self.messages_sent = 0
+        self.messages_dropped = 0
+
+    def set_preset(self, preset):
+        """Setzt das Modem-Preset (z.B. nach dem Auslesen vom Gerät)"""
+        if preset in MODEM_PRESETS and preset != self.preset:
+            file_logger.log_info(f"Airtime-Scheduler verwendet Modem-Preset {preset}")
+            self.preset = preset
+
+    def set_budget(self, duty_cycle_percent, burst_seconds):
+        """Übernimmt ein neues Airtime-Budget (Konfiguration neu geladen)"""
+        self._refill()
+        self.refill_rate = max(duty_cycle_percent, 0.1) / 100.0
+        self.capacity = max(float(burst_seconds), 0.1)
+        self._tokens = min(self._tokens, self.capacity)
+
+    def queue_depth(self):
+        """Anzahl wartender Nachrichten"""
+        return sum(self._depth.values())
+
+    def budget_used(self):
+        """Verbrauchter Anteil des Airtime-Budgets (0.0 - 1.0)"""
+        self._refill()
+        return 1.0 - (self._tokens / self.capacity)
+
+    def stats(self):
+        """Gibt Warteschlangen- und Budget-Statistiken zurück"""
+        return {
+            'queue_depth': self.queue_depth(),
+            'queue_by_priority': {PRIORITY_NAMES[p]: n for p, n in self._depth.items()},
+            'budget_used': self.budget_used(),
+            'preset': self.preset,
+            'airtime_sent': self.airtime_sent,
+            'messages_sent': self.messages_sent,
+            'messages_dropped': self.messages_dropped,
+        }
+
+    def enqueue(self, text, destination_id=None, priority=PRIORITY_BROADCAST, trace=None):
+        """
+        Reiht eine Nachricht ein.
+        Gibt ein asyncio-Future zurück, das mit dem Sende-Ergebnis (True/False) aufgelöst wird.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        if self.queue_depth() >= self.max_queue_size and not self._evict_for(priority):
+            self.messages_dropped += 1
+            file_logger.log_warning(
+                f"Airtime-Scheduler: Warteschlange voll, {PRIORITY_NAMES.get(priority, priority)}-Nachricht verworfen"
+            )
+            future.set_result(False)
+            return future
+
+        job = _OutboundJob(priority, next(self._seq), text, destination_id,
+                           estimate_message_airtime(text, self.preset), future, trace)
+        if trace is not None:
+            trace.mark('airtime_queued')
+        heapq.heappush(self._heap, job)
+        self._depth[priority] = self._depth.get(priority, 0) + 1
+        self._ensure_running()
+        self._wakeup.set()
+        self._publish_stats()
+        return future
+
+    def _evict_for(self, priority):
+        """Verdrängt die jüngste Nachricht niedrigerer Priorität; True wenn Platz geschaffen wurde"""
+        victim = None
+        for job in self._heap:
+            if job.cancelled or job.priority <= priority:
+                continue
+            if victim is None or (job.priority, job.seq) > (victim.priority, victim.seq):
+                victim = job
+        if victim is None:
+            return False
+
+        victim.cancelled = True
+        self._depth[victim.priority] -= 1
+        self.messages_dropped += 1
+        if not victim.future.done():
+            victim.future.set_result(False)
+        file_logger.log_warning(
+            f"Airtime-Scheduler: {PRIORITY_NAMES[victim.priority]}-Nachricht zugunsten höherer Priorität verworfen"
+        )
+        return True
+
+    def _ensure_running(self):
+        """Startet den Dispatcher-Task bei Bedarf"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+    def _refill(self):
+        """Füllt den Token-Bucket entsprechend der vergangenen Zeit auf"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def _peek(self):
+        """Gibt den nächsten gültigen Auftrag zurück ohne ihn zu entfernen"""
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _publish_stats(self):
+        """Meldet Warteschlangenlänge und Budget an das Dashboard"""
+        try:
+            import dashboard
+            dashboard.update_outbound_queue(self.queue_depth(), self.budget_used())
+        except Exception:
+            pass
+
+    async def _dispatch_loop(self):
+        """Arbeitet die Warteschlange im Rahmen des Airtime-Budgets ab"""
+        while True:
+            job = self._peek()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            self._refill()
+            # Nachrichten größer als der Bucket dürfen bei vollem Bucket trotzdem raus
+            needed = min(job.airtime, self.capacity)
+            if self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self.refill_rate)
+                continue  # Neu prüfen - inzwischen kann Wichtigeres eingereiht worden sein
+
+            heapq.heappop(self._heap)
+            self._depth[job.priority] -= 1
+            self._tokens -= needed
+
+            if job.trace is not None:
+                job.trace.mark('airtime_granted')
+            try:
+                result = await self._send_func(job.text, job.destination_id, job.trace)
+            except Exception as e:
+                file_logger.log_error("Airtime-Scheduler", str(e))
+                result = False
+
+            if result:
+                self.airtime_sent += job.airtime
+                self.messages_sent += 1
+            else:
+                self._tokens = min(self.capacity, self._tokens + needed)  # Budget zurückgeben
+
+            if not job.future.done():
+                job.future.set_result(bool(result))
+            self._publish_stats()
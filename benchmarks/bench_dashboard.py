@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark für das Terminal-Dashboard
+Misst die CPU-Zeit pro Frame für das bisherige Vollbild-Zeichnen
+(clear + alle Zeilen) und den differenziellen Renderer.
+Gedacht für die Ausführung direkt auf dem Gateway (z.B. Raspberry Pi).
+
+Aufruf: python benchmarks/bench_dashboard.py [--frames 500] [--with-clear]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dashboard
+
+
+def fill_dashboard_data():
+    """Füllt das Dashboard mit realistischen Beispieldaten"""
+    data = dashboard.dashboard_data
+    data.host = "192.168.1.100"
+    data.channel_name = "LongFast"
+    data.channel_index = 0
+    data.meshtastic_connected = True
+    data.meshtastic_connect_time = datetime.now()
+    data.telegram_connected = True
+    data.telegram_bot_name = "MeinBot"
+    data.last_message = {"time": datetime.now(), "sender": "Alice 📡", "text": "Hallo aus dem Mesh! ✅"}
+    for i in range(10):
+        dashboard.update_node_activity(100000 + i, f"Node-{i} 🚀")
+
+
+def bench_full_redraw(frames, with_clear):
+    """Bisheriges Verfahren: Bildschirm löschen und alle Zeilen ausgeben"""
+    stream = io.StringIO()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(frames):
+        if with_clear:
+            os.system('clear > /dev/null 2>&1' if os.name != 'nt' else 'cls > NUL')
+        for line in dashboard.build_dashboard_lines():
+            stream.write(line + "\n")
+        stream.seek(0)
+        stream.truncate()
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def bench_diff_redraw(frames):
+    """Differenzieller Renderer: nur geänderte Zeilen"""
+    stream = io.StringIO()
+    renderer = dashboard.DashboardRenderer(stream=stream)
+    written = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i in range(frames):
+        if i % 10 == 0:
+            dashboard.add_message_mesh_to_tg("Bob", f"Nachricht {i}")
+        written += renderer.render(dashboard.build_dashboard_lines())
+        stream.seek(0)
+        stream.truncate()
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard-Render-Benchmark")
+    parser.add_argument('--frames', type=int, default=500, help="Anzahl gezeichneter Frames")
+    parser.add_argument('--with-clear', action='store_true',
+                        help="Vollbild-Variante inklusive os.system('clear') messen (Prozess-Start pro Frame)")
+    args = parser.parse_args()
+
+    fill_dashboard_data()
+
+    full_cpu, full_wall = bench_full_redraw(args.frames, args.with_clear)
+    diff_cpu, diff_wall, written = bench_diff_redraw(args.frames)
+
+    print(f"Frames: {args.frames}")
+    print(f"Vollbild:      {full_cpu / args.frames * 1000:8.3f} ms CPU/Frame  "
+          f"{full_wall / args.frames * 1000:8.3f} ms Wand/Frame"
+          + ("  (inkl. clear)" if args.with_clear else ""))
+    print(f"Differenziell: {diff_cpu / args.frames * 1000:8.3f} ms CPU/Frame  "
+          f"{diff_wall / args.frames * 1000:8.3f} ms Wand/Frame  "
+          f"({written / args.frames:.1f} Zeilen/Frame geschrieben)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Benchmark für die Nachrichtenverarbeitung
+Treibt message_handler.handle_text (Mesh → Telegram) und
+handle_telegram_message (Telegram → Mesh) mit Ersatzobjekten für das
+Meshtastic-Interface und den Telegram-Bot an. Die Node-Datenbank des
+Ersatz-Interfaces (nodesByNum/nodes) wird auf die gewünschten Mesh-Größen
+gefüllt, damit Kosten, die mit der Anzahl der Nodes wachsen (z.B. lineare
+Suchen pro Paket), sichtbar werden.
+
+Gemessen werden Durchsatz, p50/p99-Latenz pro Aufruf und Speicher-Allokationen
+(tracemalloc, in einem eigenen Durchlauf). Die Ergebnisse können als Baseline
+gespeichert und bei späteren Läufen verglichen werden; bei einer Verschlechterung
+über der Toleranz endet der Benchmark mit Exit-Code 1.
+
+Benötigt die Abhängigkeiten des Gateways (requirements.txt), verbindet sich aber
+weder mit einem Radio noch mit Telegram.
+
+Aufruf:
+    python benchmarks/bench_message_handler.py [--nodes 50,500,5000] [--messages 2000] [--rate 0]
+    python benchmarks/bench_message_handler.py --save-baseline     # Baseline auf dem Gateway speichern
+    python benchmarks/bench_message_handler.py --tolerance 0.25    # Vergleich mit der Baseline
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import message_handler
+import telegram_client
+from telegram_sender import TelegramSender
+from airtime_scheduler import AirtimeScheduler
+
+BROADCAST_ADDR = 4294967295
+TEST_CHAT_ID = '-1001234567890'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_message_handler.json')
+
+# Kennzahlen, die beim Baseline-Vergleich geprüft werden: (Schlüssel, größer ist besser)
+COMPARED_METRICS = (('throughput', True), ('p50_ms', False), ('p99_ms', False), ('alloc_bytes', False))
+
+
+class FakeInterface:
+    """Ersatz für meshtastic.tcp_interface.TCPInterface mit gefüllter Node-Datenbank"""
+
+    def __init__(self, mesh_size, send_delay=0.0):
+        self.socket = None
+        self.send_delay = send_delay
+        self.sent = 0
+        self.nodesByNum = {}
+        self.nodes = {}
+        for index in range(mesh_size):
+            num = 0x10000000 + index
+            node = {
+                'num': num,
+                'user': {
+                    'id': f"!{num:08x}",
+                    'longName': f"Node {index} 📡",
+                    'shortName': f"N{index % 1000:03d}",
+                },
+                'snr': 5.0,
+                'lastHeard': int(time.time()),
+            }
+            self.nodesByNum[num] = node
+            self.nodes[node['user']['id']] = node
+
+    def sendText(self, text, destinationId=None, channelIndex=0, **kwargs):
+        if self.send_delay:
+            time.sleep(self.send_delay)
+        self.sent += 1
+        return SimpleNamespace(id=self.sent)
+
+    def close(self):
+        pass
+
+
+class FakeBot:
+    """Ersatz für telegram.Bot; zählt nur die gesendeten Nachrichten"""
+
+    def __init__(self, send_delay=0.0):
+        self.send_delay = send_delay
+        self.sent = 0
+
+    async def send_message(self, chat_id, text, parse_mode=None, **kwargs):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.sent += 1
+        return SimpleNamespace(message_id=self.sent, chat_id=chat_id, text=text)
+
+
+def make_update(sequence, chat_id=TEST_CHAT_ID):
+    """Ersatz für ein Telegram-Update aus der konfigurierten Gruppe"""
+    async def reply_text(text, **kwargs):
+        return None
+
+    return SimpleNamespace(
+        update_id=sequence,
+        message=SimpleNamespace(text=f"Benchmark-Nachricht {sequence}", reply_text=reply_text),
+        effective_chat=SimpleNamespace(id=int(chat_id), type='supergroup', title='Benchmark'),
+        effective_user=SimpleNamespace(username=f"user{sequence % 50}", first_name='Bench',
+                                       last_name=None, is_bot=False),
+    )
+
+
+def make_packet(sequence, interface, rng, unknown_ratio):
+    """Öffentliches Textpaket eines zufälligen (ggf. unbekannten) Absenders"""
+    if rng.random() < unknown_ratio:
+        sender = 0x20000000 + rng.randrange(1 << 20)  # Nicht in der Node-Datenbank
+    else:
+        sender = 0x10000000 + rng.randrange(max(1, len(interface.nodesByNum)))
+    return {
+        'from': sender,
+        'to': BROADCAST_ADDR,
+        'id': sequence + 1,
+        'channel': message_handler.CHANNEL_INDEX,
+        'hopStart': 3,
+        'hopLimit': rng.randint(0, 3),
+        'rxSnr': rng.uniform(-10.0, 10.0),
+        'decoded': {'portnum': 'TEXT_MESSAGE_APP', 'text': f"Hallo aus dem Mesh {sequence}"},
+    }
+
+
+def prepare_gateway(interface, bot):
+    """Verbindet message_handler mit den Ersatzobjekten und hebt Drosselungen auf,
+    damit nur die Verarbeitungskosten gemessen werden"""
+    message_handler.TELEGRAM_CHAT_ID = TEST_CHAT_ID
+    telegram_client.set_bot(bot)
+    message_handler.node_names = message_handler.NodeNameCache()
+    message_handler.telegram_sender = TelegramSender(
+        get_bot=lambda: bot,
+        global_rate_per_second=1_000_000,
+        group_rate_per_minute=60_000_000,
+        private_rate_per_second=1_000_000,
+        coalesce_window=0
+    )
+    message_handler.outbound_scheduler = AirtimeScheduler(
+        send_func=lambda text, destination_id, trace: message_handler._send_via_worker(text, destination_id, trace),
+        duty_cycle_percent=100,
+        burst_seconds=10 ** 9,
+        max_queue_size=10 ** 6
+    )
+    for radio in message_handler.radio_pool:
+        radio.interface = None
+    radio = message_handler.radio_pool.radios[0]
+    radio.interface = interface
+    radio.health.attach(interface)
+
+
+def percentile(ordered, p):
+    """Perzentil einer sortierten Liste (nächster Rang)"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def drive(call, count, rate):
+    """Ruft call(i) count-mal auf (bei rate > 0 im festen Takt) und misst jede Aufrufdauer"""
+    latencies = []
+    interval = 1.0 / rate if rate > 0 else 0.0
+    start = time.perf_counter()
+    for i in range(count):
+        if interval:
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        t0 = time.perf_counter()
+        await call(i)
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - start
+
+
+async def wait_for(predicate, timeout):
+    """Wartet, bis die Hintergrund-Zustellung abgeschlossen ist"""
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.005)
+    return predicate()
+
+
+async def measure_allocations(call, count):
+    """Allokationen je Aufruf: Spitzen- und verbleibender Speicher laut tracemalloc"""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(count):
+            await call(i)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, after - before) / count, max(0, peak - before)
+
+
+async def run_scenario(name, mesh_size, args):
+    """Misst ein Szenario ('handle_text' oder 'handle_telegram_message') für eine Mesh-Größe"""
+    rng = random.Random(args.seed)
+    interface = FakeInterface(mesh_size, args.radio_delay)
+    bot = FakeBot(args.telegram_delay)
+    prepare_gateway(interface, bot)
+
+    if name == 'handle_text':
+        channel = message_handler.CHANNEL_INDEX
+
+        async def call(i):
+            await message_handler.handle_text(make_packet(i, interface, rng, args.unknown_ratio), interface, channel)
+
+        def delivered(total):
+            # Zusammengefasste Nachrichten kommen als eine Telegram-Nachricht an
+            sender = message_handler.telegram_sender
+            return lambda: sender.queue_depth() == 0 and sender.messages_sent + sender.messages_coalesced >= total
+    else:
+        async def call(i):
+            await message_handler.handle_telegram_message(make_update(i), None)
+
+        def delivered(total):
+            return lambda: interface.sent >= total
+
+    # Aufwärmen (füllt u.a. den Namens-Cache wie im laufenden Betrieb)
+    warmup = min(args.warmup, args.messages)
+    for i in range(warmup):
+        await call(i)
+
+    latencies, elapsed = await drive(call, args.messages, args.rate)
+    drain_start = time.perf_counter()
+    complete = await wait_for(delivered(warmup + args.messages), args.drain_timeout)
+    drain_time = time.perf_counter() - drain_start
+
+    alloc_per_call, alloc_peak = await measure_allocations(call, min(args.alloc_messages, args.messages))
+
+    ordered = sorted(latencies)
+    return {
+        'scenario': name,
+        'nodes': mesh_size,
+        'messages': args.messages,
+        'throughput': args.messages / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000 if ordered else 0.0,
+        'drain_ms': drain_time * 1000,
+        'delivered': complete,
+        'alloc_bytes': alloc_per_call,
+        'alloc_peak_bytes': alloc_peak,
+    }
+
+
+def result_key(result):
+    return f"{result['scenario']}@{result['nodes']}"
+
+
+def print_results(results):
+    header = (f"{'Szenario':<26}{'Nodes':>7}{'Nachr./s':>11}{'p50 ms':>9}{'p99 ms':>9}"
+              f"{'max ms':>9}{'B/Aufruf':>10}{'Spitze KiB':>12}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        note = '' if r['delivered'] else '  ⚠️ nicht vollständig zugestellt'
+        print(f"{r['scenario']:<26}{r['nodes']:>7}{r['throughput']:>11.0f}{r['p50_ms']:>9.3f}{r['p99_ms']:>9.3f}"
+              f"{r['max_ms']:>9.3f}{r['alloc_bytes']:>10.0f}{r['alloc_peak_bytes'] / 1024:>12.1f}{note}")
+
+    # Skalierung: Die Kosten pro Nachricht sollten nicht mit der Mesh-Größe wachsen
+    for scenario in sorted({r['scenario'] for r in results}):
+        runs = sorted((r for r in results if r['scenario'] == scenario), key=lambda r: r['nodes'])
+        if len(runs) > 1 and runs[0]['p50_ms'] > 0:
+            factor = runs[-1]['p50_ms'] / runs[0]['p50_ms']
+            print(f"Skalierung {scenario}: p50 bei {runs[-1]['nodes']} Nodes = "
+                  f"{factor:.2f}× von {runs[0]['nodes']} Nodes")
+
+
+def compare_with_baseline(results, baseline, tolerance, rate):
+    """Vergleicht mit der Baseline; gibt die Liste der Verschlechterungen zurück"""
+    regressions = []
+    stored = {result_key(r): r for r in baseline.get('results', [])}
+    print(f"\nVergleich mit Baseline vom {baseline.get('created', '?')} (Toleranz {tolerance:.0%}):")
+    # Der Durchsatz ist nur bei gleicher Taktrate vergleichbar
+    same_rate = baseline.get('rate') == rate
+    if not same_rate:
+        print(f"  Rate weicht von der Baseline ab ({baseline.get('rate')}), Durchsatz wird nicht verglichen")
+    for r in results:
+        old = stored.get(result_key(r))
+        if old is None:
+            print(f"  {result_key(r)}: keine Baseline vorhanden")
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            if not old.get(metric) or (metric == 'throughput' and not same_rate):
+                continue
+            change = (r[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            marker = '❌' if worse > tolerance else '✅'
+            print(f"  {marker} {result_key(r):<32}{metric:<12}{old[metric]:>12.3f} → {r[metric]:>12.3f} ({change:+.1%})")
+            if worse > tolerance:
+                regressions.append((result_key(r), metric, change))
+    return regressions
+
+
+async def run_all(args):
+    results = []
+    for mesh_size in args.nodes:
+        for scenario in args.scenarios:
+            results.append(await run_scenario(scenario, mesh_size, args))
+    message_handler.meshtastic_sender.stop()
+    return results
+
+
+def parse_sizes(value):
+    return [int(part) for part in value.split(',') if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für handle_text und handle_telegram_message")
+    parser.add_argument('--nodes', type=parse_sizes, default=[50, 500, 5000],
+                        help="Mesh-Größen (Nodes in nodesByNum), kommagetrennt")
+    parser.add_argument('--messages', type=int, default=2000, help="Gemessene Nachrichten pro Szenario")
+    parser.add_argument('--warmup', type=int, default=200, help="Nachrichten zum Aufwärmen (nicht gemessen)")
+    parser.add_argument('--rate', type=float, default=0,
+                        help="Nachrichten pro Sekunde (0 = so schnell wie möglich)")
+    parser.add_argument('--scenarios', nargs='+', default=['handle_text', 'handle_telegram_message'],
+                        choices=['handle_text', 'handle_telegram_message'], help="Zu messende Handler")
+    parser.add_argument('--unknown-ratio', type=float, default=0.05,
+                        help="Anteil der Pakete von Nodes, die nicht in der Node-Datenbank stehen")
+    parser.add_argument('--radio-delay', type=float, default=0.0, help="Simulierte Dauer von sendText in Sekunden")
+    parser.add_argument('--telegram-delay', type=float, default=0.0,
+                        help="Simulierte Dauer von send_message in Sekunden")
+    parser.add_argument('--alloc-messages', type=int, default=500,
+                        help="Nachrichten für die Allokationsmessung (tracemalloc)")
+    parser.add_argument('--drain-timeout', type=float, default=30.0,
+                        help="Maximale Wartezeit auf die Hintergrund-Zustellung in Sekunden")
+    parser.add_argument('--seed', type=int, default=1, help="Startwert für die Zufallsdaten")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Pfad der Baseline-Datei")
+    parser.add_argument('--save-baseline', action='store_true', help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Erlaubte Verschlechterung gegenüber der Baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_all(args))
+    print(f"Nachrichten: {args.messages} pro Szenario, Rate: {args.rate or 'unbegrenzt'}")
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': sys.version.split()[0],
+                       'rate': args.rate, 'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nKeine Baseline gefunden (mit --save-baseline anlegen)")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.tolerance, args.rate)
+    if regressions:
+        print(f"\n❌ {len(regressions)} Verschlechterung(en) über {args.tolerance:.0%}")
+        return 1
+    print("\n✅ Keine Verschlechterung gegenüber der Baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
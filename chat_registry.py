@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Registry-Modul für private Chats des Meshtastic ↔ Telegram Gateways
+Hält die Verknüpfungen Meshtastic-Node ↔ Telegram-Chat mit Indizes nach
+Secret, Node-ID und Telegram-Chat-ID, damit jede Suche O(1) bleibt.
+"""
+
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class PrivateChatRegistry:
+    """Bidirektional indizierte Sammlung der authentifizierten privaten Chats"""
+
+    def __init__(self, journal=None):
+        self.journal = journal  # Optionales Journal (record_put/record_delete) für die Persistenz
+        self._by_secret: Dict[str, dict] = {}
+        self._secret_by_node: Dict[int, str] = {}
+        # Mehrere Nodes können denselben Telegram-Chat (z.B. eine Gruppe) verwenden
+        self._secrets_by_chat: Dict[int, Dict[str, None]] = {}
+
+    def __len__(self):
+        return len(self._by_secret)
+
+    def __contains__(self, secret):
+        return secret in self._by_secret
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_secret)
+
+    def __getitem__(self, secret) -> dict:
+        return self._by_secret[secret]
+
+    def items(self):
+        """Gibt (Secret, Benutzerdaten)-Paare zurück"""
+        return self._by_secret.items()
+
+    def get(self, secret) -> Optional[dict]:
+        """Gibt die Benutzerdaten zu einem Secret zurück"""
+        return self._by_secret.get(secret)
+
+    def add(self, secret: str, user_data: dict):
+        """Fügt eine Verknüpfung hinzu (bestehende Verknüpfungen des Secrets oder der Node werden ersetzt)"""
+        if secret in self._by_secret:
+            self.remove(secret)
+        self.remove_by_node(user_data['meshtastic_node_id'])
+
+        self._by_secret[secret] = user_data
+        self._secret_by_node[user_data['meshtastic_node_id']] = secret
+        self._secrets_by_chat.setdefault(user_data['telegram_chat_id'], {})[secret] = None
+        if self.journal:
+            self.journal.record_put(secret, user_data)
+
+    def remove(self, secret: str) -> Optional[dict]:
+        """Entfernt eine Verknüpfung über ihr Secret und gibt die Benutzerdaten zurück"""
+        user_data = self._by_secret.pop(secret, None)
+        if user_data is None:
+            return None
+
+        node_id = user_data['meshtastic_node_id']
+        if self._secret_by_node.get(node_id) == secret:
+            del self._secret_by_node[node_id]
+
+        chat_id = user_data['telegram_chat_id']
+        chat_secrets = self._secrets_by_chat.get(chat_id)
+        if chat_secrets is not None:
+            chat_secrets.pop(secret, None)
+            if not chat_secrets:
+                del self._secrets_by_chat[chat_id]
+        if self.journal:
+            self.journal.record_delete(secret)
+        return user_data
+
+    def remove_by_node(self, node_id: int) -> Tuple[Optional[str], Optional[dict]]:
+        """Entfernt die Verknüpfung einer Node; gibt (Secret, Benutzerdaten) zurück"""
+        secret = self._secret_by_node.get(node_id)
+        if secret is None:
+            return None, None
+        return secret, self.remove(secret)
+
+    def find_by_node(self, node_id: int) -> Tuple[Optional[str], Optional[dict]]:
+        """Sucht die Verknüpfung einer Meshtastic-Node"""
+        secret = self._secret_by_node.get(node_id)
+        if secret is None:
+            return None, None
+        return secret, self._by_secret[secret]
+
+    def find_by_chat(self, telegram_chat_id: int) -> Tuple[Optional[str], Optional[dict]]:
+        """Sucht die (erste) Verknüpfung eines Telegram-Chats"""
+        chat_secrets = self._secrets_by_chat.get(telegram_chat_id)
+        if not chat_secrets:
+            return None, None
+        secret = next(iter(chat_secrets))
+        return secret, self._by_secret[secret]
+
+    def load(self, data: Dict[str, dict]):
+        """Ersetzt den Inhalt durch die übergebenen Daten (Secret -> Benutzerdaten), ohne sie zu protokollieren"""
+        journal, self.journal = self.journal, None
+        try:
+            self.clear()
+            for secret, user_data in data.items():
+                self.add(secret, user_data)
+        finally:
+            self.journal = journal
+
+    def clear(self):
+        """Entfernt alle Verknüpfungen"""
+        self._by_secret.clear()
+        self._secret_by_node.clear()
+        self._secrets_by_chat.clear()
+
+    def to_dict(self) -> Dict[str, dict]:
+        """Gibt die Verknüpfungen als einfaches Dictionary zurück (für die Persistenz)"""
+        return dict(self._by_secret)
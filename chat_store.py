@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Persistenz-Modul des Meshtastic ↔ Telegram Gateways
+Ein Schlüssel-Wert-Zustand (private Chats, Zwischenspeicher, Node-Datenbank)
+wird als Journal (eine JSON-Zeile pro Änderung) von einem Hintergrund-Thread
+geschrieben und gebündelt per fsync gesichert. Das Journal wird regelmäßig
+atomar (tmp-Datei + rename) in den Snapshot (z.B. private_chats.json)
+verdichtet. Der Name des Speichers erscheint im Thread-Namen und in den Logs.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+import file_logger
+
+_COMPACT = object()  # Marker für eine angeforderte Verdichtung
+_STOP = object()     # Marker zum Beenden des Writer-Threads
+
+
+class JournalStore:
+    """Append-only Journal mit Snapshot für einen Schlüssel-Wert-Zustand"""
+
+    def __init__(self, snapshot_path, name='journal', journal_path=None, fsync_interval=1.0, compact_threshold=500):
+        self.name = name  # z.B. 'private-chats', erscheint im Thread-Namen und in den Logs
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{snapshot_path}.journal"
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._state = {}           # Replik des Zustands für die Verdichtung (nur im Writer-Thread)
+        self._journal_entries = 0
+
+    def load(self):
+        """Lädt Snapshot und spielt das Journal ab; gibt Schlüssel -> Daten zurück"""
+        state = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+                if content.strip():
+                    state = json.loads(content)
+
+        entries = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Abgeschnittene letzte Zeile nach einem Absturz ignorieren
+                        file_logger.log_warning(f"{self.name}: ungültiger Journal-Eintrag in {self.journal_path} übersprungen")
+                        continue
+                    self._apply(state, entry)
+                    entries += 1
+
+        self._state = dict(state)
+        self._journal_entries = entries
+        return state
+
+    def start(self):
+        """Startet den Writer-Thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-store", daemon=True)
+            self._thread.start()
+
+    def record_put(self, key, data):
+        """Protokolliert einen neuen oder geänderten Eintrag (nicht blockierend)"""
+        # Feldname 'secret' aus dem ursprünglichen Format der privaten Chats (bestehende Journale bleiben lesbar)
+        self._enqueue({'op': 'put', 'secret': key, 'data': dict(data)})
+
+    def record_delete(self, key):
+        """Protokolliert das Entfernen eines Eintrags (nicht blockierend)"""
+        self._enqueue({'op': 'del', 'secret': key})
+
+    def compact(self):
+        """Fordert eine Verdichtung des Journals in den Snapshot an"""
+        self._enqueue(_COMPACT)
+
+    def close(self, timeout=5):
+        """Schreibt ausstehende Änderungen, verdichtet und beendet den Writer-Thread"""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(_COMPACT)
+            self._queue.put(_STOP)
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _enqueue(self, item):
+        self.start()
+        self._queue.put(item)
+
+    @staticmethod
+    def _apply(state, entry):
+        if entry.get('op') == 'put':
+            state[entry['secret']] = entry['data']
+        elif entry.get('op') == 'del':
+            state.pop(entry['secret'], None)
+
+    def _run(self):
+        """Writer-Thread: sammelt Änderungen und schreibt sie gebündelt"""
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Weitere Änderungen innerhalb des fsync-Intervalls mitnehmen
+            deadline = time.monotonic() + self.fsync_interval
+            try:
+                while batch[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                pass
+
+            entries = [item for item in batch if isinstance(item, dict)]
+            compact_requested = any(item is _COMPACT for item in batch)
+            running = not any(item is _STOP for item in batch)
+
+            try:
+                if entries:
+                    self._append_entries(entries)
+                if compact_requested or self._journal_entries >= self.compact_threshold:
+                    self._compact()
+            except Exception as e:
+                file_logger.log_error(f"JournalStore {self.name}", str(e))
+
+    def _append_entries(self, entries):
+        """Hängt Einträge an das Journal an und sichert sie mit einem einzigen fsync"""
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n")
+                self._apply(self._state, entry)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries += len(entries)
+
+    def _compact(self):
+        """Schreibt den Snapshot atomar und leert danach das Journal"""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._fsync_directory()
+
+        # Ein Absturz vor dem Leeren ist unkritisch: das Journal ist idempotent
+        with open(self.journal_path, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_entries = 0
+        file_logger.log_debug(f"{self.name} verdichtet: {len(self._state)} Einträge")
+
+    def _fsync_directory(self):
+        """Sichert den rename auch im Verzeichnis (nicht auf allen Plattformen möglich)"""
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.snapshot_path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
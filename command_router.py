@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Befehls-Router für Meshtastic-Befehle (!help, !btc, !secret ...)
+Jede Nachricht wird genau einmal zerlegt und über eine Tabelle nach
+Befehlsnamen verteilt. Befehle registrieren sich per Dekorator:
+
+    from command_router import router
+
+    @router.command('wetter', "Wetterbericht", usage='!wetter ORT')
+    async def wetter(ctx):
+        await ctx.reply(f"☀️ Sonnig in {ctx.args}")
+
+Eigene Befehle (Site-Plugins) sind normale Module, die beim Start über
+command_plugins in gateway_config.json importiert werden. Die Hilfe-Texte
+werden aus den registrierten Befehlen erzeugt.
+"""
+
+import asyncio
+import importlib
+
+import file_logger
+
+COMMAND_PREFIX = '!'
+
+
+class CommandContext:
+    """Aufruf eines Befehls: Absender, Befehl und Argumente"""
+    __slots__ = ('command', 'args', 'text', 'node_id', 'sender_name')
+
+    def __init__(self, command, args, text, node_id, sender_name):
+        self.command = command        # Befehlsname ohne Präfix, kleingeschrieben
+        self.args = args              # Rest der Nachricht (Groß-/Kleinschreibung erhalten)
+        self.text = text              # Originaltext
+        self.node_id = node_id
+        self.sender_name = sender_name
+
+    async def reply(self, message):
+        """Antwortet der Node direkt (mit Befehls-Priorität)"""
+        from message_handler import send_to_meshtastic_safe
+        from airtime_scheduler import PRIORITY_COMMAND
+        return await send_to_meshtastic_safe(message, self.node_id, priority=PRIORITY_COMMAND)
+
+
+class Command:
+    """Registrierter Befehl"""
+    __slots__ = ('name', 'handler', 'description', 'help_lines', 'aliases')
+
+    def __init__(self, name, handler, description, help_lines, aliases):
+        self.name = name
+        self.handler = handler
+        self.description = description
+        self.help_lines = help_lines
+        self.aliases = aliases
+
+
+class CommandRouter:
+    """Zerlegt Befehle einmal und ruft den registrierten Handler als eigenen Task auf"""
+
+    def __init__(self, prefix=COMMAND_PREFIX):
+        self.prefix = prefix
+        self._commands = {}     # Name und Aliase -> Command
+        self._help = []         # (Aufruf, Beschreibung) in Registrierungsreihenfolge
+        self._unknown_handler = None
+        self._tasks = set()
+        self.dispatched = 0
+
+    def command(self, name, description, usage=None, help=None, aliases=()):
+        """Dekorator: registriert eine Coroutine-Funktion handler(ctx) als Befehl"""
+        def decorator(handler):
+            self.register(name, handler, description, usage, help, aliases)
+            return handler
+        return decorator
+
+    def register(self, name, handler, description, usage=None, help=None, aliases=()):
+        """Registriert einen Befehl; help ist eine optionale Liste (Aufruf, Beschreibung)"""
+        name = name.lower()
+        help_lines = list(help) if help else [(usage or f"{self.prefix}{name}", description)]
+        command = Command(name, handler, description, help_lines, tuple(a.lower() for a in aliases))
+        for key in (name, *command.aliases):
+            if key in self._commands:
+                file_logger.log_warning(f"Befehl {self.prefix}{key} wird neu registriert")
+            self._commands[key] = command
+        self._help.extend(help_lines)
+        return command
+
+    def document(self, usage, description):
+        """Fügt der Hilfe einen Eintrag ohne Mesh-Handler hinzu (z.B. Telegram-Befehle)"""
+        self._help.append((usage, description))
+
+    def on_unknown(self, handler):
+        """Dekorator: Handler für unbekannte Befehle (ctx.command enthält den Namen)"""
+        self._unknown_handler = handler
+        return handler
+
+    def commands(self):
+        """Namen aller registrierten Befehle (ohne Aliase)"""
+        return sorted({command.name for command in self._commands.values()})
+
+    def help_text(self, header="📋 Verfügbare Befehle:"):
+        """Erzeugt die Befehlsübersicht aus den registrierten Befehlen"""
+        return "\n".join([header] + [f"{usage} - {description}" for usage, description in self._help])
+
+    def parse(self, text):
+        """Gibt (Befehlsname, Argumente) zurück oder None, wenn es kein Befehl ist"""
+        stripped = text.strip()
+        if len(stripped) < 2 or not stripped.startswith(self.prefix):
+            return None
+        head, _, rest = stripped[len(self.prefix):].partition(' ')
+        return head.lower(), rest.strip()
+
+    def dispatch(self, text, node_id, sender_name):
+        """Verteilt einen Befehl an seinen Handler.
+        Gibt True zurück, wenn die Nachricht ein Befehl war (auch ein unbekannter)."""
+        parsed = self.parse(text)
+        if parsed is None:
+            return False
+
+        name, args = parsed
+        command = self._commands.get(name)
+        handler = command.handler if command is not None else self._unknown_handler
+        if handler is None:
+            return False
+
+        self.dispatched += 1
+        ctx = CommandContext(command.name if command else name, args, text, node_id, sender_name)
+        file_logger.log_debug("Befehl %s%s von %s (Node %s)", self.prefix, ctx.command, sender_name, node_id)
+        self._track(asyncio.create_task(handler(ctx)), ctx)
+        return True
+
+    def _track(self, task, ctx):
+        """Hält eine Referenz auf den Task und protokolliert Fehler"""
+        self._tasks.add(task)
+
+        def done(finished):
+            self._tasks.discard(finished)
+            if not finished.cancelled() and finished.exception() is not None:
+                file_logger.log_error("CommandRouter",
+                                      f"Befehl {self.prefix}{ctx.command} von Node {ctx.node_id}: {finished.exception()}")
+        task.add_done_callback(done)
+
+    def pending(self):
+        """Anzahl laufender Befehls-Tasks"""
+        return len(self._tasks)
+
+    async def shutdown(self, timeout=5):
+        """Wartet kurz auf laufende Befehle und bricht den Rest ab"""
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+    def load_plugins(self, module_names):
+        """Importiert Plugin-Module; sie registrieren ihre Befehle per @router.command"""
+        for module_name in module_names:
+            try:
+                importlib.import_module(module_name)
+                file_logger.log_info(f"Befehls-Plugin {module_name} geladen")
+            except Exception as e:
+                file_logger.log_error("CommandRouter", f"Plugin {module_name} konnte nicht geladen werden: {e}")
+
+
+router = CommandRouter()  # Gemeinsamer Router für alle Mesh-Befehle
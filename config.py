@@ -4,8 +4,12 @@ Konfigurationsdatei für das Meshtastic ↔ Telegram Gateway
 Lädt Konfiguration aus JSON-Datei oder verwendet Standardwerte.
 """
 
+import asyncio
 import json
 import os
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
 
 # Pfad zur Konfigurationsdatei
 CONFIG_FILE = "gateway_config.json"
@@ -13,20 +17,213 @@ CONFIG_FILE = "gateway_config.json"
 # Standard-Konfiguration (Fallback-Werte)
 DEFAULT_CONFIG = {
     'meshtastic_host': '192.168.1.100',
+    'meshtastic_hosts': [],
     'channel_name': 'LongFast',
     'channel_index': 0,
     'telegram_token': '',
     'telegram_chat_id': '',
     'node_status_interval': 180,
     'max_recent_nodes': 10,
+    'node_activity_max_nodes': 5000,
     'log_level': 'ERROR',
+    'file_log_level': 'DEBUG',
     'meshtastic_heartbeat_interval': 10,
     'meshtastic_ping_timeout': 2,
     'meshtastic_reconnect_delay': 3,
     'meshtastic_max_reconnect_delay': 30,
-    'meshtastic_network_check_interval': 5
+    'meshtastic_network_check_interval': 5,
+    'meshtastic_quiet_threshold': 120,
+    'meshtastic_health_probe_interval': 60,
+    'meshtastic_link_max_age': 900,
+    'meshtastic_dedupe_ttl': 600,
+    'meshtastic_dedupe_max_entries': 4096,
+    'meshtastic_ingress_queue_size': 500,
+    'meshtastic_ingress_workers': 4,
+    'meshtastic_ingress_overflow_policy': 'drop_broadcast_first',
+    'meshtastic_send_queue_size': 100,
+    'meshtastic_send_timeout': 30,
+    'meshtastic_modem_preset': 'LONG_FAST',
+    'meshtastic_duty_cycle_percent': 10,
+    'meshtastic_airtime_burst_seconds': 15,
+    'meshtastic_outbound_queue_size': 200,
+    'meshtastic_spool_file': 'outbound_spool.json',
+    'meshtastic_spool_max_age': 900,
+    'meshtastic_spool_max_entries': 200,
+    'meshtastic_spool_replay_interval': 2.0,
+    'meshtastic_max_payload_bytes': 200,
+    'meshtastic_compact_text': True,
+    'meshtastic_multipart_max_parts': 8,
+    'meshtastic_multipart_timeout': 120,
+    'telegram_global_rate_per_second': 25,
+    'telegram_group_rate_per_minute': 20,
+    'telegram_private_rate_per_second': 1,
+    'telegram_coalesce_window': 1.0,
+    'telegram_connection_pool_size': 8,
+    'telegram_keepalive_expiry': 30,
+    'telegram_connect_timeout': 10,
+    'telegram_read_timeout': 15,
+    'telegram_write_timeout': 15,
+    'telegram_pool_timeout': 5,
+    'telegram_webhook_enabled': False,
+    'telegram_webhook_listen': '127.0.0.1',
+    'telegram_webhook_port': 8443,
+    'telegram_webhook_path': '/telegram',
+    'telegram_webhook_url': '',
+    'telegram_webhook_secret': '',
+    'btc_price_url': 'https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd',
+    'btc_cache_ttl': 60,
+    'http_lookup_timeout': 10,
+    'http_lookup_stale_max_age': 3600,
+    'command_plugins': [],
+    'node_db_file': 'node_db.json',
+    'node_db_max_nodes': 2000,
+    'node_db_max_age': 2592000,
+    'node_db_heard_resolution': 300,
+    'private_chats_fsync_interval': 1.0,
+    'private_chats_compact_threshold': 500,
+    'metrics_enabled': False,
+    'metrics_listen': '127.0.0.1',
+    'metrics_port': 9101,
+    'trace_enabled': False,
+    'trace_sample_rate': 1.0,
+    'trace_file': 'logs/traces.jsonl',
+    'trace_max_bytes': 10485760,
+    'trace_backup_count': 5,
+    'config_watch_interval': 5
 }
 
+# Gültige Namen für log_level und file_log_level
+LOG_LEVEL_NAMES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# Anzahlen, Kapazitäten und Ports: ganze Zahl, mindestens 1
+MIN_ONE_KEYS = frozenset({
+    'max_recent_nodes', 'node_activity_max_nodes',
+    'meshtastic_dedupe_max_entries', 'meshtastic_ingress_queue_size', 'meshtastic_ingress_workers',
+    'meshtastic_send_queue_size', 'meshtastic_outbound_queue_size', 'meshtastic_spool_max_entries',
+    'meshtastic_max_payload_bytes', 'meshtastic_multipart_max_parts',
+    'telegram_connection_pool_size', 'telegram_webhook_port', 'metrics_port',
+    'node_db_max_nodes', 'private_chats_compact_threshold', 'trace_max_bytes',
+})
+
+# Raten, durch die geteilt wird, sowie Intervalle und Timeouts, auf die gewartet wird: größer als 0
+# (nicht config_watch_interval und telegram_coalesce_window - dort schaltet 0 die Funktion ab)
+POSITIVE_KEYS = frozenset({
+    'meshtastic_duty_cycle_percent', 'meshtastic_airtime_burst_seconds', 'telegram_global_rate_per_second',
+    'telegram_group_rate_per_minute', 'telegram_private_rate_per_second',
+    'node_status_interval', 'meshtastic_heartbeat_interval', 'meshtastic_ping_timeout',
+    'meshtastic_reconnect_delay', 'meshtastic_max_reconnect_delay', 'meshtastic_network_check_interval',
+    'meshtastic_quiet_threshold', 'meshtastic_health_probe_interval', 'meshtastic_send_timeout',
+    'meshtastic_spool_replay_interval', 'meshtastic_multipart_timeout',
+    'telegram_connect_timeout', 'telegram_read_timeout', 'telegram_write_timeout', 'telegram_pool_timeout',
+    'http_lookup_timeout',
+})
+
+
+class ConfigError(ValueError):
+    """Konfiguration enthält ungültige Werte"""
+
+
+class ConfigSnapshot(Mapping):
+    """Unveränderlicher, geprüfter Stand der Konfiguration.
+    Werte sind als Schlüssel (snapshot['channel_index']) und als Attribut
+    (snapshot.channel_index) lesbar; Listen werden als Tupel abgelegt."""
+    __slots__ = ('_values', 'version', 'loaded_at')
+
+    def __init__(self, values, version=0):
+        object.__setattr__(self, '_values', MappingProxyType(dict(values)))
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'loaded_at', time.time())
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot ist unveränderlich")
+
+    def changed_keys(self, other):
+        """Schlüssel, deren Wert sich gegenüber other unterscheidet"""
+        keys = set(self._values) | set(other)
+        return {key for key in keys if self._values.get(key) != other.get(key)}
+
+
+def _check_value(key, value, default):
+    """Prüft einen Wert gegen den Typ des Standardwerts; gibt den (normierten) Wert zurück"""
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            raise ConfigError(f"{key}: true/false erwartet, nicht {value!r}")
+        return value
+    if isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError(f"{key}: Zahl erwartet, nicht {value!r}")
+        if value < 0:
+            raise ConfigError(f"{key}: darf nicht negativ sein ({value})")
+        if key in MIN_ONE_KEYS and (value < 1 or value != int(value)):
+            raise ConfigError(f"{key}: ganze Zahl von mindestens 1 erwartet, nicht {value!r}")
+        if key in POSITIVE_KEYS and value == 0:
+            raise ConfigError(f"{key}: muss größer als 0 sein")
+        return int(value) if key in MIN_ONE_KEYS else value
+    if isinstance(default, str):
+        if isinstance(value, int) and not isinstance(value, bool):
+            value = str(value)  # z.B. Chat-ID als Zahl eingetragen
+        if not isinstance(value, str):
+            raise ConfigError(f"{key}: Text erwartet, nicht {value!r}")
+        if key in ('log_level', 'file_log_level') and value.upper() not in LOG_LEVEL_NAMES:
+            raise ConfigError(f"{key}: unbekanntes Level {value!r}")
+        if key == 'meshtastic_ingress_overflow_policy':
+            from ingress_queue import OVERFLOW_POLICIES
+            if value not in OVERFLOW_POLICIES:
+                raise ConfigError(f"{key}: unbekannte Strategie {value!r} (erlaubt: {', '.join(OVERFLOW_POLICIES)})")
+        return value
+    if isinstance(default, list):
+        if not isinstance(value, (list, tuple)):
+            raise ConfigError(f"{key}: Liste erwartet, nicht {value!r}")
+        return tuple(value)
+    return value
+
+
+def validate_config(raw):
+    """Ergänzt fehlende Schlüssel mit Standardwerten und prüft die Typen.
+    Gibt (Werte, Fehlerliste) zurück; ungültige Werte sind durch den Standardwert ersetzt.
+    Zusätzliche Schlüssel (z.B. setup_completed) werden unverändert übernommen."""
+    values = {key: tuple(value) if isinstance(value, list) else value for key, value in DEFAULT_CONFIG.items()}
+    errors = []
+    for key, value in raw.items():
+        if key not in DEFAULT_CONFIG:
+            values[key] = value
+            continue
+        try:
+            values[key] = _check_value(key, value, DEFAULT_CONFIG[key])
+        except ConfigError as e:
+            errors.append(str(e))
+    # Extern registrierter Webhook: Telegram kann nur ein konfiguriertes Secret kennen
+    if values['telegram_webhook_enabled'] and not values['telegram_webhook_url'] and not values['telegram_webhook_secret']:
+        errors.append("telegram_webhook_secret: muss gesetzt sein, wenn der Webhook ohne telegram_webhook_url extern registriert wird")
+        values['telegram_webhook_enabled'] = DEFAULT_CONFIG['telegram_webhook_enabled']
+    return values, errors
+
+
+def read_config_file():
+    """Liest die JSON-Datei; gibt {} zurück, wenn sie nicht existiert"""
+    if not os.path.exists(CONFIG_FILE):
+        return {}
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ConfigError("Konfigurationsdatei enthält kein JSON-Objekt")
+    return config
+
 def load_config():
     """Lädt Konfiguration aus JSON-Datei oder verwendet Standardwerte"""
     if os.path.exists(CONFIG_FILE):
@@ -43,11 +240,31 @@ def load_config():
     
     return DEFAULT_CONFIG.copy()
 
+def _file_signature():
+    """Änderungsmerkmal der Konfigurationsdatei (mtime, Größe) oder None"""
+    try:
+        stat = os.stat(CONFIG_FILE)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _load_snapshot():
+    """Erster Stand beim Import: ungültige Werte werden durch Standardwerte ersetzt"""
+    values, errors = validate_config(load_config())
+    for error in errors:
+        print(f"⚠️  Ungültiger Konfigurationswert, verwende Standardwert: {error}")
+    return ConfigSnapshot(values)
+
 # Lade aktuelle Konfiguration
-_config = load_config()
+_file_state = _file_signature()
+_snapshot = _load_snapshot()
+_config = _snapshot
+_subscribers = []  # (Schlüssel oder None für alle, Callback(snapshot, geänderte Schlüssel))
 
 # ——— Meshtastic-Konfiguration ———
 MESHTASTIC_HOST = _config['meshtastic_host']
+# Weitere Radios für den Multi-Radio-Betrieb (meshtastic_host bleibt das erste)
+MESHTASTIC_HOSTS = [MESHTASTIC_HOST] + [h for h in _config['meshtastic_hosts'] if h and h != MESHTASTIC_HOST]
 CHANNEL_NAME = _config['channel_name']
 CHANNEL_INDEX = _config['channel_index']
 
@@ -58,9 +275,11 @@ TELEGRAM_CHAT_ID = _config['telegram_chat_id']
 # ——— Status-Update-Konfiguration ———
 NODE_STATUS_INTERVAL = _config['node_status_interval']
 MAX_RECENT_NODES = _config['max_recent_nodes']
+NODE_ACTIVITY_MAX_NODES = _config['node_activity_max_nodes']
 
 # ——— Logging-Konfiguration ———
 LOG_LEVEL = _config['log_level']
+FILE_LOG_LEVEL = _config['file_log_level']
 
 # ——— Verbindungsüberwachung ———
 MESHTASTIC_HEARTBEAT_INTERVAL = _config['meshtastic_heartbeat_interval']
@@ -68,19 +287,171 @@ MESHTASTIC_PING_TIMEOUT = _config['meshtastic_ping_timeout']
 MESHTASTIC_RECONNECT_DELAY = _config['meshtastic_reconnect_delay']
 MESHTASTIC_MAX_RECONNECT_DELAY = _config['meshtastic_max_reconnect_delay']
 MESHTASTIC_NETWORK_CHECK_INTERVAL = _config['meshtastic_network_check_interval']
+MESHTASTIC_QUIET_THRESHOLD = _config['meshtastic_quiet_threshold']
+MESHTASTIC_HEALTH_PROBE_INTERVAL = _config['meshtastic_health_probe_interval']
+MESHTASTIC_LINK_MAX_AGE = _config['meshtastic_link_max_age']
+MESHTASTIC_DEDUPE_TTL = _config['meshtastic_dedupe_ttl']
+MESHTASTIC_DEDUPE_MAX_ENTRIES = _config['meshtastic_dedupe_max_entries']
+
+# ——— Empfangs-Warteschlange ———
+MESHTASTIC_INGRESS_QUEUE_SIZE = _config['meshtastic_ingress_queue_size']
+MESHTASTIC_INGRESS_WORKERS = _config['meshtastic_ingress_workers']
+MESHTASTIC_INGRESS_OVERFLOW_POLICY = _config['meshtastic_ingress_overflow_policy']
+
+# ——— Sende-Worker ———
+MESHTASTIC_SEND_QUEUE_SIZE = _config['meshtastic_send_queue_size']
+MESHTASTIC_SEND_TIMEOUT = _config['meshtastic_send_timeout']
+
+# ——— Airtime-Scheduler ———
+MESHTASTIC_MODEM_PRESET = _config['meshtastic_modem_preset']
+MESHTASTIC_DUTY_CYCLE_PERCENT = _config['meshtastic_duty_cycle_percent']
+MESHTASTIC_AIRTIME_BURST_SECONDS = _config['meshtastic_airtime_burst_seconds']
+MESHTASTIC_OUTBOUND_QUEUE_SIZE = _config['meshtastic_outbound_queue_size']
+
+# ——— Zwischenspeicher bei Verbindungsabbruch ———
+MESHTASTIC_SPOOL_FILE = _config['meshtastic_spool_file']
+MESHTASTIC_SPOOL_MAX_AGE = _config['meshtastic_spool_max_age']
+MESHTASTIC_SPOOL_MAX_ENTRIES = _config['meshtastic_spool_max_entries']
+MESHTASTIC_SPOOL_REPLAY_INTERVAL = _config['meshtastic_spool_replay_interval']
+
+# ——— Lange Nachrichten (Aufteilung und Zusammensetzung) ———
+MESHTASTIC_MAX_PAYLOAD_BYTES = _config['meshtastic_max_payload_bytes']
+MESHTASTIC_COMPACT_TEXT = _config['meshtastic_compact_text']
+MESHTASTIC_MULTIPART_MAX_PARTS = _config['meshtastic_multipart_max_parts']
+MESHTASTIC_MULTIPART_TIMEOUT = _config['meshtastic_multipart_timeout']
+
+# ——— Externe Abfragen (!btc) ———
+BTC_PRICE_URL = _config['btc_price_url']
+BTC_CACHE_TTL = _config['btc_cache_ttl']
+HTTP_LOOKUP_TIMEOUT = _config['http_lookup_timeout']
+HTTP_LOOKUP_STALE_MAX_AGE = _config['http_lookup_stale_max_age']
+
+# ——— Befehle ———
+COMMAND_PLUGINS = _config['command_plugins']
+
+# ——— Telegram-Ratenbegrenzung ———
+TELEGRAM_GLOBAL_RATE_PER_SECOND = _config['telegram_global_rate_per_second']
+TELEGRAM_GROUP_RATE_PER_MINUTE = _config['telegram_group_rate_per_minute']
+TELEGRAM_PRIVATE_RATE_PER_SECOND = _config['telegram_private_rate_per_second']
+TELEGRAM_COALESCE_WINDOW = _config['telegram_coalesce_window']
+
+# ——— Telegram-Verbindung ———
+TELEGRAM_CONNECTION_POOL_SIZE = _config['telegram_connection_pool_size']
+TELEGRAM_KEEPALIVE_EXPIRY = _config['telegram_keepalive_expiry']
+TELEGRAM_CONNECT_TIMEOUT = _config['telegram_connect_timeout']
+TELEGRAM_READ_TIMEOUT = _config['telegram_read_timeout']
+TELEGRAM_WRITE_TIMEOUT = _config['telegram_write_timeout']
+TELEGRAM_POOL_TIMEOUT = _config['telegram_pool_timeout']
+
+# ——— Telegram-Webhook ———
+TELEGRAM_WEBHOOK_ENABLED = _config['telegram_webhook_enabled']
+TELEGRAM_WEBHOOK_LISTEN = _config['telegram_webhook_listen']
+TELEGRAM_WEBHOOK_PORT = _config['telegram_webhook_port']
+TELEGRAM_WEBHOOK_PATH = _config['telegram_webhook_path']
+TELEGRAM_WEBHOOK_URL = _config['telegram_webhook_url']
+TELEGRAM_WEBHOOK_SECRET = _config['telegram_webhook_secret']
+
+# ——— Node-Datenbank ———
+NODE_DB_FILE = _config['node_db_file']
+NODE_DB_MAX_NODES = _config['node_db_max_nodes']
+NODE_DB_MAX_AGE = _config['node_db_max_age']
+NODE_DB_HEARD_RESOLUTION = _config['node_db_heard_resolution']
+
+# ——— Persistenz privater Chats ———
+PRIVATE_CHATS_FSYNC_INTERVAL = _config['private_chats_fsync_interval']
+PRIVATE_CHATS_COMPACT_THRESHOLD = _config['private_chats_compact_threshold']
+
+# ——— Metriken ———
+METRICS_ENABLED = _config['metrics_enabled']
+METRICS_LISTEN = _config['metrics_listen']
+METRICS_PORT = _config['metrics_port']
+
+# ——— Tracing ———
+TRACE_ENABLED = _config['trace_enabled']
+TRACE_SAMPLE_RATE = _config['trace_sample_rate']
+TRACE_FILE = _config['trace_file']
+TRACE_MAX_BYTES = _config['trace_max_bytes']
+TRACE_BACKUP_COUNT = _config['trace_backup_count']
+
+# ——— Konfiguration neu laden ———
+CONFIG_WATCH_INTERVAL = _config['config_watch_interval']
 
 def config_exists():
     """Prüft ob Konfigurationsdatei existiert"""
     return os.path.exists(CONFIG_FILE)
 
+def current():
+    """Aktueller Konfigurationsstand (ohne Dateizugriff, für Hot-Paths)"""
+    return _snapshot
+
+def subscribe(callback, keys=None):
+    """Registriert callback(snapshot, geänderte Schlüssel) für Änderungen an keys
+    (None = alle Schlüssel). Der Callback läuft im Thread bzw. Event-Loop des Neuladens."""
+    _subscribers.append((frozenset(keys) if keys is not None else None, callback))
+    return callback
+
+def _publish_constants(snapshot):
+    """Übernimmt den Stand in die Modul-Konstanten (für spätere 'from config import ...')"""
+    global _config, MESHTASTIC_HOSTS
+    _config = snapshot
+    module_globals = globals()
+    for key in DEFAULT_CONFIG:
+        module_globals[key.upper()] = snapshot[key]
+    MESHTASTIC_HOSTS = [MESHTASTIC_HOST] + [h for h in snapshot['meshtastic_hosts'] if h and h != MESHTASTIC_HOST]
+
 def reload_config():
-    """Lädt Konfiguration neu (für dynamische Updates)"""
-    global _config, MESHTASTIC_HOST, CHANNEL_NAME, CHANNEL_INDEX
-    global TELEGRAM_TOKEN, TELEGRAM_CHAT_ID
-    
-    _config = load_config()
-    MESHTASTIC_HOST = _config['meshtastic_host']
-    CHANNEL_NAME = _config['channel_name'] 
-    CHANNEL_INDEX = _config['channel_index']
-    TELEGRAM_TOKEN = _config['telegram_token']
-    TELEGRAM_CHAT_ID = _config['telegram_chat_id']
+    """Lädt Konfiguration neu (für dynamische Updates).
+    Ein ungültiger Stand wird verworfen, der bisherige bleibt aktiv.
+    Gibt die geänderten Schlüssel zurück."""
+    global _snapshot, _file_state
+    import file_logger
+
+    _file_state = _file_signature()
+    try:
+        values, errors = validate_config(read_config_file())
+        if errors:
+            raise ConfigError("; ".join(errors))
+    except (OSError, ValueError) as e:
+        file_logger.log_warning(f"Neue Konfiguration verworfen, bisherige bleibt aktiv: {e}")
+        return set()
+
+    old = _snapshot
+    new = ConfigSnapshot(values, old.version + 1)
+    changed = new.changed_keys(old)
+    if not changed:
+        return changed
+
+    _snapshot = new  # Atomarer Austausch: Leser sehen entweder den alten oder den neuen Stand
+    _publish_constants(new)
+    file_logger.log_info(f"Konfiguration neu geladen (Stand {new.version}): {', '.join(sorted(changed))}")
+
+    handled = set()
+    for keys, callback in list(_subscribers):
+        relevant = changed if keys is None else changed & keys
+        if not relevant:
+            continue
+        handled |= relevant
+        try:
+            callback(new, relevant)
+        except Exception as e:
+            file_logger.log_error("Config", f"Fehler beim Übernehmen von {', '.join(sorted(relevant))}: {e}")
+
+    restart_needed = (changed - handled) & set(DEFAULT_CONFIG)
+    if restart_needed:
+        file_logger.log_warning(f"Änderung wird erst nach einem Neustart wirksam: {', '.join(sorted(restart_needed))}")
+    return changed
+
+def check_for_changes():
+    """Lädt neu, wenn sich die Konfigurationsdatei geändert hat (ein stat-Aufruf)"""
+    if _file_signature() == _file_state:
+        return set()
+    return reload_config()
+
+async def watch_config(interval=None):
+    """Überwacht die Konfigurationsdatei und übernimmt Änderungen ohne Neustart"""
+    interval = CONFIG_WATCH_INTERVAL if interval is None else interval
+    if not interval:
+        return
+    while True:
+        await asyncio.sleep(interval)
+        check_for_changes()
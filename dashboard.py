@@ -5,12 +5,15 @@ Zeigt eine Live-Übersicht des Gateway-Status im Terminal an.
 """
 
 import asyncio
+import functools
 import os
 import sys
+import time
 import unicodedata
 from datetime import datetime, timedelta
-from collections import deque, defaultdict
 import logging
+from config import MAX_RECENT_NODES, NODE_ACTIVITY_MAX_NODES
+from node_activity import NodeActivityTable
 
 # Unicode-Support prüfen (wie in terminal_output.py)
 def can_display_unicode():
@@ -71,39 +74,99 @@ def get_status_chars():
             'arrow': '<->'
         }
 
+@functools.lru_cache(maxsize=4096)
+def char_width(char):
+    """Display-Breite eines einzelnen Zeichens (gecacht)"""
+    # Emoji und Wide-Charaktere haben Breite 2, normale Zeichen Breite 1
+    if unicodedata.east_asian_width(char) in ('F', 'W'):
+        return 2
+    if unicodedata.category(char) == 'So':  # Symbol, other (Emojis)
+        return 2
+    return 1
+
 def display_width(text):
     """Berechnet die tatsächliche Display-Breite eines Strings mit Emojis"""
-    width = 0
-    for char in text:
-        # Emoji und Wide-Charaktere haben Breite 2, normale Zeichen Breite 1
-        if unicodedata.east_asian_width(char) in ('F', 'W'):
-            width += 2
-        elif unicodedata.category(char) == 'So':  # Symbol, other (Emojis)
-            width += 2
-        else:
-            width += 1
-    return width
+    if text.isascii():
+        return len(text)
+    return sum(map(char_width, text))
 
 def pad_to_width(text, target_width):
     """Polstert einen String auf die gewünschte Display-Breite auf"""
+    if text.isascii():
+        # Schneller Weg: jedes Zeichen hat Breite 1
+        return text[:target_width].ljust(target_width)
+    
     current_width = display_width(text)
     if current_width >= target_width:
         # Text ist zu lang - kürzen
-        result = ""
         width = 0
-        for char in text:
-            char_width = 2 if (unicodedata.east_asian_width(char) in ('F', 'W') or 
-                             unicodedata.category(char) == 'So') else 1
-            if width + char_width > target_width:
-                break
-            result += char
-            width += char_width
-        return result
+        for i, char in enumerate(text):
+            width += char_width(char)
+            if width > target_width:
+                return text[:i] + " " * (target_width - width + char_width(char))
+        return text
     else:
         # Text ist zu kurz - auffüllen
         padding_needed = target_width - current_width
         return text + " " * padding_needed
 
+FULL_REDRAW_INTERVAL = 30  # Spätestens nach so vielen Sekunden wird das Dashboard komplett neu gezeichnet
+
+class DashboardRenderer:
+    """Zeichnet nur geänderte Zeilen neu (ANSI-Cursor-Adressierung statt Bildschirm löschen)"""
+    
+    def __init__(self, stream=None, full_redraw_interval=FULL_REDRAW_INTERVAL):
+        self.stream = stream
+        self.full_redraw_interval = full_redraw_interval
+        self._previous = None
+        self._last_full_redraw = 0.0
+        if os.name == 'nt':
+            os.system('')  # Aktiviert die ANSI-Verarbeitung in der Windows-Konsole
+    
+    def invalidate(self):
+        """Erzwingt beim nächsten Aufruf ein vollständiges Neuzeichnen"""
+        self._previous = None
+    
+    def render(self, lines):
+        """Gibt die Zeilen aus; gibt die Anzahl tatsächlich geschriebener Zeilen zurück"""
+        stream = self.stream or sys.stdout
+        output = []
+        now = time.monotonic()
+        if (self._previous is None or len(self._previous) != len(lines)
+                or now - self._last_full_redraw >= self.full_redraw_interval):
+            output.append("\x1b[2J")  # Bildschirm löschen (auch Ausgaben, die nicht vom Dashboard stammen)
+            changed = range(len(lines))
+            self._last_full_redraw = now
+        else:
+            changed = [i for i, (line, old) in enumerate(zip(lines, self._previous)) if line != old]
+        
+        for i in changed:
+            output.append(f"\x1b[{i + 1};1H{lines[i]}\x1b[K")
+        
+        if output:
+            # Cursor unter das Dashboard setzen
+            output.append(f"\x1b[{len(lines) + 1};1H")
+            stream.write("".join(output))
+            stream.flush()
+        self._previous = list(lines)
+        return len(changed)
+
+class _OutputWatcher:
+    """Ersetzt sys.stdout, solange das Dashboard läuft: fremde Ausgaben (print) verschieben
+    den Bildschirm, daher wird danach das ganze Dashboard neu gezeichnet"""
+    
+    def __init__(self, stream, renderer):
+        self._stream = stream
+        self._renderer = renderer
+    
+    def write(self, text):
+        if text:
+            self._renderer.invalidate()
+        return self._stream.write(text)
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
 # Dashboard-Daten (Thread-safe)
 class DashboardData:
     def __init__(self):
@@ -121,10 +184,18 @@ class DashboardData:
         self.messages_mesh_to_tg = 0
         self.private_messages = 0
         
+        self.outbound_queue_depth = 0
+        self.outbound_budget_used = 0.0
+        self.ingress_queue_depth = 0
+        self.ingress_wait_avg = 0.0
+        self.ingress_dropped = 0
+        self.dedupe_hits = 0
+        self.dedupe_misses = 0
+        self.dedupe_size = 0
+        
         self.last_message = {"time": None, "sender": "", "text": ""}
         
-        self.active_nodes = deque(maxlen=10)  # Letzte 10 aktive Nodes
-        self.node_last_seen = {}  # Node ID -> letzter Zeitstempel
+        self.node_activity = NodeActivityTable(NODE_ACTIVITY_MAX_NODES)  # Alle gesehenen Nodes (O(1)-Updates, LRU-Obergrenze)
         
         self.channel_name = ""
         self.channel_index = 1
@@ -164,131 +235,168 @@ def clear_screen():
     """Löscht den Bildschirm"""
     os.system('cls' if os.name == 'nt' else 'clear')
 
+def build_dashboard_lines():
+    """Erzeugt die Zeilen des Dashboards"""
+    lines = []
+    
+    # Definiere feste Breite für das Dashboard
+    DASHBOARD_WIDTH = 118  # Innere Breite
+    
+    # Hole die passenden Zeichen
+    box = get_box_chars()
+    status = get_status_chars()
+    
+    # Header
+    lines.append(box['top_left'] + box['horizontal'] * DASHBOARD_WIDTH + box['top_right'])
+    
+    # Projekt-Name (fett)
+    project_name = "Mesh2Gram"
+    project_padding = (DASHBOARD_WIDTH - len(project_name)) // 2
+    project_line = " " * project_padding + project_name + " " * (DASHBOARD_WIDTH - len(project_name) - project_padding)
+    lines.append(box['vertical'] + project_line + box['vertical'])
+    
+    # Haupttitel
+    header_text = f"MESHTASTIC {status['arrow']} TELEGRAM GATEWAY DASHBOARD"
+    header_padding = (DASHBOARD_WIDTH - len(header_text)) // 2
+    header_line = " " * header_padding + header_text + " " * (DASHBOARD_WIDTH - len(header_text) - header_padding)
+    lines.append(box['vertical'] + header_line + box['vertical'])
+    lines.append(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
+    
+    # Zeit und System-Info
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    uptime = get_uptime()
+    system_line = f" Zeit: {current_time}       Uptime: {uptime}             Host: {dashboard_data.host}"
+    system_line = pad_to_width(system_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + system_line + box['vertical'])
+    lines.append(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
+    
+    # Verbindungsstatus
+    mesh_status = "Verbunden" if dashboard_data.meshtastic_connected else "Getrennt"
+    mesh_emoji = status['connected'] if dashboard_data.meshtastic_connected else status['disconnected']
+    mesh_duration = get_connection_duration(dashboard_data.meshtastic_connect_time)
+    
+    # Zusätzliche Info wenn getrennt
+    if not dashboard_data.meshtastic_connected and dashboard_data.host:
+        mesh_status = f"Getrennt ({dashboard_data.host} nicht erreichbar)"
+    
+    tg_status = f"Verbunden ({dashboard_data.telegram_bot_name})" if dashboard_data.telegram_connected else "Getrennt"
+    tg_emoji = status['connected'] if dashboard_data.telegram_connected else status['disconnected']
+    
+    mesh_line = f" Meshtastic: {mesh_emoji} {mesh_status}          Dauer: {mesh_duration}"
+    mesh_line = pad_to_width(mesh_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + mesh_line + box['vertical'])
+    
+    tg_line = f" Telegram:   {tg_emoji} {tg_status}        Unterbr.: {dashboard_data.meshtastic_disconnections}"
+    tg_line = pad_to_width(tg_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + tg_line + box['vertical'])
+    
+    last_disconnection = get_time_since(dashboard_data.meshtastic_last_disconnection)
+    disconn_line = f" Letzte Unterbrechung: {last_disconnection}"
+    disconn_line = pad_to_width(disconn_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + disconn_line + box['vertical'])
+    lines.append(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
+    
+    # Kanal-Info
+    channel_line = f" Kanal: '{dashboard_data.channel_name}' (Index: {dashboard_data.channel_index})"
+    channel_line = pad_to_width(channel_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + channel_line + box['vertical'])
+    lines.append(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
+    
+    # Nachrichten-Statistiken
+    arrow_tg_mesh = "→" if UNICODE_SUPPORT else "->"
+    arrow_mesh_tg = "→" if UNICODE_SUPPORT else "->"
+    
+    msg_tg_line = f" Nachrichten Telegram {arrow_tg_mesh} Meshtastic: {dashboard_data.messages_tg_to_mesh}"
+    msg_tg_line = pad_to_width(msg_tg_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + msg_tg_line + box['vertical'])
+    
+    msg_mesh_line = f" Nachrichten Meshtastic {arrow_mesh_tg} Telegram: {dashboard_data.messages_mesh_to_tg}"
+    msg_mesh_line = pad_to_width(msg_mesh_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + msg_mesh_line + box['vertical'])
+    
+    msg_priv_line = f" Private Nachrichten:                {dashboard_data.private_messages}"
+    msg_priv_line = pad_to_width(msg_priv_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + msg_priv_line + box['vertical'])
+    
+    outbound_line = (f" Funk-Warteschlange:                 {dashboard_data.outbound_queue_depth}"
+                     f"          Airtime-Budget genutzt: {dashboard_data.outbound_budget_used * 100:.0f}%")
+    outbound_line = pad_to_width(outbound_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + outbound_line + box['vertical'])
+    
+    ingress_line = (f" Empfangs-Warteschlange:             {dashboard_data.ingress_queue_depth}"
+                    f"          Wartezeit Ø {dashboard_data.ingress_wait_avg * 1000:.0f} ms"
+                    f"  verworfen: {dashboard_data.ingress_dropped}")
+    ingress_line = pad_to_width(ingress_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + ingress_line + box['vertical'])
+    
+    dedupe_total = dashboard_data.dedupe_hits + dashboard_data.dedupe_misses
+    dedupe_ratio = dashboard_data.dedupe_hits / dedupe_total * 100 if dedupe_total else 0
+    dedupe_line = (f" Duplikate verworfen:                {dashboard_data.dedupe_hits} ({dedupe_ratio:.0f}%)"
+                   f"          Cache-Einträge: {dashboard_data.dedupe_size}")
+    dedupe_line = pad_to_width(dedupe_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + dedupe_line + box['vertical'])
+    lines.append(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
+    
+    # Letzte Nachricht
+    if dashboard_data.last_message["time"]:
+        last_msg_time = dashboard_data.last_message["time"].strftime("%H:%M:%S")
+        last_msg_text = dashboard_data.last_message["text"][:50]  # Kürzen falls zu lang
+        last_msg_line = f" Letzte Nachricht ({last_msg_time}): {dashboard_data.last_message['sender']}: {last_msg_text}"
+    else:
+        last_msg_line = " Letzte Nachricht: Keine"
+    last_msg_line = pad_to_width(last_msg_line, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + last_msg_line + box['vertical'])
+    lines.append(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
+    
+    # Aktive Nodes (die Tabelle liefert die neuesten bzw. aktivsten direkt, ohne zu sortieren)
+    node_activity = dashboard_data.node_activity
+    nodes_header = f" Letzte {MAX_RECENT_NODES} aktive Nodes (gesehen: {len(node_activity)}):"
+    nodes_header = pad_to_width(nodes_header, DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + nodes_header + box['vertical'])
+    
+    recent_nodes = node_activity.recent(MAX_RECENT_NODES)
+    for i in range(MAX_RECENT_NODES):
+        if i < len(recent_nodes):
+            node = recent_nodes[i]
+            time_str = datetime.fromtimestamp(node.last_seen).strftime("%H:%M:%S")
+            node_line = f"   {i+1}. {node.name} (ID: {node.node_id}) - {time_str}  {node.count} Nachr."
+            if node.snr is not None:
+                node_line += f"  SNR {node.snr:.1f} dB"
+            if node.rssi is not None:
+                node_line += f"  RSSI {node.rssi} dBm"
+            if node.hops is not None:
+                node_line += f"  {node.hops} Hops"
+        else:
+            node_line = ""
+        node_line = pad_to_width(node_line, DASHBOARD_WIDTH)
+        lines.append(box['vertical'] + node_line + box['vertical'])
+    
+    busiest = ", ".join(f"{node.name} ({node.count})" for node in node_activity.busiest(3))
+    busiest_line = pad_to_width(f" Aktivste Nodes: {busiest or '-'}", DASHBOARD_WIDTH)
+    lines.append(box['vertical'] + busiest_line + box['vertical'])
+    
+    # Credits-Line unten rechts
+    credits_text = "vipe coded by Pilotkosinus with Claude Sonnet 4 Agent"
+    credits_padding = DASHBOARD_WIDTH - len(credits_text)
+    credits_line = " " * credits_padding + credits_text
+    lines.append(box['vertical'] + credits_line + box['vertical'])
+    
+    lines.append(box['bottom_left'] + box['horizontal'] * DASHBOARD_WIDTH + box['bottom_right'])
+    lines.append("")
+    lines.append("Strg+C zum Beenden")
+    return lines
+
+_renderer = DashboardRenderer()
+
 def draw_dashboard():
-    """Zeichnet das Dashboard"""
+    """Zeichnet das Dashboard (nur geänderte Zeilen)"""
     try:
-        clear_screen()
-        
-        # Definiere feste Breite für das Dashboard
-        DASHBOARD_WIDTH = 118  # Innere Breite
-        
-        # Hole die passenden Zeichen
-        box = get_box_chars()
-        status = get_status_chars()
-        
-        # Header
-        print(box['top_left'] + box['horizontal'] * DASHBOARD_WIDTH + box['top_right'])
-        
-        # Projekt-Name (fett)
-        project_name = "Mesh2Gram"
-        project_padding = (DASHBOARD_WIDTH - len(project_name)) // 2
-        project_line = " " * project_padding + project_name + " " * (DASHBOARD_WIDTH - len(project_name) - project_padding)
-        print(box['vertical'] + project_line + box['vertical'])
-        
-        # Haupttitel
-        header_text = f"MESHTASTIC {status['arrow']} TELEGRAM GATEWAY DASHBOARD"
-        header_padding = (DASHBOARD_WIDTH - len(header_text)) // 2
-        header_line = " " * header_padding + header_text + " " * (DASHBOARD_WIDTH - len(header_text) - header_padding)
-        print(box['vertical'] + header_line + box['vertical'])
-        print(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
-        
-        # Zeit und System-Info
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        uptime = get_uptime()
-        system_line = f" Zeit: {current_time}       Uptime: {uptime}             Host: {dashboard_data.host}"
-        system_line = pad_to_width(system_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + system_line + box['vertical'])
-        print(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
-        
-        # Verbindungsstatus
-        mesh_status = "Verbunden" if dashboard_data.meshtastic_connected else "Getrennt"
-        mesh_emoji = status['connected'] if dashboard_data.meshtastic_connected else status['disconnected']
-        mesh_duration = get_connection_duration(dashboard_data.meshtastic_connect_time)
-        
-        # Zusätzliche Info wenn getrennt
-        if not dashboard_data.meshtastic_connected and dashboard_data.host:
-            mesh_status = f"Getrennt ({dashboard_data.host} nicht erreichbar)"
-        
-        tg_status = f"Verbunden ({dashboard_data.telegram_bot_name})" if dashboard_data.telegram_connected else "Getrennt"
-        tg_emoji = status['connected'] if dashboard_data.telegram_connected else status['disconnected']
-        
-        mesh_line = f" Meshtastic: {mesh_emoji} {mesh_status}          Dauer: {mesh_duration}"
-        mesh_line = pad_to_width(mesh_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + mesh_line + box['vertical'])
-        
-        tg_line = f" Telegram:   {tg_emoji} {tg_status}        Unterbr.: {dashboard_data.meshtastic_disconnections}"
-        tg_line = pad_to_width(tg_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + tg_line + box['vertical'])
-        
-        last_disconnection = get_time_since(dashboard_data.meshtastic_last_disconnection)
-        disconn_line = f" Letzte Unterbrechung: {last_disconnection}"
-        disconn_line = pad_to_width(disconn_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + disconn_line + box['vertical'])
-        print(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
-        
-        # Kanal-Info
-        channel_line = f" Kanal: '{dashboard_data.channel_name}' (Index: {dashboard_data.channel_index})"
-        channel_line = pad_to_width(channel_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + channel_line + box['vertical'])
-        print(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
-        
-        # Nachrichten-Statistiken
-        arrow_tg_mesh = "→" if UNICODE_SUPPORT else "->"
-        arrow_mesh_tg = "→" if UNICODE_SUPPORT else "->"
-        
-        msg_tg_line = f" Nachrichten Telegram {arrow_tg_mesh} Meshtastic: {dashboard_data.messages_tg_to_mesh}"
-        msg_tg_line = pad_to_width(msg_tg_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + msg_tg_line + box['vertical'])
-        
-        msg_mesh_line = f" Nachrichten Meshtastic {arrow_mesh_tg} Telegram: {dashboard_data.messages_mesh_to_tg}"
-        msg_mesh_line = pad_to_width(msg_mesh_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + msg_mesh_line + box['vertical'])
-        
-        msg_priv_line = f" Private Nachrichten:                {dashboard_data.private_messages}"
-        msg_priv_line = pad_to_width(msg_priv_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + msg_priv_line + box['vertical'])
-        print(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
-        
-        # Letzte Nachricht
-        if dashboard_data.last_message["time"]:
-            last_msg_time = dashboard_data.last_message["time"].strftime("%H:%M:%S")
-            last_msg_text = dashboard_data.last_message["text"][:50]  # Kürzen falls zu lang
-            last_msg_line = f" Letzte Nachricht ({last_msg_time}): {dashboard_data.last_message['sender']}: {last_msg_text}"
-        else:
-            last_msg_line = " Letzte Nachricht: Keine"
-        last_msg_line = pad_to_width(last_msg_line, DASHBOARD_WIDTH)
-        print(box['vertical'] + last_msg_line + box['vertical'])
-        print(box['cross'] + box['horizontal'] * DASHBOARD_WIDTH + box['cross_right'])
-        
-        # Aktive Nodes
-        nodes_header = " Letzte 10 aktive Nodes:"
-        nodes_header = pad_to_width(nodes_header, DASHBOARD_WIDTH)
-        print(box['vertical'] + nodes_header + box['vertical'])
-        
-        # Sortiere Nodes nach letzter Aktivität
-        sorted_nodes = sorted(dashboard_data.active_nodes, key=lambda x: x['last_seen'], reverse=True)
-        
-        for i in range(10):
-            if i < len(sorted_nodes):
-                node = sorted_nodes[i]
-                time_str = node['last_seen'].strftime("%H:%M:%S")
-                node_line = f"   {i+1}. {node['name']} (ID: {node['id']}) - {time_str}"
-            else:
-                node_line = ""
-            node_line = pad_to_width(node_line, DASHBOARD_WIDTH)
-            print(box['vertical'] + node_line + box['vertical'])
-        
-        # Credits-Line unten rechts
-        credits_text = "vipe coded by Pilotkosinus with Claude Sonnet 4 Agent"
-        credits_padding = DASHBOARD_WIDTH - len(credits_text)
-        credits_line = " " * credits_padding + credits_text
-        print(box['vertical'] + credits_line + box['vertical'])
-        
-        print(box['bottom_left'] + box['horizontal'] * DASHBOARD_WIDTH + box['bottom_right'])
-        print("\nStrg+C zum Beenden")
+        _renderer.render(build_dashboard_lines())
         
     except UnicodeEncodeError as e:
         # Fallback bei Unicode-Problemen
+        _renderer.invalidate()
+        clear_screen()
         print("Dashboard: Unicode-Fehler erkannt, verwende ASCII-Modus")
         print("=" * 80)
         print("MESH2GRAM - MESHTASTIC <-> TELEGRAM GATEWAY")
@@ -344,11 +452,13 @@ def update_meshtastic_connection(connected, host=None):
             dashboard_data.host = host
 
 def force_dashboard_update():
-    """Erzwingt ein sofortiges Dashboard-Update (für kritische Statusänderungen)"""
+    """Fordert ein baldiges Dashboard-Update an (für kritische Statusänderungen).
+    Mehrere Anforderungen kurz hintereinander werden zu einem Neuzeichnen zusammengefasst."""
+    if _redraw_event is None or _redraw_loop is None:
+        return  # Dashboard läuft nicht (z.B. Setup-Modus)
     try:
-        # Dashboard direkt einmal zeichnen für sofortige Anzeige
-        draw_dashboard()
-        logging.debug("Dashboard-Sofort-Update durchgeführt")
+        _redraw_loop.call_soon_threadsafe(_redraw_event.set)
+        logging.debug("Dashboard-Sofort-Update angefordert")
     except Exception as e:
         logging.warning(f"Dashboard-Sofort-Update fehlgeschlagen: {e}")
 
@@ -389,28 +499,60 @@ def add_private_message():
     """Registriert private Nachricht"""
     dashboard_data.private_messages += 1
 
-def update_node_activity(node_id, node_name):
-    """Aktualisiert Node-Aktivität"""
-    now = datetime.now()
-    
-    # Prüfe ob Node bereits in der Liste ist
-    for i, node in enumerate(dashboard_data.active_nodes):
-        if node['id'] == node_id:
-            # Update existing node
-            dashboard_data.active_nodes[i]['last_seen'] = now
-            dashboard_data.active_nodes[i]['name'] = node_name  # Update name falls geändert
-            return
-    
-    # Neuer Node
-    new_node = {
-        'id': node_id,
-        'name': node_name,
-        'last_seen': now
-    }
-    dashboard_data.active_nodes.append(new_node)
+def update_outbound_queue(depth, budget_used):
+    """Aktualisiert Länge der Funk-Warteschlange und genutztes Airtime-Budget"""
+    dashboard_data.outbound_queue_depth = depth
+    dashboard_data.outbound_budget_used = budget_used
+
+def update_ingress_queue(depth, wait_avg, dropped):
+    """Aktualisiert Länge, mittlere Wartezeit und Verwürfe der Empfangs-Warteschlange"""
+    dashboard_data.ingress_queue_depth = depth
+    dashboard_data.ingress_wait_avg = wait_avg
+    dashboard_data.ingress_dropped = dropped
+
+def update_dedupe_stats(hits, misses, size):
+    """Aktualisiert Treffer/Fehlschläge und Größe des Duplikat-Caches"""
+    dashboard_data.dedupe_hits = hits
+    dashboard_data.dedupe_misses = misses
+    dashboard_data.dedupe_size = size
+
+def update_node_activity(node_id, node_name, snr=None, rssi=None, hops=None):
+    """Aktualisiert Node-Aktivität (O(1), auch bei tausenden Nodes)"""
+    dashboard_data.node_activity.update(node_id, node_name, snr, rssi, hops)
+
+# Angeforderte Sofort-Updates (wird von dashboard_loop angelegt)
+_redraw_event = None
+_redraw_loop = None
+MIN_REDRAW_INTERVAL = 0.25  # Mindestabstand zwischen zwei Neuzeichnungen in Sekunden
+
+async def _wait_for_next_frame():
+    """Wartet bis zum nächsten regulären Frame oder einem angeforderten Sofort-Update"""
+    try:
+        await asyncio.wait_for(_redraw_event.wait(), timeout=1)
+        # Entprellen: weitere Anforderungen kurz sammeln
+        await asyncio.sleep(MIN_REDRAW_INTERVAL)
+    except asyncio.TimeoutError:
+        pass
+    _redraw_event.clear()
 
 async def dashboard_loop():
     """Hauptschleife für Dashboard-Updates"""
+    global _redraw_event, _redraw_loop
+    _redraw_event = asyncio.Event()
+    _redraw_loop = asyncio.get_running_loop()
+    
+    # Das Dashboard schreibt direkt in die Konsole, alle anderen Ausgaben laufen über den Watcher
+    console = sys.stdout
+    _renderer.stream = console
+    sys.stdout = _OutputWatcher(console, _renderer)
+    try:
+        await _dashboard_frames()
+    finally:
+        sys.stdout = console
+        _renderer.stream = None
+
+async def _dashboard_frames():
+    """Zeichnet die Frames des Dashboards bis zum Abbruch"""
     last_update_time = datetime.now()
     error_count = 0
     
@@ -428,7 +570,7 @@ async def dashboard_loop():
             last_update_time = current_time
             error_count = 0  # Reset error count nach erfolgreichem Update
             
-            await asyncio.sleep(1)  # Update jede Sekunde
+            await _wait_for_next_frame()  # Update jede Sekunde oder bei Statusänderung
             
         except asyncio.CancelledError:
             break
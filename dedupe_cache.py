@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Duplikat-Cache für das Meshtastic ↔ Telegram Gateway
+Merkt sich bereits verarbeitete Pakete über (from, id) für eine begrenzte
+Zeit. Die Größe ist nach oben begrenzt; bei Überlauf fallen die ältesten
+Einträge zuerst heraus. Treffer und Fehlschläge werden gezählt, damit sich
+Größe und Ablaufzeit an das Netz anpassen lassen.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class DedupeCache:
+    """Größenbegrenzter Cache mit Ablaufzeit für Paket-Schlüssel"""
+
+    def __init__(self, max_entries=4096, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0        # Duplikate erkannt
+        self.misses = 0      # Neue Pakete
+        self.evictions = 0   # Vorzeitig verdrängte Einträge (Cache zu klein)
+
+        # Schlüssel -> Zeitpunkt der ersten Sichtung; Einfügereihenfolge = Ablaufreihenfolge
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def check_and_add(self, key, now=None):
+        """True, wenn der Schlüssel innerhalb der Ablaufzeit schon gesehen wurde; sonst wird er gemerkt"""
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        if key in self._entries:
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        self._entries[key] = now
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return False
+
+    def hit_ratio(self):
+        """Anteil erkannter Duplikate an allen Prüfungen"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Kennzahlen zur Dimensionierung"""
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hit_ratio()
+        }
+
+    def _expire(self, now):
+        """Entfernt abgelaufene Einträge vom ältesten Ende her"""
+        entries = self._entries
+        while entries:
+            key, seen_at = next(iter(entries.items()))
+            if now - seen_at <= self.ttl:
+                break
+            entries.popitem(last=False)
@@ -2,12 +2,36 @@
 """
 Logging-Modul für das Meshtastic ↔ Telegram Gateway
 Schreibt alle Debug-Meldungen in Log-Dateien.
+Die Einträge werden über eine Queue an einen Hintergrund-Thread übergeben,
+der die Datei schreibt; formatiert wird erst dort und nur bei aktivem Level.
 """
 
+import atexit
 import logging
 import os
+import queue
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import config
+from config import FILE_LOG_LEVEL
+
+LOG_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL
+}
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler, der die Formatierung dem Writer-Thread überlässt"""
+    
+    def prepare(self, record):
+        # Standard-QueueHandler formatiert bereits im aufrufenden Thread -
+        # wir bleiben im selben Prozess und reichen den Record unverändert weiter
+        return record
+
+_log_listener = None
 
 def setup_file_logging():
     """Konfiguriert das File-Logging"""
@@ -34,30 +58,43 @@ def setup_file_logging():
     )
     file_handler.setFormatter(file_formatter)
     
+    # Queue-Pipeline: Aufrufer legen nur Records ab, der Listener-Thread schreibt
+    global _log_listener
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(stop_file_logging)
+    
     # Logger konfigurieren
     logger = logging.getLogger('gateway')
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(file_handler)
+    logger.setLevel(LOG_LEVELS.get(str(FILE_LOG_LEVEL).upper(), logging.DEBUG))
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    logger.propagate = False  # Keine zusätzliche (synchrone) Ausgabe über den Root-Logger
     
     return logger
 
+def stop_file_logging():
+    """Schreibt ausstehende Log-Einträge und beendet den Writer-Thread"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
 # Globaler Logger
 file_logger = setup_file_logging()
 
-def log_to_file(level, message):
-    """Schreibt eine Nachricht in die Log-Datei"""
-    if level.upper() == 'DEBUG':
-        file_logger.debug(message)
-    elif level.upper() == 'INFO':
-        file_logger.info(message)
-    elif level.upper() == 'WARNING':
-        file_logger.warning(message)
-    elif level.upper() == 'ERROR':
-        file_logger.error(message)
-    elif level.upper() == 'CRITICAL':
-        file_logger.critical(message)
-    else:
-        file_logger.info(message)
+def _on_log_level_changed(snapshot, changed):
+    """Übernimmt ein geändertes file_log_level ohne Neustart"""
+    file_logger.setLevel(LOG_LEVELS.get(str(snapshot.file_log_level).upper(), logging.DEBUG))
+
+config.subscribe(_on_log_level_changed, ('file_log_level',))
+
+def log_to_file(level, message, *args):
+    """Schreibt eine Nachricht in die Log-Datei.
+    Optionale args werden erst im Writer-Thread eingesetzt (message % args)."""
+    level_no = LOG_LEVELS.get(level.upper(), logging.INFO)
+    if file_logger.isEnabledFor(level_no):
+        file_logger.log(level_no, message, *args)
 
 def log_startup():
     """Loggt Gateway-Start"""
@@ -88,24 +125,24 @@ def log_telegram_connected(bot_name, username):
 
 def log_message_received(source, sender, text):
     """Loggt empfangene Nachricht"""
-    log_to_file('DEBUG', f'[{source}] Nachricht von {sender}: {text}')
+    log_to_file('DEBUG', '[%s] Nachricht von %s: %s', source, sender, text)
 
 def log_message_sent(destination, text):
     """Loggt gesendete Nachricht"""
-    log_to_file('DEBUG', f'Nachricht gesendet an {destination}: {text}')
+    log_to_file('DEBUG', 'Nachricht gesendet an %s: %s', destination, text)
 
 def log_error(component, error):
     """Loggt Fehler"""
     log_to_file('ERROR', f'[{component}] {error}')
 
-def log_debug(message):
+def log_debug(message, *args):
     """Loggt Debug-Nachricht"""
-    log_to_file('DEBUG', message)
+    log_to_file('DEBUG', message, *args)
 
-def log_info(message):
+def log_info(message, *args):
     """Loggt Info-Nachricht"""
-    log_to_file('INFO', message)
+    log_to_file('INFO', message, *args)
 
-def log_warning(message):
+def log_warning(message, *args):
     """Loggt Warning-Nachricht"""
-    log_to_file('WARNING', message)
+    log_to_file('WARNING', message, *args)
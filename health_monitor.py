@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Health-Monitor-Modul für das Meshtastic ↔ Telegram Gateway
+Ermittelt den Verbindungszustand zum Meshtastic-Gerät überwiegend aus
+passiven Signalen (empfangene Pakete, Verbindungs-Events der Bibliothek,
+TCP-Keepalive). Aktive Prüfungen (Heartbeat über die bestehende Verbindung,
+zuletzt ein TCP-Test auf Port 4403) erfolgen nur, wenn diese Signale ausbleiben.
+Alle Komponenten lesen denselben Zustand.
+"""
+
+import asyncio
+import socket
+import time
+
+import file_logger
+
+STATE_CONNECTED = 'connected'        # Verbindung aktiv, Signale vorhanden
+STATE_QUIET = 'quiet'                # Verbindung besteht, aber länger keine Signale
+STATE_DISCONNECTED = 'disconnected'  # Keine Verbindung
+
+MESHTASTIC_TCP_PORT = 4403
+
+
+async def probe_tcp_port(host, timeout=3):
+    """Aktiver Test: ist der TCP-Port des Geräts erreichbar? (belegt kurz einen Client-Slot)"""
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, MESHTASTIC_TCP_PORT), timeout=timeout
+        )
+    except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
+        return False
+    except Exception:
+        return False
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except Exception:
+        pass  # Ignoriere Fehler beim Schließen
+    return True
+
+
+def enable_tcp_keepalive(sock, idle=30, interval=10, count=3):
+    """Aktiviert TCP-Keepalive, damit der Kernel tote Verbindungen selbst erkennt"""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+        if hasattr(socket, 'TCP_KEEPINTVL'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval)
+        if hasattr(socket, 'TCP_KEEPCNT'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, count)
+        return True
+    except (OSError, AttributeError) as e:
+        file_logger.log_warning(f"TCP-Keepalive konnte nicht aktiviert werden: {e}")
+        return False
+
+
+class MeshtasticHealth:
+    """Gemeinsamer Verbindungszustand eines Meshtastic-Geräts"""
+
+    def __init__(self, host, quiet_threshold=120, probe_interval=60, probe_timeout=2):
+        self.host = host
+        self.quiet_threshold = quiet_threshold
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+
+        self.state = STATE_DISCONNECTED
+        self.last_activity = 0.0
+        self.last_probe = 0.0
+        self.state_since = time.monotonic()
+        self.probes_sent = 0
+
+        self._interface = None
+        self._loop = None
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """Registriert einen Listener callback(alter_zustand, neuer_zustand) (läuft im Event-Loop)"""
+        self._listeners.append(callback)
+
+    @property
+    def is_connected(self):
+        return self.state != STATE_DISCONNECTED
+
+    def seconds_since_activity(self):
+        """Sekunden seit dem letzten passiven Lebenszeichen"""
+        return time.monotonic() - self.last_activity if self.last_activity else float('inf')
+
+    # ——— Passive Signale ———
+
+    def record_activity(self):
+        """Lebenszeichen (empfangenes Paket o.ä.) - darf aus jedem Thread aufgerufen werden"""
+        self.last_activity = time.monotonic()
+
+    def on_receive(self, packet, interface):
+        """PubSub-Listener für 'meshtastic.receive' (alle Pakete)"""
+        if interface is self._interface:
+            self.record_activity()
+
+    def on_connection_lost(self, interface):
+        """PubSub-Listener für 'meshtastic.connection.lost' (Reader-Thread der Bibliothek)"""
+        if interface is self._interface and self._loop:
+            self._loop.call_soon_threadsafe(self.mark_disconnected, "Verbindung von der Bibliothek als verloren gemeldet")
+
+    def attach(self, interface, loop=None):
+        """Verknüpft den Monitor mit einer neu aufgebauten Verbindung"""
+        self._interface = interface
+        self._loop = loop or asyncio.get_running_loop()
+        sock = getattr(interface, 'socket', None)
+        if sock is not None:
+            enable_tcp_keepalive(sock)
+        self.record_activity()
+        self._set_state(STATE_CONNECTED)
+
+    def detach(self):
+        """Löst die Verbindung vom Monitor (z.B. beim Schließen)"""
+        self._interface = None
+        self._set_state(STATE_DISCONNECTED)
+
+    def mark_disconnected(self, reason=""):
+        """Markiert die Verbindung als getrennt (z.B. nach Sendefehlern)"""
+        if self.state != STATE_DISCONNECTED:
+            file_logger.log_warning(f"Meshtastic-Verbindung zu {self.host} als getrennt markiert: {reason}")
+        self._set_state(STATE_DISCONNECTED)
+
+    # ——— Aktive Prüfungen (nur wenn passive Signale ausbleiben) ———
+
+    async def evaluate(self):
+        """Bewertet den Zustand; prüft aktiv nur bei längerer Funkstille"""
+        if self.state == STATE_DISCONNECTED or self._interface is None:
+            return self.state
+
+        quiet_for = self.seconds_since_activity()
+        if quiet_for < self.quiet_threshold:
+            self._set_state(STATE_CONNECTED)
+            return self.state
+
+        self._set_state(STATE_QUIET)
+        if time.monotonic() - self.last_probe < self.probe_interval:
+            return self.state
+        self.last_probe = time.monotonic()
+
+        # 1) Heartbeat über die bestehende Verbindung (kein zusätzlicher Client-Slot)
+        if not await self._send_heartbeat():
+            self.mark_disconnected("Heartbeat fehlgeschlagen")
+            return self.state
+
+        # 2) Erst nach sehr langer Funkstille zusätzlich den Port testen
+        if quiet_for >= 2 * self.quiet_threshold:
+            if await self.probe():
+                self.record_activity()
+            else:
+                self.mark_disconnected("Gerät antwortet nicht")
+        return self.state
+
+    async def probe(self, timeout=None):
+        """Aktiver TCP-Test auf Port 4403"""
+        self.probes_sent += 1
+        return await probe_tcp_port(self.host, timeout or self.probe_timeout)
+
+    async def _send_heartbeat(self):
+        """Sendet einen Heartbeat der Bibliothek über die bestehende Verbindung"""
+        interface = self._interface
+        send_heartbeat = getattr(interface, 'sendHeartbeat', None)
+        if send_heartbeat is None:
+            return True  # Ältere Bibliothek: nur passive Signale verfügbar
+        try:
+            await asyncio.wait_for(asyncio.to_thread(send_heartbeat), timeout=self.probe_timeout * 5)
+            return True
+        except Exception as e:
+            file_logger.log_warning(f"Meshtastic-Heartbeat fehlgeschlagen: {e}")
+            return False
+
+    def _set_state(self, new_state):
+        """Setzt den Zustand und benachrichtigt die Listener bei Änderungen"""
+        old_state = self.state
+        if old_state == new_state:
+            return
+        self.state = new_state
+        self.state_since = time.monotonic()
+        file_logger.log_info(f"Meshtastic-Verbindungszustand ({self.host}): {old_state} -> {new_state}")
+        for callback in list(self._listeners):
+            try:
+                callback(old_state, new_state)
+            except Exception as e:
+                file_logger.log_error("MeshtasticHealth", str(e))
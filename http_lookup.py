@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+HTTP-Abfragen für Befehle wie !btc
+Eine gemeinsame aiohttp-Session für die gesamte Laufzeit (Verbindungen werden
+wiederverwendet), ein Cache mit Ablaufzeit pro URL und Bündelung gleichzeitiger
+Anfragen: Fragen mehrere Nodes gleichzeitig, gibt es nur eine Anfrage an die
+externe API. Ist die API nicht erreichbar, wird der letzte bekannte Wert
+geliefert (bis zu stale_max_age Sekunden alt).
+"""
+
+import asyncio
+import time
+
+import file_logger
+
+
+class LookupFailed(Exception):
+    """Abfrage fehlgeschlagen und kein (ausreichend aktueller) Wert im Cache"""
+
+
+class CachedValue:
+    """Ergebnis einer Abfrage mit Abrufzeitpunkt"""
+    __slots__ = ('data', 'fetched_at', 'stale')
+
+    def __init__(self, data, fetched_at, stale=False):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.stale = stale  # True, wenn die API nicht erreichbar war und der alte Wert geliefert wird
+
+    def age(self):
+        """Alter des Werts in Sekunden"""
+        return time.monotonic() - self.fetched_at
+
+
+class LookupClient:
+    """Gemeinsamer HTTP-Client mit Cache, Request-Bündelung und Rückfall auf den letzten Wert"""
+
+    def __init__(self, timeout=10, cache_ttl=60, stale_max_age=3600, max_connections=4):
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.stale_max_age = stale_max_age
+        self.max_connections = max_connections
+        self._session = None
+        self._cache = {}     # URL -> CachedValue
+        self._inflight = {}  # URL -> laufender Abruf (asyncio.Task)
+
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.failures = 0
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'coalesced': self.coalesced,
+            'stale_served': self.stale_served,
+            'failures': self.failures,
+        }
+
+    def _get_session(self):
+        """Erstellt die Session beim ersten Gebrauch (muss im Event-Loop geschehen).
+        aiohttp wird erst hier geladen, damit der Start des Gateways nicht darauf wartet."""
+        import aiohttp
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                headers={'User-Agent': 'Mesh2Gram'}
+            )
+        return self._session
+
+    async def close(self):
+        """Schließt die Session (beim Beenden des Gateways)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def get_json(self, url, ttl=None):
+        """Liefert die JSON-Antwort einer URL als CachedValue.
+        Innerhalb der Ablaufzeit aus dem Cache; gleichzeitige Aufrufe teilen sich einen Abruf."""
+        ttl = self.cache_ttl if ttl is None else ttl
+        cached = self._cache.get(url)
+        if cached is not None and cached.age() < ttl:
+            self.cache_hits += 1
+            return cached
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._load(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        else:
+            self.coalesced += 1
+        # shield: bricht ein Aufrufer ab, läuft der gemeinsame Abruf für die anderen weiter
+        return await asyncio.shield(task)
+
+    async def _load(self, url):
+        """Ruft die URL ab; bei Fehlern wird der letzte bekannte Wert geliefert"""
+        import aiohttp
+        self.requests += 1
+        try:
+            async with self._get_session().get(url) as response:
+                if response.status != 200:
+                    raise LookupFailed(f"HTTP {response.status}")
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, LookupFailed, ValueError) as e:
+            self.failures += 1
+            cached = self._cache.get(url)
+            if cached is not None and cached.age() < self.stale_max_age:
+                self.stale_served += 1
+                file_logger.log_warning(f"Abfrage {url} fehlgeschlagen ({e}), verwende Wert von vor {cached.age():.0f}s")
+                return CachedValue(cached.data, cached.fetched_at, stale=True)
+            raise LookupFailed(f"Abfrage {url} fehlgeschlagen: {e or type(e).__name__}") from e
+
+        value = self._cache[url] = CachedValue(data, time.monotonic())
+        return value
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Empfangs-Warteschlange für das Meshtastic ↔ Telegram Gateway
+Empfangene Pakete landen in einer begrenzten Warteschlange, die von einer
+festen Anzahl Worker-Tasks abgearbeitet wird. Pakete derselben Node gehen
+immer an denselben Worker und bleiben dadurch in ihrer Reihenfolge. Läuft
+die Warteschlange über, entscheidet die Überlauf-Strategie, welches Paket
+verworfen wird, sodass der Speicherbedarf auch bei Mesh-Fluten begrenzt bleibt.
+
+config prüft die Überlauf-Strategie gegen OVERFLOW_POLICIES und importiert
+dieses Modul dafür beim Laden; file_logger (braucht config) wird deshalb
+erst bei Bedarf importiert.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+
+OVERFLOW_DROP_OLDEST = 'drop_oldest'                    # Ältestes Paket verwerfen
+OVERFLOW_DROP_BROADCAST_FIRST = 'drop_broadcast_first'  # Älteste Broadcast-Nachricht zuerst verwerfen
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_BROADCAST_FIRST)
+
+
+class _IngressItem:
+    """Ein wartendes Paket"""
+    __slots__ = ('seq', 'enqueued_at', 'node_id', 'is_broadcast', 'args')
+
+    def __init__(self, seq, enqueued_at, node_id, is_broadcast, args):
+        self.seq = seq
+        self.enqueued_at = enqueued_at
+        self.node_id = node_id
+        self.is_broadcast = is_broadcast
+        self.args = args
+
+
+class IngressQueue:
+    """Begrenzte Warteschlange mit Worker-Pool und Reihenfolge pro Node"""
+
+    def __init__(self, handler, workers=4, max_size=500, overflow_policy=OVERFLOW_DROP_BROADCAST_FIRST):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            import file_logger
+            file_logger.log_warning(f"Unbekannte Überlauf-Strategie '{overflow_policy}', verwende {OVERFLOW_DROP_OLDEST}")
+            overflow_policy = OVERFLOW_DROP_OLDEST
+        self.handler = handler  # Coroutine-Funktion, die mit den Paket-Argumenten aufgerufen wird
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+
+        # Eine Teil-Warteschlange je Worker; die Node-ID bestimmt den Worker
+        self._shards = [deque() for _ in range(self.workers)]
+        self._wakeups = None
+        self._tasks = []
+        self._seq = itertools.count()
+        self._size = 0
+
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def __len__(self):
+        return self._size
+
+    def depth(self):
+        """Anzahl wartender Pakete"""
+        return self._size
+
+    def average_wait(self):
+        """Durchschnittliche Wartezeit verarbeiteter Pakete in Sekunden"""
+        return self.wait_time_total / self.processed if self.processed else 0.0
+
+    def stats(self):
+        """Gibt Tiefe, Wartezeiten und Verwurf-Zähler zurück"""
+        return {
+            'depth': self._size,
+            'max_depth': self.max_depth,
+            'received': self.received,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'wait_time_avg': self.average_wait(),
+            'wait_time_max': self.wait_time_max,
+            'workers': self.workers,
+            'overflow_policy': self.overflow_policy,
+        }
+
+    def put(self, node_id, is_broadcast, *args):
+        """Reiht ein Paket ein (muss im Event-Loop aufgerufen werden)"""
+        self._ensure_running()
+        self.received += 1
+
+        if self._size >= self.max_size:
+            self._drop_one()
+
+        item = _IngressItem(next(self._seq), time.monotonic(), node_id, is_broadcast, args)
+        shard = self._shard_for(node_id)
+        self._shards[shard].append(item)
+        self._size += 1
+        self.max_depth = max(self.max_depth, self._size)
+        self._wakeups[shard].set()
+        self._publish_stats()
+
+    async def stop(self):
+        """Beendet die Worker-Tasks; noch wartende Pakete werden verworfen"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def _shard_for(self, node_id):
+        return hash(node_id) % self.workers if node_id is not None else 0
+
+    def _drop_one(self):
+        """Schafft Platz für ein neues Paket gemäß der Überlauf-Strategie"""
+        victim_shard = None
+        victim_index = None
+
+        if self.overflow_policy == OVERFLOW_DROP_BROADCAST_FIRST:
+            # Älteste wartende Broadcast-Nachricht suchen (nur im Überlauf, O(Warteschlangenlänge))
+            oldest_seq = None
+            for shard_index, shard in enumerate(self._shards):
+                for index, item in enumerate(shard):
+                    if item.is_broadcast:
+                        if oldest_seq is None or item.seq < oldest_seq:
+                            oldest_seq, victim_shard, victim_index = item.seq, shard_index, index
+                        break
+
+        if victim_shard is None:
+            # Ältestes Paket über alle Worker hinweg
+            oldest_seq = None
+            for shard_index, shard in enumerate(self._shards):
+                if shard and (oldest_seq is None or shard[0].seq < oldest_seq):
+                    oldest_seq, victim_shard, victim_index = shard[0].seq, shard_index, 0
+
+        if victim_shard is None:
+            return
+
+        victim = self._shards[victim_shard][victim_index]
+        del self._shards[victim_shard][victim_index]
+        self._size -= 1
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 100 == 0:
+            import file_logger
+            file_logger.log_warning(
+                f"Empfangs-Warteschlange voll ({self.max_size}): Paket von {victim.node_id} verworfen "
+                f"({self.dropped} insgesamt, Strategie {self.overflow_policy})"
+            )
+
+    def _ensure_running(self):
+        """Startet die Worker-Tasks bei Bedarf"""
+        if self._wakeups is None:
+            self._wakeups = [asyncio.Event() for _ in range(self.workers)]
+        if not self._tasks or any(task.done() for task in self._tasks):
+            for task in self._tasks:
+                task.cancel()
+            self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+
+    def _publish_stats(self):
+        """Meldet Warteschlangenlänge und Wartezeit an das Dashboard"""
+        try:
+            import dashboard
+            dashboard.update_ingress_queue(self._size, self.average_wait(), self.dropped)
+        except Exception:
+            pass
+
+    async def _worker(self, index):
+        """Arbeitet die Pakete eines Workers nacheinander ab"""
+        shard = self._shards[index]
+        wakeup = self._wakeups[index]
+        while True:
+            if not shard:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+
+            item = shard.popleft()
+            self._size -= 1
+            wait_time = time.monotonic() - item.enqueued_at
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+            try:
+                await self.handler(*item.args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                import file_logger
+                file_logger.log_error("IngressQueue", f"Fehler bei Paket von {item.node_id}: {e}")
+            finally:
+                self.processed += 1
+                self._publish_stats()
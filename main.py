@@ -5,22 +5,31 @@ Hauptprogramm für das Meshtastic ↔ Telegram Gateway
 Startet alle Komponenten und koordiniert das System.
 """
 
+import startup_profile  # Zeitnullpunkt für --profile-startup, muss als erstes importiert werden
+import argparse
 import asyncio
 import logging
 import sys
 from datetime import datetime
-from config import LOG_LEVEL, TELEGRAM_CHAT_ID, TELEGRAM_TOKEN, config_exists
+from config import LOG_LEVEL, TELEGRAM_TOKEN, METRICS_ENABLED, METRICS_LISTEN, METRICS_PORT, config_exists
+from config import TRACE_ENABLED, TRACE_SAMPLE_RATE, TRACE_FILE, TRACE_MAX_BYTES, TRACE_BACKUP_COUNT, COMMAND_PLUGINS
+import config
 from terminal_output import log_startup, log_gateway_stopping, node_status_loop
 from message_handler import meshtastic_loop, run_telegram_bot
+import metrics
+import tracing
 import private_chat
+from command_router import router as command_router
 import dashboard
 import file_logger
-import setup
+
+STARTUP_PROFILE_TIMEOUT = 120  # Sekunden, die --profile-startup höchstens auf die Bereitschaft wartet
 
 async def run_setup_if_needed():
     """Führt Setup durch falls nötig und gibt Setup-Status zurück"""
     
     # Prüfe ob Setup benötigt wird
+    import setup
     if not config_exists() or not setup.is_setup_completed():
         print("🔧 Erste Ausführung erkannt - Setup wird gestartet...")
         print()
@@ -31,7 +40,6 @@ async def run_setup_if_needed():
             return False
             
         # Konfiguration neu laden nach Setup
-        import config
         config.reload_config()
         
         print()
@@ -44,10 +52,10 @@ async def run_setup_if_needed():
 
 def check_and_setup_chat_id():
     """Prüft ob Chat-ID konfiguriert ist und startet Setup falls nötig"""
-    config_data = setup.get_config()
+    config_data = config.current()
     
     # Prüfe ob wir im Chat-ID-Setup-Modus sind
-    if config_data and config_data.get('chat_id_pending', False):
+    if config_data.get('chat_id_pending', False):
         print("\n" + "="*60)
         print("� CHAT-ID SETUP - PHASE 2")
         print("="*60)
@@ -67,7 +75,7 @@ def check_and_setup_chat_id():
         return True  # Setup-Modus
         
     # Normale Prüfung für fehlende Chat-ID (sollte nicht mehr auftreten)
-    if not TELEGRAM_CHAT_ID or TELEGRAM_CHAT_ID.strip() == '':
+    if not config_data.telegram_chat_id or config_data.telegram_chat_id.strip() == '':
         print("\n" + "="*60)
         print("⚠️  KONFIGURATIONSFEHLER")
         print("="*60)
@@ -78,6 +86,30 @@ def check_and_setup_chat_id():
         
     return False  # Normale Operation
 
+async def load_state():
+    """Startphase: gespeicherte Daten laden und schwere Bibliotheken vorladen.
+    Alles läuft parallel in Hintergrund-Threads, der Event-Loop bleibt frei."""
+    from message_handler import outbound_spool, node_names
+    
+    async def load_private_chats():
+        with startup_profile.phase('Private Chats laden'):
+            await asyncio.to_thread(private_chat.load_private_chats)
+    
+    async def load_spool():
+        with startup_profile.phase('Zwischenspeicher laden'):
+            await asyncio.to_thread(outbound_spool.load)
+    
+    async def load_node_db():
+        with startup_profile.phase('Node-Datenbank laden'):
+            await asyncio.to_thread(node_names.load)
+    
+    await asyncio.gather(
+        load_private_chats(),
+        load_spool(),
+        load_node_db(),
+        startup_profile.preload('telegram.ext', 'meshtastic.tcp_interface')
+    )
+
 async def cleanup_loop():
     """Cleanup-Loop für private Chat Funktionen"""
     while True:
@@ -91,67 +123,55 @@ async def cleanup_loop():
             file_logger.log_error("cleanup_loop", str(e))
 
 async def connection_monitor():
-    """Überwacht Verbindungsstatus und zeigt Statistiken (verbesserter Monitor)"""
-    from message_handler import meshtastic_interface, ping_meshtastic_host, check_meshtastic_connection
-    from config import MESHTASTIC_HOST, MESHTASTIC_PING_TIMEOUT
+    """Zeigt Änderungen der Meshtastic-Verbindungszustände an (ohne eigene Pings)"""
+    from message_handler import radio_pool
     from terminal_output import log_device_offline, log_device_back_online
     
-    last_interface_status = None
-    consecutive_failures = 0
+    # Zustandswechsel aller Radios übernehmen (Callbacks laufen im Event-Loop)
+    changes = asyncio.Queue()
+    for radio in radio_pool:
+        radio.health.subscribe(lambda old, new, host=radio.host: changes.put_nowait((host, old, new)))
+    last_radio_status = {}
     
     while True:
         try:
-            await asyncio.sleep(30)  # Häufigere Prüfung alle 30 Sekunden
+            host, old_state, new_state = await changes.get()
+            radio_connected = radio_pool.get(host).health.is_connected
             
-            # Interface-Status prüfen mit der gründlicheren Methode
-            interface_connected = await check_meshtastic_connection()
-            
-            # Zusätzliche Ping-Prüfung bei scheinbar funktionierender Verbindung
-            if interface_connected:
-                ping_ok = await ping_meshtastic_host(MESHTASTIC_HOST, MESHTASTIC_PING_TIMEOUT)
-                if not ping_ok:
-                    consecutive_failures += 1
-                    file_logger.log_warning(f"Ping-Test fehlgeschlagen ({consecutive_failures}/3)")
-                    
-                    # Nach 3 aufeinanderfolgenden Fehlern als getrennt markieren
-                    if consecutive_failures >= 3:
-                        interface_connected = False
-                        file_logger.log_error("Verbindung als unterbrochen erkannt nach mehreren Ping-Fehlern")
-                        # Direkte Dashboard-Aktualisierung für sofortige Anzeige
-                        dashboard.update_meshtastic_connection(False, MESHTASTIC_HOST)
-                else:
-                    consecutive_failures = 0  # Reset bei erfolgreichem Ping
-            else:
-                consecutive_failures = 0
-            
-            # Dashboard-Update bei Statusänderung
-            if interface_connected != last_interface_status:
+            # Dashboard-Update bei Statusänderung (verbunden/ruhig zählt als verbunden)
+            if radio_connected != last_radio_status.get(host):
                 # Verwende die spezialisierten Log-Funktionen für bessere Synchronisation
-                if interface_connected:
-                    log_device_back_online(MESHTASTIC_HOST)
-                    dashboard.update_meshtastic_connection(True, MESHTASTIC_HOST)
-                else:
-                    log_device_offline(MESHTASTIC_HOST)
-                    # Dashboard-Update ist bereits in log_device_offline enthalten
+                if radio_connected:
+                    log_device_back_online(host)
+                elif not radio_pool.is_connected:
+                    log_device_offline(host)
                 
-                status_msg = 'Verbunden' if interface_connected else 'Getrennt'
-                file_logger.log_info(f"Meshtastic-Verbindungsstatus geändert: {status_msg}")
-                last_interface_status = interface_connected
-                
-                # Bei Verbindungsverlust versuche Neustart der Meshtastic-Schleife
-                if not interface_connected:
-                    file_logger.log_info("Versuche Meshtastic-Verbindung wiederherzustellen...")
+                status_msg = 'Verbunden' if radio_connected else 'Getrennt'
+                connected_count = len(radio_pool.connected())
+                file_logger.log_info(f"Meshtastic-Verbindungsstatus {host} geändert: {status_msg} "
+                                     f"({connected_count}/{len(radio_pool)} Radios verbunden)")
+                last_radio_status[host] = radio_connected
                     
         except asyncio.CancelledError:
             break
         except Exception as e:
             file_logger.log_error("connection_monitor", str(e))
 
+def gateway_health():
+    """Zustand für /healthz: mindestens ein Radio und Telegram verbunden"""
+    from message_handler import radio_pool
+    radios_ok = radio_pool.is_connected
+    telegram_ok = dashboard.dashboard_data.telegram_connected
+    detail = (f"meshtastic={'ok' if radios_ok else 'down'} ({len(radio_pool.connected())}/{len(radio_pool)}) "
+              f"telegram={'ok' if telegram_ok else 'down'}")
+    return radios_ok and telegram_ok, detail
+
 async def main_async():
     """Hauptfunktion die alle Services parallel startet"""
     
     # Prüfe ob Setup benötigt wird
-    setup_needed = await run_setup_if_needed()
+    with startup_profile.phase('Setup-Prüfung'):
+        setup_needed = await run_setup_if_needed()
     
     if setup_needed:
         # Im Setup-Modus nur Telegram Bot starten für Chat-ID-Ermittlung
@@ -161,8 +181,8 @@ async def main_async():
         print()
         
         # Konfiguration erneut laden nach Setup
-        import config
         config.reload_config()
+        await asyncio.to_thread(private_chat.load_private_chats)
         
         try:
             await run_telegram_bot()
@@ -183,6 +203,7 @@ async def main_async():
         print("💡 Senden Sie !id in Telegram um Ihre Chat-ID zu erhalten")
         print("🔧 Meshtastic wird im Setup-Modus nicht gestartet")
         print()
+        await asyncio.to_thread(private_chat.load_private_chats)
         
         try:
             await run_telegram_bot()
@@ -192,6 +213,19 @@ async def main_async():
         # Normale Operation - Dashboard-Modus
         file_logger.log_startup()
         
+        # Tracing der Nachrichten-Pipeline (optional, mit Stichprobe)
+        tracing.configure(TRACE_ENABLED, TRACE_FILE, TRACE_SAMPLE_RATE, TRACE_MAX_BYTES, TRACE_BACKUP_COUNT)
+        
+        # Eigene Mesh-Befehle (Plugin-Module registrieren sich beim Import am Befehls-Router)
+        command_router.load_plugins(COMMAND_PLUGINS)
+        
+        # Gespeicherte Daten laden, Bibliotheken vorladen
+        with startup_profile.phase('Startphase (parallel)'):
+            await load_state()
+        
+        # Bereit, sobald Telegram läuft und das erste Radio verbunden ist
+        startup_profile.expect(startup_profile.READY_TELEGRAM, startup_profile.READY_MESHTASTIC)
+        
         # Dashboard starten
         dashboard_task = dashboard.start_dashboard()
         
@@ -202,10 +236,25 @@ async def main_async():
         cleanup_task = asyncio.create_task(cleanup_loop())
         monitor_task = asyncio.create_task(connection_monitor())
         
+        # Änderungen an gateway_config.json übernehmen (Komponenten melden sich per config.subscribe an)
+        config_task = asyncio.create_task(config.watch_config())
+        
+        # Metrik-Endpunkt (läuft nebenher, beendet das Gateway nicht bei Fehlern)
+        metrics_task = None
+        if METRICS_ENABLED:
+            metrics_task = asyncio.create_task(
+                metrics.run_metrics_server(METRICS_LISTEN, METRICS_PORT, gateway_health)
+            )
+        
+        # --profile-startup: nach dem Start wieder beenden und den Bericht ausgeben
+        main_tasks = [meshtastic_task, telegram_task, status_task, cleanup_task, monitor_task, dashboard_task]
+        if startup_profile.enabled:
+            main_tasks.append(asyncio.create_task(startup_profile.wait_ready(STARTUP_PROFILE_TIMEOUT)))
+        
         try:
             # Warten bis einer der Tasks beendet wird
             done, pending = await asyncio.wait(
-                [meshtastic_task, telegram_task, status_task, cleanup_task, monitor_task, dashboard_task],
+                main_tasks,
                 return_when=asyncio.FIRST_COMPLETED
             )
             
@@ -221,21 +270,47 @@ async def main_async():
             file_logger.log_shutdown()
             
             # Alle Tasks beenden
-            for task in [meshtastic_task, telegram_task, status_task, cleanup_task, monitor_task, dashboard_task]:
+            for task in main_tasks:
                 task.cancel()
                 try:
                     await task
                 except asyncio.CancelledError:
                     pass
+        finally:
+            if metrics_task:
+                metrics_task.cancel()
+            config_task.cancel()
+            
+            # Ausstehende Änderungen an privaten Chats sichern
+            await command_router.shutdown()
+            private_chat.close_private_chats()
+            await private_chat.close_http_lookups()
+
+def _on_log_level_changed(snapshot, changed):
+    """Übernimmt ein geändertes log_level ohne Neustart"""
+    logging.getLogger().setLevel(getattr(logging, snapshot.log_level.upper()))
 
 def main():
     """Hauptfunktion - Startet das Gateway"""
+    startup_profile.record_phase('Module importieren', 0.0)
+    
+    parser = argparse.ArgumentParser(description="Meshtastic ↔ Telegram Gateway")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Dauer der Startphasen messen, ausgeben und das Gateway danach beenden")
+    args = parser.parse_args()
+    if args.profile_startup:
+        startup_profile.enable()
+    
     # Logging konfigurieren
     log_level = getattr(logging, LOG_LEVEL.upper())
     logging.basicConfig(level=log_level, format='')
+    config.subscribe(_on_log_level_changed, ('log_level',))
     
     # Event Loop starten
     asyncio.run(main_async())
+    
+    if startup_profile.enabled:
+        print("\n" + startup_profile.report())
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Framing-Modul für das Meshtastic ↔ Telegram Gateway
+Ein Meshtastic-Textpaket fasst nur rund 200 Bytes. Längere Nachrichten werden
+hier platzsparend kompaktiert und in nummerierte Teile "[1/3] ..." zerlegt;
+empfangene Teile werden pro Absender wieder zu einer Nachricht zusammengesetzt.
+Die Kompaktierung bleibt lesbar, da die Empfänger normale Meshtastic-Apps sind.
+"""
+
+import re
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_PAYLOAD_BYTES = 200
+MIN_PAYLOAD_BYTES = 32
+ELLIPSIS = "…"
+MISSING_PART = "[…] "
+
+PART_HEADER = re.compile(r'^\[(\d{1,2})/(\d{1,2})\] ')
+
+# Typografische Zeichen mit kürzerem ASCII-Gegenstück (UTF-8: 2-3 Bytes -> 0-1 Byte)
+_COMPACT_TABLE = str.maketrans({
+    '\u2013': '-', '\u2014': '-', '\u2212': '-',                          # Gedankenstriche, Minus
+    '\u201c': '"', '\u201d': '"', '\u201e': '"', '\u00ab': '"', '\u00bb': '"',  # Anführungszeichen
+    '\u2018': "'", '\u2019': "'", '\u201a': "'",                          # Apostrophe
+    '\u00a0': ' ', '\u202f': ' ', '\u2009': ' ',                          # Geschützte/schmale Leerzeichen
+    '\u200b': None, '\u200c': None, '\u200d': None, '\ufeff': None,       # Unsichtbare Zeichen
+})
+_SPACE_RUNS = re.compile(r'[ \t]+')
+_TRAILING_SPACE = re.compile(r'[ \t]+\n')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def byte_length(text):
+    return len(text.encode('utf-8'))
+
+
+def compact_text(text):
+    """Lesbare Kompaktierung: Typografie durch ASCII ersetzen, Leerraum zusammenfassen.
+    Gibt den Originaltext zurück, wenn dadurch keine Bytes gespart werden."""
+    compacted = text.translate(_COMPACT_TABLE)
+    compacted = _SPACE_RUNS.sub(' ', compacted)
+    compacted = _TRAILING_SPACE.sub('\n', compacted)
+    compacted = _BLANK_LINES.sub('\n\n', compacted).strip()
+    return compacted if byte_length(compacted) < byte_length(text) else text
+
+
+def part_header(index, total):
+    return f"[{index}/{total}] "
+
+
+def _split(text, limit):
+    """Zerlegt Text in Stücke von höchstens limit Bytes, bevorzugt an Leerzeichen.
+    Das trennende Leerzeichen bleibt am Ende des Stücks, damit ''.join() den Text exakt ergibt."""
+    chunks = []
+    rest = text
+    while rest:
+        encoded = rest.encode('utf-8')
+        if len(encoded) <= limit:
+            chunks.append(rest)
+            break
+        # Abschneiden ohne ein Mehrbyte-Zeichen zu zerteilen
+        cut = encoded[:limit].decode('utf-8', 'ignore')
+        boundary = max(cut.rfind(' '), cut.rfind('\n'))
+        if boundary >= len(cut) // 2:
+            cut = cut[:boundary + 1]
+        chunks.append(cut)
+        rest = rest[len(cut):]
+    return chunks
+
+
+def frame_text(text, max_bytes=DEFAULT_MAX_PAYLOAD_BYTES, max_parts=8, compact=True):
+    """Bereitet eine Nachricht für den Funk vor.
+    Gibt eine Liste von Paket-Texten zurück (ein Element, wenn die Nachricht in ein Paket passt).
+    Mehr als max_parts Teile werden nicht gesendet, der Rest wird mit '…' abgeschnitten."""
+    max_bytes = max(int(max_bytes), MIN_PAYLOAD_BYTES)
+    if compact:
+        text = compact_text(text)
+    if byte_length(text) <= max_bytes:
+        return [text]
+
+    # Kopf-Länge hängt von der Anzahl der Teile ab: so lange zerlegen, bis sie stabil ist
+    total = 2
+    while True:
+        chunks = _split(text, max_bytes - byte_length(part_header(total, total)))
+        if len(chunks) <= total or len(chunks) > max_parts:
+            break
+        total = len(chunks)
+
+    if len(chunks) > max_parts:
+        total = max(2, max_parts)
+        limit = max_bytes - byte_length(part_header(total, total))
+        chunks = _split(text, limit)[:total]
+        last = chunks[-1].encode('utf-8')[:limit - byte_length(ELLIPSIS)].decode('utf-8', 'ignore')
+        chunks[-1] = last.rstrip() + ELLIPSIS
+    total = len(chunks)
+    return [part_header(index, total) + chunk for index, chunk in enumerate(chunks, 1)]
+
+
+def parse_part(text, max_parts=8):
+    """Gibt (Index, Anzahl, Inhalt) für einen Nachrichtenteil zurück, sonst None"""
+    match = PART_HEADER.match(text)
+    if not match:
+        return None
+    index, total = int(match.group(1)), int(match.group(2))
+    if total < 2 or total > max_parts or not 1 <= index <= total:
+        return None
+    return index, total, text[match.end():]
+
+
+class _PendingMessage:
+    """Bisher empfangene Teile einer mehrteiligen Nachricht"""
+    __slots__ = ('total', 'parts', 'packet', 'started')
+
+    def __init__(self, total, packet, started):
+        self.total = total
+        self.parts = {}
+        self.packet = packet
+        self.started = started
+
+    def text(self):
+        """Zusammengesetzter Text, fehlende Teile als '[…]' markiert"""
+        pieces = []
+        for index in range(1, self.total + 1):
+            part = self.parts.get(index)
+            if part is None:
+                if pieces and not pieces[-1][-1:].isspace():
+                    pieces.append(' ')
+                part = MISSING_PART
+            pieces.append(part)
+        return ''.join(pieces).strip()
+
+
+class MultipartAssembler:
+    """Setzt nummerierte Teile pro Absender wieder zusammen.
+    Unvollständige Nachrichten werden nach timeout Sekunden mit Lückenmarkierung freigegeben."""
+
+    def __init__(self, timeout=120, max_parts=8, max_pending=256):
+        self.timeout = timeout
+        self.max_parts = max_parts
+        self.max_pending = max_pending
+        self._pending = OrderedDict()  # Schlüssel (z.B. (from, to)) -> _PendingMessage
+        self._released = []            # Verdrängte unvollständige Nachrichten
+        self.opened = 0                # Begonnene mehrteilige Nachrichten (je eine neue Wartezeit)
+        self.completed = 0
+        self.incomplete = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, key, text, packet=None, now=None):
+        """Verarbeitet einen empfangenen Text.
+        Gibt den vollständigen Text zurück (auch für normale, einteilige Nachrichten)
+        oder None, solange noch Teile fehlen."""
+        part = parse_part(text, self.max_parts)
+        if part is None:
+            return text
+
+        index, total, body = part
+        now = time.monotonic() if now is None else now
+        pending = self._pending.get(key)
+        if pending is not None and (pending.total != total or index in pending.parts):
+            # Eine neue Nachricht beginnt, bevor die vorige vollständig war
+            self._release(self._pending.pop(key))
+            pending = None
+        if pending is None:
+            if len(self._pending) >= self.max_pending:
+                self._release(self._pending.popitem(last=False)[1])
+            pending = self._pending[key] = _PendingMessage(total, packet, now)
+            self.opened += 1
+
+        pending.parts[index] = body
+        if len(pending.parts) < total:
+            return None
+
+        del self._pending[key]
+        self.completed += 1
+        return pending.text()
+
+    def take_expired(self, now=None):
+        """Gibt (Paket, Text) aller abgelaufenen oder verdrängten unvollständigen Nachrichten zurück"""
+        now = time.monotonic() if now is None else now
+        for key in [key for key, pending in self._pending.items() if now - pending.started >= self.timeout]:
+            self._release(self._pending.pop(key))
+        released, self._released = self._released, []
+        return [(pending.packet, pending.text()) for pending in released]
+
+    def _release(self, pending):
+        self.incomplete += 1
+        self._released.append(pending)
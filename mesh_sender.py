@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Sende-Worker-Modul für das Meshtastic ↔ Telegram Gateway
+Führt die blockierenden sendText-Aufrufe in einem eigenen Thread aus,
+damit ein langsames Funkgerät den Event-Loop nicht blockiert.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+
+import file_logger
+
+
+class SendQueueFull(Exception):
+    """Wird ausgelöst wenn die Sende-Warteschlange voll ist"""
+
+
+class MeshtasticSender:
+    """Dedizierter Sende-Thread, gespeist über eine begrenzte Warteschlange"""
+
+    def __init__(self, max_queue_size=100):
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Startet den Sende-Thread (falls noch nicht gestartet)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="meshtastic-sender", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self):
+        """Beendet den Sende-Thread nach Abarbeitung der Warteschlange"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def qsize(self):
+        """Gibt die aktuelle Länge der Warteschlange zurück"""
+        return self._queue.qsize()
+
+    def submit(self, interface, text, destination_id=None, channel_index=0, trace=None):
+        """
+        Reiht einen Sendeauftrag ein.
+        Gibt ein concurrent.futures.Future zurück, das mit dem Ergebnis von sendText
+        aufgelöst wird (oder mit der aufgetretenen Exception).
+        """
+        self.start()
+        future = Future()
+        try:
+            self._queue.put_nowait((future, interface, text, destination_id, channel_index, trace))
+        except queue.Full:
+            raise SendQueueFull(f"Sende-Warteschlange voll ({self._queue.maxsize} Einträge)")
+        return future
+
+    def submit_async(self, interface, text, destination_id=None, channel_index=0, trace=None):
+        """Wie submit(), gibt aber ein asyncio-Future für den laufenden Event-Loop zurück"""
+        return asyncio.wrap_future(self.submit(interface, text, destination_id, channel_index, trace))
+
+    def _run(self):
+        """Hauptschleife des Sende-Threads"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            future, interface, text, destination_id, channel_index, trace = job
+            if not future.set_running_or_notify_cancel():
+                continue  # Auftrag wurde bereits abgebrochen
+
+            if trace is not None:
+                trace.mark('radio_send_started')
+            try:
+                if destination_id:
+                    result = interface.sendText(text, destinationId=destination_id)
+                else:
+                    result = interface.sendText(text, channelIndex=channel_index)
+                if trace is not None:
+                    trace.mark('radio_sent')
+                future.set_result(result)
+            except BaseException as e:
+                future.set_exception(e)
+
+        file_logger.log_debug("Meshtastic-Sende-Thread beendet")
@@ -5,147 +5,223 @@ Hier wird die gesamte Nachrichtenweiterleitung gehandhabt.
 """
 
 import asyncio
-import meshtastic
-import meshtastic.tcp_interface
+import html
+import time
 import socket
 from datetime import datetime
 from pubsub import pub
-from telegram import Bot, Update
-from telegram.ext import Application, MessageHandler, filters
 
+import config
 from config import *
 from terminal_output import *
 import private_chat
 import file_logger
+import dashboard
+import metrics
+import tracing
+import startup_profile
+import telegram_client
+from tracing import TRACE_MESH_TO_TELEGRAM, TRACE_TELEGRAM_TO_MESH
+from mesh_sender import MeshtasticSender, SendQueueFull
+from airtime_scheduler import AirtimeScheduler, PRIORITY_BROADCAST, PRIORITY_PRIVATE
+from telegram_sender import TelegramSender
+from node_cache import NodeNameCache
+from health_monitor import STATE_DISCONNECTED, probe_tcp_port
+from radio_pool import RadioPool
+from ingress_queue import IngressQueue
+from mesh_framing import MultipartAssembler, frame_text
+from outbound_spool import OutboundSpool
+
+SPOOLED = 'spooled'  # Ergebnis von send_to_meshtastic_safe: zwischengespeichert, wird nachgesendet
 
 # Globale Variablen
-telegram_bot = None  # Wird bei Bedarf initialisiert
-meshtastic_interface = None
+radio_pool = RadioPool(
+    MESHTASTIC_HOSTS,
+    channel_index=CHANNEL_INDEX,
+    quiet_threshold=MESHTASTIC_QUIET_THRESHOLD,
+    probe_interval=MESHTASTIC_HEALTH_PROBE_INTERVAL,
+    probe_timeout=MESHTASTIC_PING_TIMEOUT,
+    link_max_age=MESHTASTIC_LINK_MAX_AGE,
+    dedupe_ttl=MESHTASTIC_DEDUPE_TTL,
+    dedupe_max_entries=MESHTASTIC_DEDUPE_MAX_ENTRIES
+)  # Alle Radios mit eigenem Verbindungs- und Health-Zustand
+ingress_queue = IngressQueue(
+    handler=lambda packet, interface, target_channel_index, trace, released=False: handle_text(
+        packet, interface, target_channel_index, trace, released),
+    workers=MESHTASTIC_INGRESS_WORKERS,
+    max_size=MESHTASTIC_INGRESS_QUEUE_SIZE,
+    overflow_policy=MESHTASTIC_INGRESS_OVERFLOW_POLICY
+)  # Begrenzte Empfangs-Warteschlange, Reihenfolge pro Node bleibt erhalten
+multipart_assembler = MultipartAssembler(
+    timeout=MESHTASTIC_MULTIPART_TIMEOUT,
+    max_parts=MESHTASTIC_MULTIPART_MAX_PARTS
+)  # Setzt empfangene Teile "[1/3] ..." pro Absender wieder zusammen
+outbound_spool = OutboundSpool(
+    MESHTASTIC_SPOOL_FILE,
+    max_age=MESHTASTIC_SPOOL_MAX_AGE,
+    max_entries=MESHTASTIC_SPOOL_MAX_ENTRIES,
+    replay_interval=MESHTASTIC_SPOOL_REPLAY_INTERVAL
+)  # Nachrichten von Telegram, die während eines Verbindungsabbruchs nicht gesendet werden konnten
+node_names = NodeNameCache(
+    NODE_DB_FILE or None,
+    max_nodes=NODE_DB_MAX_NODES,
+    max_age=NODE_DB_MAX_AGE,
+    heard_resolution=NODE_DB_HEARD_RESOLUTION
+)  # Node-Nummer -> Anzeigename, aktuell gehalten über NODEINFO-Events und gesichert in node_db.json
+meshtastic_sender = MeshtasticSender(MESHTASTIC_SEND_QUEUE_SIZE)  # Sende-Thread für blockierende sendText-Aufrufe
+outbound_scheduler = AirtimeScheduler(
+    send_func=lambda text, destination_id, trace: _send_via_worker(text, destination_id, trace),
+    preset=MESHTASTIC_MODEM_PRESET,
+    duty_cycle_percent=MESHTASTIC_DUTY_CYCLE_PERCENT,
+    burst_seconds=MESHTASTIC_AIRTIME_BURST_SECONDS,
+    max_queue_size=MESHTASTIC_OUTBOUND_QUEUE_SIZE
+)
+telegram_sender = TelegramSender(
+    get_bot=telegram_client.get_bot,
+    global_rate_per_second=TELEGRAM_GLOBAL_RATE_PER_SECOND,
+    group_rate_per_minute=TELEGRAM_GROUP_RATE_PER_MINUTE,
+    private_rate_per_second=TELEGRAM_PRIVATE_RATE_PER_SECOND,
+    coalesce_window=TELEGRAM_COALESCE_WINDOW
+)
 
 def get_telegram_bot():
-    """Gibt den Telegram Bot zurück, initialisiert ihn bei Bedarf"""
-    global telegram_bot
-    if telegram_bot is None:
-        # Direkt aus JSON-Datei lesen für aktuellste Konfiguration
-        import setup
-        config_data = setup.get_config()
-        
-        if config_data and config_data.get('telegram_token'):
-            token = config_data['telegram_token']
-        else:
-            # Fallback auf config.py
-            from config import TELEGRAM_TOKEN
-            token = TELEGRAM_TOKEN
-            
-        if not token or token.strip() == '':
-            raise ValueError("Telegram Token ist nicht konfiguriert!")
-        telegram_bot = Bot(token=token)
-    return telegram_bot
-
-async def send_to_meshtastic_safe(text, destination_id=None):
-    """Sichere Sendefunktion mit Fehlerbehandlung und Dashboard-Updates"""
-    if not meshtastic_interface:
+    """Gibt den gemeinsamen Telegram Bot zurück (siehe telegram_client)"""
+    return telegram_client.get_bot()
+
+def _on_channel_changed(snapshot, changed):
+    """Neuer Kanalindex gilt sofort für Filterung und Senden"""
+    global CHANNEL_INDEX
+    CHANNEL_INDEX = snapshot.channel_index
+    for radio in radio_pool:
+        radio.channel_index = CHANNEL_INDEX
+    dashboard.update_channel_info(CHANNEL_NAME, CHANNEL_INDEX)
+
+def _on_chat_id_changed(snapshot, changed):
+    global TELEGRAM_CHAT_ID
+    TELEGRAM_CHAT_ID = snapshot.telegram_chat_id
+
+def _on_telegram_rates_changed(snapshot, changed):
+    telegram_sender.set_rates(
+        snapshot.telegram_global_rate_per_second,
+        snapshot.telegram_group_rate_per_minute,
+        snapshot.telegram_private_rate_per_second,
+        snapshot.telegram_coalesce_window
+    )
+
+def _on_airtime_changed(snapshot, changed):
+    outbound_scheduler.set_budget(snapshot.meshtastic_duty_cycle_percent, snapshot.meshtastic_airtime_burst_seconds)
+
+# Änderungen an gateway_config.json ohne Neustart übernehmen
+config.subscribe(_on_channel_changed, ('channel_index',))
+config.subscribe(_on_chat_id_changed, ('telegram_chat_id',))
+config.subscribe(_on_telegram_rates_changed, ('telegram_global_rate_per_second', 'telegram_group_rate_per_minute',
+                                              'telegram_private_rate_per_second', 'telegram_coalesce_window'))
+config.subscribe(_on_airtime_changed, ('meshtastic_duty_cycle_percent', 'meshtastic_airtime_burst_seconds'))
+
+def queue_meshtastic_send(text, destination_id=None, priority=None, trace=None):
+    """Reiht eine Nachricht im Airtime-Scheduler ein.
+    Gibt ein Future zurück, das mit dem Sende-Ergebnis (True/False) aufgelöst wird."""
+    if priority is None:
+        priority = PRIORITY_PRIVATE if destination_id else PRIORITY_BROADCAST
+    return outbound_scheduler.enqueue(text, destination_id, priority, trace)
+
+async def send_to_meshtastic_safe(text, destination_id=None, priority=None, trace=None, spool=False):
+    """Sichere Sendefunktion mit Fehlerbehandlung und Dashboard-Updates.
+    Zu lange Nachrichten werden kompaktiert und in nummerierte Teile zerlegt.
+    Mit spool=True werden nicht sendbare Nachrichten zwischengespeichert und nach
+    der Wiederverbindung nachgesendet; das Ergebnis ist dann SPOOLED statt False."""
+    if spool and len(outbound_spool):
+        # Ältere Nachrichten warten noch: hinten anstellen, damit die Reihenfolge erhalten bleibt
+        return _spool_message([text], destination_id, priority, trace)
+
+    if not radio_pool.is_connected:
         log_meshtastic_unavailable()
-        # Dashboard über Verbindungsverlust informieren
-        import dashboard
-        dashboard.update_meshtastic_connection(False)
+        metrics.SEND_FAILURES.inc(target='meshtastic', cause='unavailable')
+        return _spool_message([text], destination_id, priority, trace) if spool else False
+
+    parts = frame_text(text, MESHTASTIC_MAX_PAYLOAD_BYTES, MESHTASTIC_MULTIPART_MAX_PARTS, MESHTASTIC_COMPACT_TEXT)
+    if len(parts) > 1:
+        # Teile nacheinander einreihen: der nächste erst, wenn der vorige gesendet ist,
+        # damit die Reihenfolge stimmt und andere Nachrichten dazwischen Platz haben
+        file_logger.log_debug("Nachricht in %d Teile zerlegt (%d Zeichen)", len(parts), len(text))
+        if trace is not None:
+            trace.mark('framed')
+    for index, part in enumerate(parts, 1):
+        if not await queue_meshtastic_send(part, destination_id, priority, trace if index == len(parts) else None):
+            if spool:
+                return _spool_message(parts[index - 1:], destination_id, priority, trace)
+            if len(parts) > 1:
+                file_logger.log_warning(f"Teil {index}/{len(parts)} konnte nicht gesendet werden, Rest verworfen")
+            return False
+    return True
+
+def _spool_message(texts, destination_id, priority, trace=None):
+    """Legt Nachrichten (bzw. noch nicht gesendete Teile) im Zwischenspeicher ab"""
+    for text in texts:
+        outbound_spool.add(text, destination_id, priority)
+    file_logger.log_info(f"Nachricht zwischengespeichert ({len(outbound_spool)} wartend)")
+    if trace is not None:
+        trace.finish('spooled')
+    if radio_pool.is_connected:
+        outbound_spool.schedule_replay(_send_spooled)
+    return SPOOLED
+
+async def _send_spooled(text, destination_id, priority):
+    """Sendet eine zwischengespeicherte Nachricht (ohne sie erneut zwischenzuspeichern)"""
+    return await send_to_meshtastic_safe(text, destination_id, priority)
+
+async def _send_via_worker(text, destination_id=None, trace=None):
+    """Übergibt den Sendeauftrag an den Sende-Thread und wertet das Ergebnis aus"""
+    # Radio mit dem besten aktuellen Link zum Ziel wählen
+    radio = radio_pool.select_radio(destination_id)
+    if radio is None:
+        log_meshtastic_unavailable()
+        metrics.SEND_FAILURES.inc(target='meshtastic', cause='unavailable')
         return False
         
     try:
-        if destination_id:
-            meshtastic_interface.sendText(text, destinationId=destination_id)
-        else:
-            meshtastic_interface.sendText(text, channelIndex=CHANNEL_INDEX)
+        if trace is not None:
+            trace.mark('radio_selected')
+        send_future = meshtastic_sender.submit_async(
+            radio.interface, text, destination_id, radio.channel_index, trace
+        )
+        await asyncio.wait_for(send_future, timeout=MESHTASTIC_SEND_TIMEOUT)
         return True
+    except SendQueueFull as e:
+        log_meshtastic_send_error(f"Nachricht verworfen: {e}")
+        metrics.SEND_FAILURES.inc(target='meshtastic', cause='queue_full')
+        return False
+    except asyncio.TimeoutError:
+        log_meshtastic_send_error(f"Timeout beim Senden nach {MESHTASTIC_SEND_TIMEOUT} Sekunden")
+        metrics.SEND_FAILURES.inc(target='meshtastic', cause='timeout')
+        radio.health.mark_disconnected("Timeout beim Senden")
+        return False
     except (BrokenPipeError, ConnectionResetError, OSError) as e:
         log_meshtastic_send_error(f"Verbindungsfehler beim Senden: {e}")
-        # Dashboard über Verbindungsverlust informieren
-        import dashboard
-        dashboard.update_meshtastic_connection(False)
+        metrics.SEND_FAILURES.inc(target='meshtastic', cause='connection')
+        radio.health.mark_disconnected(f"Verbindungsfehler beim Senden: {e}")
         return False
     except Exception as e:
         error_msg = str(e)
         log_meshtastic_send_error(f"Unbekannter Fehler beim Senden: {error_msg}")
+        metrics.SEND_FAILURES.inc(target='meshtastic', cause='error')
         
-        # Bei Timeout-Fehlern Dashboard über Verbindungsverlust informieren
+        # Bei Timeout-Fehlern Verbindung als unterbrochen markieren
         if "timed out" in error_msg.lower() or "timeout" in error_msg.lower():
-            import dashboard
-            dashboard.update_meshtastic_connection(False)
-            file_logger.log_warning("Meshtastic-Verbindung als unterbrochen markiert aufgrund von Timeout")
+            radio.health.mark_disconnected("Timeout beim Senden")
         
         return False
 
-async def check_meshtastic_connection():
-    """Prüft ob die Meshtastic-Verbindung noch aktiv ist (sanfter)"""
-    if not meshtastic_interface:
-        return False
-        
-    try:
-        # Erst prüfen ob das Interface noch existiert
-        if hasattr(meshtastic_interface, 'socket'):
-            # Für TCP Interface prüfen wir den Socket-Status weniger aggressiv
-            try:
-                sock = meshtastic_interface.socket
-                if sock is None:
-                    return False
-                    
-                # Einfacher Check ob Socket noch verbunden ist
-                sock.settimeout(0.5)  # Längerer Timeout
-                try:
-                    # Sanfter Test
-                    sock.getpeername()  # Wirft Exception wenn nicht verbunden
-                    return True
-                except (OSError, socket.error):
-                    return False
-                finally:
-                    sock.settimeout(None)
-            except (ConnectionResetError, BrokenPipeError, OSError, AttributeError):
-                return False
-        return True
-    except Exception:
-        return False
-
 async def ping_meshtastic_host(host, timeout=3):
     """Überprüft ob der Meshtastic-Host im Netzwerk erreichbar ist UND der TCP-Port verfügbar ist"""
-    try:
-        # Versuche TCP-Verbindung zum Meshtastic TCP Port
-        future = asyncio.open_connection(host, 4403)  # Meshtastic TCP Port
-        try:
-            reader, writer = await asyncio.wait_for(future, timeout=timeout)
-            # Verbindung erfolgreich - sofort wieder schließen
-            writer.close()
-            try:
-                await writer.wait_closed()
-            except:
-                pass  # Ignoriere Fehler beim Schließen
-            return True
-        except asyncio.TimeoutError:
-            return False
-        except (ConnectionRefusedError, OSError):
-            # Port nicht verfügbar oder Gerät noch nicht bereit
-            return False
-        except Exception:
-            return False
-    except Exception:
-        return False
+    radio = radio_pool.get(host)
+    if radio is not None:
+        return await radio.health.probe(timeout)
+    return await probe_tcp_port(host, timeout)
 
-async def wait_for_device_ready(host, max_wait_time=30):
-    """Wartet bis das Gerät vollständig bereit ist"""
-    from terminal_output import get_timestamp
-    print(f"[{get_timestamp()}] [WAITING] Warte auf Gerät-Bereitschaft...")
-    
-    start_time = asyncio.get_event_loop().time()
-    while (asyncio.get_event_loop().time() - start_time) < max_wait_time:
-        if await ping_meshtastic_host(host, 2):
-            # Zusätzliche kurze Wartezeit für vollständige Bereitschaft
-            await asyncio.sleep(2)
-            return True
-        await asyncio.sleep(1)
-    
-    return False
-
-async def handle_telegram_message(update: Update, context):
+async def handle_telegram_message(update, context):
     """Handler für eingehende Telegram-Nachrichten"""
+    received_at = time.monotonic()
     
     if not update.message:
         return
@@ -231,66 +307,69 @@ async def handle_telegram_message(update: Update, context):
     try:
         # Nachricht mit Telegram-Username als Prefix
         message = f"{sender_name}: {text}"
-        success = await send_to_meshtastic_safe(message)
-        if success:
+        trace = tracing.start_trace(TRACE_TELEGRAM_TO_MESH, start=received_at, chat=update.effective_chat.id)
+        trace.mark('handler')
+        success = await send_to_meshtastic_safe(message, trace=trace, spool=True)
+        trace.finish('ok' if success else 'failed')
+        if success is SPOOLED:
+            file_logger.log_info(f"Nachricht von {sender_name} wird nach der Wiederverbindung gesendet")
+        elif success:
+            metrics.TELEGRAM_TO_RADIO_SECONDS.observe(time.monotonic() - received_at)
             log_message_telegram_to_meshtastic(sender_name, text)
         else:
             log_telegram_send_error("Meshtastic-Verbindung nicht verfügbar")
     except Exception as e:
         log_meshtastic_send_error(e)
 
-async def handle_text(packet, interface, target_channel_index):
+async def handle_text(packet, interface, target_channel_index, trace=None, released=False):
     """Schickt den empfangenen Text asynchron an den Telegram-Channel,
-    mit Prefix des Absender-Namens."""
+    mit Prefix des Absender-Namens.
+    released: unvollständige mehrteilige Nachricht nach Ablauf der Wartezeit - ihre Teile
+    wurden schon beim Empfang für Namen und Node-Aktivität gezählt."""
+    if trace is None:
+        trace = tracing.start_trace(TRACE_MESH_TO_TELEGRAM, node=packet.get('from'))
+    trace.mark('handle_text')
+    
     # Debug: Packet-Info anzeigen
     log_packet_debug(packet)
     
     # Text extrahieren
     text = packet.get('decoded', {}).get('text')
     if not text:
-        print(f"[DEBUG] Kein Text in Packet gefunden")
+        file_logger.log_debug("Kein Text in Packet gefunden")
+        trace.finish('no_text')
         return
 
-    # Absender-Node-ID auslesen
+    # Absender-Node-ID auslesen und Namen über den Cache auflösen
     node_id = packet.get('from')
-    # Default-Fallback, falls kein Name vorhanden
-    sender_name = f"Node {node_id}" if node_id is not None else "Unbekannter Node"
-    
-    # Versuche den echten Namen der Node zu ermitteln
-    if node_id is not None and hasattr(interface, 'nodesByNum'):
-        node_info = interface.nodesByNum.get(node_id)
-        if node_info:
-            # Verschiedene Möglichkeiten für den Namen prüfen
-            if 'user' in node_info and node_info['user']:
-                user_info = node_info['user']
-                
-                # Prüfe verschiedene Attribute für den Namen
-                if 'longName' in user_info and user_info['longName']:
-                    sender_name = user_info['longName'].strip()
-                elif 'shortName' in user_info and user_info['shortName']:
-                    sender_name = user_info['shortName'].strip()
-                elif 'id' in user_info and user_info['id']:
-                    sender_name = user_info['id']
-    
-    # Alternative: Versuche auch nodes-Dictionary
-    if sender_name.startswith("Node ") and hasattr(interface, 'nodes'):
-        for node_num, node_data in interface.nodes.items():
-            if node_num == node_id and 'user' in node_data:
-                user_info = node_data['user']
-                if 'longName' in user_info and user_info['longName']:
-                    sender_name = user_info['longName']
-                    break
-                elif 'shortName' in user_info and user_info['shortName']:
-                    sender_name = user_info['shortName']
-                    break
-                elif 'id' in user_info and user_info['id']:
-                    sender_name = user_info['id']
-                    break
+    sender_name = node_names.resolve(node_id, interface)
+    trace.mark('name_resolved')
+    if released:
+        await _forward_text(packet, text, node_id, sender_name, trace)
+        return
+    node_names.heard(node_id, packet)
 
     # Dashboard-Update: Node-Aktivität registrieren
     if node_id is not None:
-        log_node_activity(node_id, sender_name)
+        log_node_activity(node_id, sender_name, packet)
+
+    # Mehrteilige Nachrichten sammeln, bis alle Teile da sind
+    opened = multipart_assembler.opened
+    text = multipart_assembler.add((node_id, packet.get('to')), text, (packet, trace))
+    if text is None:
+        file_logger.log_debug("Teil einer mehrteiligen Nachricht von %s gepuffert", sender_name)
+        if multipart_assembler.opened != opened:
+            # Ein Timer pro neu begonnener Nachricht, nicht pro Teil
+            asyncio.get_running_loop().call_later(
+                MESHTASTIC_MULTIPART_TIMEOUT, _release_expired_multipart, interface, target_channel_index)
+        trace.finish('multipart_pending')
+        return
 
+    await _forward_text(packet, text, node_id, sender_name, trace)
+
+async def _forward_text(packet, text, node_id, sender_name, trace):
+    """Leitet einen vollständigen Text weiter: private Nachrichten an Befehle und privaten Chat,
+    Nachrichten im konfigurierten Kanal an die Telegram-Gruppe"""
     # Prüfe ob es eine private Nachricht ist (to-Feld zeigt spezifische Node an)
     to_id = packet.get('to')
     is_broadcast = (to_id == 4294967295)  # 4294967295 = Broadcast an alle (^all)
@@ -298,78 +377,103 @@ async def handle_text(packet, interface, target_channel_index):
     log_message_filtering(sender_name, to_id, is_broadcast, text)
     
     if not is_broadcast:
-        print(f"[DEBUG] Private Nachricht erkannt - verarbeite...")
-        # Private Nachricht - prüfe zuerst auf Help-Commands
-        if private_chat.handle_meshtastic_help_command(text, node_id, sender_name):
-            print(f"[DEBUG] Help-Command verarbeitet")
-            return  # Help-Command verarbeitet
-            
-        # Prüfe auf BTC-Commands
-        if private_chat.handle_meshtastic_btc_command(text, node_id, sender_name):
-            print(f"[DEBUG] BTC-Command verarbeitet")
-            return  # BTC-Command verarbeitet
-            
-        # Prüfe auf Secret-Commands
-        if private_chat.handle_meshtastic_secret_command(text, node_id, sender_name):
-            print(f"[DEBUG] Secret-Command verarbeitet")
-            return  # Secret-Command verarbeitet
-        
-        # Prüfe auf ungültige Befehle
-        if private_chat.handle_meshtastic_invalid_command(text, node_id, sender_name):
-            print(f"[DEBUG] Ungültiger Command erkannt und Hilfe gesendet")
-            return  # Ungültiger Command verarbeitet
+        trace.mark('private')
+        try:
+            file_logger.log_debug("Private Nachricht erkannt - verarbeite...")
+            # Private Nachricht - prüfe zuerst auf Befehle (!help, !btc, !secret, ungültige Befehle)
+            if private_chat.handle_meshtastic_command(text, node_id, sender_name):
+                return  # Befehl an seinen Handler übergeben
         
-        # Prüfe ob es eine private Chat-Nachricht ist
-        if await private_chat.handle_meshtastic_private_message(node_id, sender_name, text):
-            print(f"[DEBUG] Private Chat-Nachricht weitergeleitet")
-            return  # Private Nachricht weitergeleitet
+            # Prüfe ob es eine private Chat-Nachricht ist
+            if await private_chat.handle_meshtastic_private_message(node_id, sender_name, text):
+                file_logger.log_debug("Private Chat-Nachricht weitergeleitet")
+                return  # Private Nachricht weitergeleitet
         
-        print(f"[DEBUG] Private Nachricht ignoriert (nicht authentifiziert)")
-        # Normale private Nachricht - ignorieren
-        return
+            file_logger.log_debug("Private Nachricht ignoriert (nicht authentifiziert)")
+            # Normale private Nachricht - ignorieren
+            return
+        finally:
+            trace.finish('private')
 
     # Kanal-Filterung: Nur Nachrichten aus dem gewünschten Kanal weiterleiten
     packet_channel = packet.get('channel', packet.get('channelIndex', 0))
     
     # Prüfe ob es der richtige Kanal ist
     if packet_channel != CHANNEL_INDEX:
-        print(f"[DEBUG] Falscher Kanal: {packet_channel} != {CHANNEL_INDEX}")
+        file_logger.log_debug("Falscher Kanal: %s != %s", packet_channel, CHANNEL_INDEX)
+        trace.finish('wrong_channel')
         return
 
-    print(f"[DEBUG] Öffentliche Nachricht - leite an Telegram weiter")
+    file_logger.log_debug("Öffentliche Nachricht - leite an Telegram weiter")
 
-    # Node zur Recent-Liste hinzufügen
-    add_node_to_recent(node_id, sender_name)
+    # Nachricht mit Prefix zusammensetzen (Name in fett, Mesh-Text für HTML maskiert)
+    message = f"<b>{html.escape(sender_name)}</b>: {html.escape(text)}"
 
-    # Nachricht mit Prefix zusammensetzen (Name in fett)
-    message = f"<b>{sender_name}</b>: {text}"
-
-    # Senden
+    # Senden (gedrosselt, kurz aufeinanderfolgende Nachrichten werden zusammengefasst)
     try:
         if TELEGRAM_CHAT_ID and TELEGRAM_CHAT_ID.strip() != '':
-            bot = get_telegram_bot()
-            await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message, parse_mode='HTML')
-            log_message_meshtastic_to_telegram(sender_name, text)
+            trace.mark('telegram_submitted')
+            delivery = telegram_sender.submit(TELEGRAM_CHAT_ID, message, parse_mode='HTML', trace=trace)
+            delivery.add_done_callback(
+                lambda f: _log_telegram_delivery(f, sender_name, text, trace)
+            )
         else:
             # Setup-Modus: Keine Weiterleitung an Telegram
-            print(f"[SETUP] Meshtastic Nachricht ignoriert (keine Chat-ID): {sender_name}: {text}")
+            file_logger.log_debug("[SETUP] Meshtastic Nachricht ignoriert (keine Chat-ID): %s: %s", sender_name, text)
+            trace.finish('setup_mode')
     except Exception as e:
         log_telegram_send_error(e)
+        trace.finish('failed')
 
-async def reset_meshtastic_interface():
-    """Führt einen kompletten Reset der Meshtastic-Verbindung durch"""
-    global meshtastic_interface
-    
+def _dispatch_text(packet, interface, target_channel_index, received_at=None):
+    """Reiht ein Textpaket zur Verarbeitung ein, sofern es nicht schon verarbeitet wurde
+    (Rebroadcast, anderes Radio oder erneute Zustellung nach Wiederverbindung)"""
+    trace = tracing.start_trace(TRACE_MESH_TO_TELEGRAM, start=received_at, node=packet.get('from'))
+    trace.mark('dispatched')
+    duplicate = radio_pool.is_duplicate(packet)
+    dashboard.update_dedupe_stats(radio_pool.dedupe.hits, radio_pool.dedupe.misses, len(radio_pool.dedupe))
+    if duplicate:
+        file_logger.log_debug("Duplikat von %s (ID %s) verworfen", packet.get('from'), packet.get('id'))
+        trace.finish('duplicate')
+        return
+    is_broadcast = packet.get('to') == 4294967295
+    ingress_queue.put(packet.get('from'), is_broadcast, packet, interface, target_channel_index, trace)
+
+def _release_expired_multipart(interface, target_channel_index):
+    """Reiht unvollständige mehrteilige Nachrichten nach Ablauf der Wartezeit mit Lückenmarkierung
+    wieder in die Empfangs-Warteschlange ein (Reihenfolge pro Node bleibt erhalten)"""
+    for (packet, first_trace), text in multipart_assembler.take_expired():
+        node_id = packet.get('from')
+        file_logger.log_warning(f"Mehrteilige Nachricht von {node_id} unvollständig weitergeleitet")
+        packet = dict(packet, decoded=dict(packet.get('decoded', {}), text=text))
+        # Laufzeit ab Empfang des ersten Teils messen
+        trace = tracing.start_trace(TRACE_MESH_TO_TELEGRAM, start=first_trace.start, node=node_id)
+        trace.mark('multipart_released')
+        ingress_queue.put(node_id, packet.get('to') == 4294967295,
+                          packet, interface, target_channel_index, trace, True)
+
+def _log_telegram_delivery(delivery, sender_name, text, trace):
+    """Protokolliert das Ergebnis einer gedrosselten Telegram-Zustellung"""
+    if not delivery.cancelled() and delivery.result():
+        metrics.MESH_TO_TELEGRAM_SECONDS.observe(trace.elapsed())
+        trace.finish('ok')
+        log_message_meshtastic_to_telegram(sender_name, text)
+    else:
+        trace.finish('failed')
+        log_telegram_send_error(f"Nachricht von {sender_name} konnte nicht zugestellt werden")
+
+async def reset_meshtastic_interface(radio):
+    """Führt einen kompletten Reset der Meshtastic-Verbindung eines Radios durch"""
     try:
         file_logger.log_meshtastic_reset()
         
         # Interface schließen falls vorhanden
-        if meshtastic_interface:
+        if radio.interface:
             try:
-                meshtastic_interface.close()
+                radio.interface.close()
             except:
                 pass
-            meshtastic_interface = None
+            radio.interface = None
         
         # Event-Subscriptions aufräumen
         try:
@@ -380,14 +484,31 @@ async def reset_meshtastic_interface():
         # Kurze Wartezeit für vollständige Bereinigung
         await asyncio.sleep(2)
         
-        file_logger.log_info("Meshtastic Interface komplett zurückgesetzt")
+        file_logger.log_info(f"Meshtastic Interface {radio.host} komplett zurückgesetzt")
         
     except Exception as e:
         file_logger.log_error("reset_meshtastic_interface", str(e))
 
 async def meshtastic_loop():
-    """Hauptschleife für Meshtastic-Verbindung mit stabiler Wiederverbindung"""
-    global meshtastic_interface
+    """Startet je Radio eine eigene Verbindungsschleife"""
+    # Link-Statistik für die Wahl des Sende-Radios
+    pub.subscribe(radio_pool.on_receive, 'meshtastic.receive')
+    if len(radio_pool) > 1:
+        file_logger.log_info(f"Multi-Radio-Betrieb mit {len(radio_pool)} Radios: {', '.join(r.host for r in radio_pool)}")
+    try:
+        await asyncio.gather(*(radio_connection_loop(radio) for radio in radio_pool))
+    finally:
+        try:
+            pub.unsubscribe(radio_pool.on_receive, 'meshtastic.receive')
+        except:
+            pass
+        await outbound_spool.close()
+        node_names.close()
+
+async def radio_connection_loop(radio):
+    """Hauptschleife für die Verbindung eines Radios mit stabiler Wiederverbindung"""
+    health = radio.health
+    disconnected_at = None  # Zeitpunkt des letzten Verbindungsverlusts (für die Metrik)
     reconnect_delay = MESHTASTIC_RECONNECT_DELAY
     max_reconnect_delay = MESHTASTIC_MAX_RECONNECT_DELAY
     device_was_online = False
@@ -406,10 +527,14 @@ async def meshtastic_loop():
             
             last_connection_attempt = asyncio.get_event_loop().time()
             
-            # Prüfe erst ob das Gerät im Netzwerk erreichbar ist und der TCP-Port verfügbar ist
-            if not await ping_meshtastic_host(MESHTASTIC_HOST, MESHTASTIC_PING_TIMEOUT):
+            # Erreichbarkeit vor dem Verbinden prüfen: der TCPInterface-Aufbau blockiert bei einem
+            # nicht erreichbaren Host bis zum Timeout des Betriebssystems (Test über den Health-Monitor)
+            if not await ping_meshtastic_host(radio.host, MESHTASTIC_PING_TIMEOUT):
                 if device_was_online:
-                    log_device_offline(MESHTASTIC_HOST)
+                    if radio_pool.is_connected:
+                        file_logger.log_warning(f"Gerät {radio.host} ist nicht mehr im Netzwerk erreichbar")
+                    else:
+                        log_device_offline(radio.host)
                     device_was_online = False
                     consecutive_failures = 0  # Reset bei erkanntem Offline-Status
                 
@@ -417,18 +542,14 @@ async def meshtastic_loop():
                 await asyncio.sleep(MESHTASTIC_NETWORK_CHECK_INTERVAL)
                 continue
             
-            # Gerät ist im Netzwerk - aber warte auf vollständige Bereitschaft
+            # Gerät ist im Netzwerk - kurz warten bis es vollständig bereit ist
             if not device_was_online:
-                log_device_back_online(MESHTASTIC_HOST)
-                # Warte bis Gerät vollständig bereit ist
-                if not await wait_for_device_ready(MESHTASTIC_HOST, 30):
-                    log_meshtastic_error("Gerät antwortet nicht rechtzeitig")
-                    await asyncio.sleep(MESHTASTIC_NETWORK_CHECK_INTERVAL)
-                    continue
+                log_network_available(radio.host)
+                await asyncio.sleep(2)
                 device_was_online = True
             
             # 1) Verbinden
-            log_meshtastic_connecting(MESHTASTIC_HOST)
+            log_meshtastic_connecting(radio.host)
             try:
                 # Import von meshtastic (immer am Anfang)
                 import meshtastic
@@ -442,7 +563,7 @@ async def meshtastic_loop():
                     file_logger.log_warning(f"Zu viele Timeout-Fehler ({consecutive_timeouts}) - vollständiger Reset")
                     
                     # Kompletten Interface-Reset durchführen
-                    await reset_meshtastic_interface()
+                    await reset_meshtastic_interface(radio)
                     
                     # Längere Wartezeit vor Reset
                     await asyncio.sleep(10)
@@ -458,8 +579,12 @@ async def meshtastic_loop():
                     
                     file_logger.log_info("Verbindungsreset abgeschlossen - versuche erneut zu verbinden")
                 
-                meshtastic_interface = meshtastic.tcp_interface.TCPInterface(hostname=MESHTASTIC_HOST)
-                log_meshtastic_connected(MESHTASTIC_HOST)
+                radio.interface = meshtastic.tcp_interface.TCPInterface(hostname=radio.host)
+                log_meshtastic_connected(radio.host)
+                startup_profile.milestone(startup_profile.READY_MESHTASTIC)
+                if disconnected_at is not None:
+                    metrics.RECONNECT_SECONDS.observe(time.monotonic() - disconnected_at, host=radio.host)
+                    disconnected_at = None
                 consecutive_failures = 0  # Reset bei erfolgreicher Verbindung
                 consecutive_timeouts = 0  # Reset bei erfolgreicher Verbindung
                 reconnect_delay = MESHTASTIC_RECONNECT_DELAY  # Reset delay
@@ -485,9 +610,10 @@ async def meshtastic_loop():
 
             # 2) Kanalindex auslesen
             target_channel_index = CHANNEL_INDEX
+            connected_interface = radio.interface
             try:
-                if hasattr(meshtastic_interface, 'localConfig') and hasattr(meshtastic_interface.localConfig, 'channels'):
-                    for ch in meshtastic_interface.localConfig.channels:
+                if hasattr(radio.interface, 'localConfig') and hasattr(radio.interface.localConfig, 'channels'):
+                    for ch in radio.interface.localConfig.channels:
                         if hasattr(ch, 'name') and ch.name == CHANNEL_NAME:
                             target_channel_index = ch.index
                             log_channel_found(CHANNEL_NAME, target_channel_index)
@@ -497,41 +623,47 @@ async def meshtastic_loop():
             except Exception as e:
                 log_channel_config_error()
 
+            # Modem-Preset vom Gerät für die Airtime-Schätzung übernehmen
+            try:
+                from meshtastic.protobuf import config_pb2
+                preset_value = radio.interface.localNode.localConfig.lora.modem_preset
+                outbound_scheduler.set_preset(config_pb2.Config.LoRaConfig.ModemPreset.Name(preset_value))
+            except Exception:
+                pass  # Konfiguriertes Preset beibehalten
+
             # 3) Event-Loop und Callback
             loop = asyncio.get_running_loop()
             
+            radio.channel_index = target_channel_index
+            
             def on_receive(packet, interface):
-                loop.call_soon_threadsafe(
-                    lambda: asyncio.create_task(handle_text(packet, interface, target_channel_index))
-                )
+                # Das Topic gilt für alle Radios - nur Pakete dieser Verbindung annehmen
+                if interface is not connected_interface:
+                    return
+                # radio.channel_index statt des Werts beim Verbinden: Änderungen der Konfiguration gelten sofort
+                loop.call_soon_threadsafe(_dispatch_text, packet, interface, radio.channel_index, time.monotonic())
             
             pub.subscribe(on_receive, 'meshtastic.receive.text')
             
-            # 4) Moderatere Verbindungsüberwachung
-            last_heartbeat = asyncio.get_event_loop().time()
-            heartbeat_interval = MESHTASTIC_HEARTBEAT_INTERVAL
-            last_network_check = 0
+            # Passive Lebenszeichen für den Health-Monitor
+            health.attach(radio.interface, loop)
+            # Während des Abbruchs zwischengespeicherte Nachrichten nachsenden
+            outbound_spool.schedule_replay(_send_spooled)
+            pub.subscribe(health.on_receive, 'meshtastic.receive')
+            pub.subscribe(health.on_connection_lost, 'meshtastic.connection.lost')
             
+            # Node-Namen aus der Node-Datenbank übernehmen und über Updates aktuell halten
+            node_names.populate(radio.interface, loop)
+            pub.subscribe(node_names.on_node_updated, 'meshtastic.node.updated')
+            
+            # 4) Verbindungsüberwachung über den Health-Monitor (passiv, aktive Tests nur bei Funkstille)
             try:
                 while True:
-                    await asyncio.sleep(2)  # Moderatere Prüfung
-                    
-                    current_time = asyncio.get_event_loop().time()
+                    await asyncio.sleep(MESHTASTIC_HEARTBEAT_INTERVAL)
                     
-                    # Prüfe Verbindungsstatus alle X Sekunden
-                    if current_time - last_heartbeat >= heartbeat_interval:
-                        if not await check_meshtastic_connection():
-                            log_meshtastic_connection_lost()
-                            break  # Verbindung verloren, neu verbinden
-                        last_heartbeat = current_time
-                    
-                    # Zusätzlicher Netzwerk-Ping (weniger häufig)
-                    if current_time - last_network_check >= heartbeat_interval * 2:
-                        if not await ping_meshtastic_host(MESHTASTIC_HOST, MESHTASTIC_PING_TIMEOUT):
-                            log_device_offline(MESHTASTIC_HOST)
-                            device_was_online = False
-                            break  # Gerät nicht mehr im Netzwerk
-                        last_network_check = current_time
+                    if await health.evaluate() == STATE_DISCONNECTED:
+                        log_meshtastic_connection_lost()
+                        break  # Verbindung verloren, neu verbinden
                         
             except asyncio.CancelledError:
                 break
@@ -552,14 +684,20 @@ async def meshtastic_loop():
             except:
                 pass
                 
-            if meshtastic_interface:
+            if radio.interface:
                 try:
-                    meshtastic_interface.close()
+                    radio.interface.close()
                 except:
                     pass
-                meshtastic_interface = None
-                
-            log_meshtastic_disconnected()
+                radio.interface = None
+                disconnected_at = time.monotonic()
+            
+            health.detach()
+            if radio_pool.is_connected:
+                # Andere Radios sind weiter verbunden - Dashboard bleibt verbunden
+                file_logger.log_warning(f"Meshtastic-Verbindung zu {radio.host} getrennt")
+            else:
+                log_meshtastic_disconnected()
             
             # Bei zu vielen Timeout-Fehlern zusätzliches Cleanup
             if consecutive_timeouts >= max_consecutive_timeouts - 1:
@@ -567,7 +705,7 @@ async def meshtastic_loop():
                 await asyncio.sleep(3)  # Etwas länger warten
             
         # Intelligente Wiederverbindung mit adaptiver Wartezeit
-        if device_was_online or await ping_meshtastic_host(MESHTASTIC_HOST, MESHTASTIC_PING_TIMEOUT):
+        if device_was_online:
             # Gerät ist online, aber mit angemessener Wartezeit besonders nach Fehlern
             wait_time = max(MESHTASTIC_RECONNECT_DELAY, consecutive_failures)
             log_meshtastic_reconnecting(wait_time)
@@ -582,46 +720,57 @@ async def meshtastic_loop():
 
 async def run_telegram_bot():
     """Startet den Telegram-Bot"""
-    # Token aus aktueller Konfiguration holen
-    import setup
-    config_data = setup.get_config()
-    
-    if config_data and config_data.get('telegram_token'):
-        token = config_data['telegram_token']
-    else:
-        from config import TELEGRAM_TOKEN
-        token = TELEGRAM_TOKEN
-    
-    # Bot-Token validieren
-    if not token or token.strip() == '':
+    # Gemeinsame Application (ein Verbindungspool für alle Sender) holen
+    try:
+        application = telegram_client.get_application()
+    except ValueError:
         print("❌ Telegram Token ist nicht konfiguriert!")
         return
     
-    # Application erstellen
-    application = Application.builder().token(token).build()
+    # python-telegram-bot erst hier laden (siehe startup_profile.preload)
+    from telegram.ext import MessageHandler, filters
     
     # Message-Handler hinzufügen (alle Nachrichten, nicht nur Text)
     application.add_handler(MessageHandler(filters.ALL, handle_telegram_message))
     
+    webhook_server = None
+    
     # Bot starten
     try:
         await application.initialize()
         await application.start()
         
-        # Test: Bot-Info abrufen
-        bot_info = await application.bot.get_me()
+        # Bot-Info (von initialize() bereits abgefragt, keine zusätzliche Anfrage)
+        bot_info = await telegram_client.get_me()
         log_telegram_connected(bot_info.first_name, bot_info.username)
         
         # Bot-Username für private Chat Nachrichten speichern
         await private_chat.get_bot_info()
         
-        # Polling starten
-        await application.updater.start_polling(drop_pending_updates=True)
-        log_telegram_polling_started()
+        if TELEGRAM_WEBHOOK_ENABLED:
+            # Webhook: Telegram liefert Updates an den lokalen Endpunkt
+            from telegram_webhook import TelegramWebhookServer
+            webhook_server = TelegramWebhookServer(
+                application,
+                listen=TELEGRAM_WEBHOOK_LISTEN,
+                port=TELEGRAM_WEBHOOK_PORT,
+                path=TELEGRAM_WEBHOOK_PATH,
+                secret_token=TELEGRAM_WEBHOOK_SECRET or None
+            )
+            await webhook_server.start()
+            if TELEGRAM_WEBHOOK_URL:
+                await webhook_server.register(application.bot, TELEGRAM_WEBHOOK_URL)
+            else:
+                file_logger.log_warning("telegram_webhook_url nicht gesetzt - Webhook muss extern mit telegram_webhook_secret registriert werden")
+            log_telegram_webhook_started(TELEGRAM_WEBHOOK_LISTEN, TELEGRAM_WEBHOOK_PORT, webhook_server.path)
+        else:
+            # Polling starten
+            await application.updater.start_polling(drop_pending_updates=True)
+            log_telegram_polling_started()
+        startup_profile.milestone(startup_profile.READY_TELEGRAM)
         
-        # Warten bis gestoppt
-        while True:
-            await asyncio.sleep(1)
+        # Warten bis gestoppt (Abbruch über CancelledError)
+        await asyncio.Event().wait()
     except Exception as e:
         log_telegram_error(e)
     except asyncio.CancelledError:
@@ -629,7 +778,10 @@ async def run_telegram_bot():
     finally:
         log_telegram_stopping()
         try:
-            await application.updater.stop()
+            if webhook_server:
+                await webhook_server.stop()
+            elif application.updater.running:
+                await application.updater.stop()
             await application.stop()
             await application.shutdown()
         except:
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Metrik-Modul für das Meshtastic ↔ Telegram Gateway
+Einfache Zähler, Messwerte und Histogramme ohne zusätzliche Abhängigkeit.
+Ein lokaler aiohttp-Server gibt sie unter /metrics im Prometheus-Textformat
+aus und beantwortet /healthz für Orchestrierungswerkzeuge.
+"""
+
+import asyncio
+import bisect
+
+import file_logger
+
+# Latenz-Buckets in Sekunden (Funkstrecken dauern auch mal mehrere Sekunden)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Dauer bis zur Wiederverbindung in Sekunden
+RECONNECT_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_registry = []
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Gemeinsame Basis: Name, Beschreibung, Labels; optional Wert per Funktion beim Abruf"""
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), func=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.func = func  # Liefert den Wert (oder {Label-Tupel: Wert}) erst beim Abruf
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _collect(self):
+        if self.func is None:
+            return self._values.items()
+        value = self.func()
+        return value.items() if isinstance(value, dict) else [((), value)]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, value in self._collect():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler"""
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Momentaner Messwert"""
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Verteilung von Messwerten in festen Buckets"""
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            # Zähler je Bucket (nicht kumuliert), Summe, Anzahl
+            series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, (bucket_counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render_metrics():
+    """Gibt alle registrierten Metriken im Prometheus-Textformat zurück"""
+    lines = []
+    for metric in _registry:
+        try:
+            lines.extend(metric.render())
+        except Exception as e:
+            file_logger.log_error("metrics", f"{metric.name}: {e}")
+    return "\n".join(lines) + "\n"
+
+
+def _dashboard_value(attribute):
+    """Liest einen Zähler aus den Dashboard-Daten (erst beim Abruf)"""
+    def read():
+        import dashboard
+        return getattr(dashboard.dashboard_data, attribute)
+    return read
+
+
+# ——— Gateway-Metriken ———
+
+MESSAGES_TG_TO_MESH = Counter(
+    'mesh2gram_messages_telegram_to_mesh_total', "Nachrichten von Telegram an Meshtastic",
+    func=_dashboard_value('messages_tg_to_mesh'))
+MESSAGES_MESH_TO_TG = Counter(
+    'mesh2gram_messages_mesh_to_telegram_total', "Nachrichten von Meshtastic an Telegram",
+    func=_dashboard_value('messages_mesh_to_tg'))
+PRIVATE_MESSAGES = Counter(
+    'mesh2gram_private_messages_total', "Weitergeleitete private Nachrichten",
+    func=_dashboard_value('private_messages'))
+MESHTASTIC_DISCONNECTIONS = Counter(
+    'mesh2gram_meshtastic_disconnections_total', "Verbindungsabbrüche zu Meshtastic",
+    func=_dashboard_value('meshtastic_disconnections'))
+
+MESH_TO_TELEGRAM_SECONDS = Histogram(
+    'mesh2gram_mesh_to_telegram_seconds', "Dauer vom Empfang eines Mesh-Pakets bis zur Telegram-Zustellung")
+TELEGRAM_TO_RADIO_SECONDS = Histogram(
+    'mesh2gram_telegram_to_radio_seconds', "Dauer vom Telegram-Update bis zum Senden über Funk")
+SEND_FAILURES = Counter(
+    'mesh2gram_send_failures_total', "Fehlgeschlagene Sendungen nach Ziel und Ursache", ('target', 'cause'))
+RECONNECT_SECONDS = Histogram(
+    'mesh2gram_meshtastic_reconnect_seconds', "Dauer vom Verbindungsverlust bis zur Wiederverbindung",
+    ('host',), buckets=RECONNECT_BUCKETS)
+INGRESS_QUEUE_DEPTH = Gauge(
+    'mesh2gram_ingress_queue_depth', "Wartende empfangene Pakete",
+    func=_dashboard_value('ingress_queue_depth'))
+OUTBOUND_QUEUE_DEPTH = Gauge(
+    'mesh2gram_outbound_queue_depth', "Wartende ausgehende Funk-Nachrichten",
+    func=_dashboard_value('outbound_queue_depth'))
+DUPLICATES_DROPPED = Counter(
+    'mesh2gram_duplicates_dropped_total', "Verworfene doppelte Mesh-Pakete",
+    func=_dashboard_value('dedupe_hits'))
+ASYNCIO_TASKS = Gauge(
+    'mesh2gram_asyncio_tasks', "Anzahl laufender asyncio-Tasks",
+    func=lambda: len(asyncio.all_tasks()))
+
+
+class MetricsServer:
+    """Lokaler HTTP-Server für /metrics und /healthz"""
+
+    def __init__(self, listen='127.0.0.1', port=9101, health_check=None):
+        self.listen = listen
+        self.port = port
+        self.health_check = health_check  # Liefert (ok, Text) für /healthz
+        self._runner = None
+
+    async def start(self):
+        """Startet den HTTP-Server (aiohttp wird erst hier geladen)"""
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle_metrics)
+        app.router.add_get('/healthz', self.handle_healthz)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.listen, self.port)
+        await site.start()
+        file_logger.log_info(f"Metrik-Endpunkt lauscht auf {self.listen}:{self.port}")
+
+    async def stop(self):
+        """Beendet den HTTP-Server"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_metrics(self, request):
+        from aiohttp import web
+        return web.Response(text=render_metrics(), content_type='text/plain', charset='utf-8',
+                            headers={'X-Content-Type-Options': 'nosniff'})
+
+    async def handle_healthz(self, request):
+        ok, detail = (True, "ok") if self.health_check is None else self.health_check()
+        from aiohttp import web
+        return web.Response(status=200 if ok else 503, text=detail + "\n")
+
+
+async def run_metrics_server(listen, port, health_check=None):
+    """Betreibt den Metrik-Server bis zum Abbruch"""
+    server = MetricsServer(listen, port, health_check)
+    try:
+        await server.start()
+        await asyncio.Event().wait()
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        file_logger.log_error("metrics", f"Metrik-Server konnte nicht gestartet werden: {e}")
+    finally:
+        await server.stop()
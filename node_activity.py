@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Node-Aktivität für das Meshtastic ↔ Telegram Gateway
+Eine Tabelle über alle gesehenen Nodes mit Nachrichtenzahl, zuletzt gesehen,
+SNR/RSSI und Hops. Aktualisieren ist O(1); die k zuletzt aktiven und die k
+aktivsten Nodes lassen sich in O(k) abfragen, ohne die Tabelle zu sortieren:
+
+- Die Einfügereihenfolge des OrderedDict ist zugleich die Aktualitätsreihenfolge
+  (move_to_end bei jeder Nachricht) und dient als LRU für die Obergrenze.
+- Für die Nachrichtenzahl liegen die Nodes in Eimern gleicher Anzahl, die als
+  aufsteigend sortierte, doppelt verkettete Liste verbunden sind. Da die Anzahl
+  immer um eins steigt, wandert eine Node nur in den direkt folgenden Eimer.
+"""
+
+import time
+from collections import OrderedDict
+from itertools import islice
+
+
+class NodeActivity:
+    """Aktivität einer einzelnen Node"""
+    __slots__ = ('node_id', 'name', 'count', 'first_seen', 'last_seen', 'snr', 'rssi', 'hops', '_bucket')
+
+    def __init__(self, node_id, name, now):
+        self.node_id = node_id
+        self.name = name
+        self.count = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.snr = None
+        self.rssi = None
+        self.hops = None
+        self._bucket = None
+
+
+class _CountBucket:
+    """Alle Nodes mit derselben Nachrichtenzahl (Reihenfolge: zuletzt erhöht am Ende)"""
+    __slots__ = ('count', 'nodes', 'prev', 'next')
+
+    def __init__(self, count):
+        self.count = count
+        self.nodes = {}
+        self.prev = None
+        self.next = None
+
+
+class NodeActivityTable:
+    """Aktivität aller gesehenen Nodes mit LRU-Obergrenze"""
+
+    def __init__(self, max_nodes=5000):
+        self.max_nodes = max(1, max_nodes)
+        self._nodes = OrderedDict()  # Node-ID -> NodeActivity, zuletzt gesehen am Ende
+        self._lowest = None          # Eimer mit der kleinsten Nachrichtenzahl
+        self._highest = None         # Eimer mit der größten Nachrichtenzahl
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node_id):
+        return node_id in self._nodes
+
+    def get(self, node_id):
+        return self._nodes.get(node_id)
+
+    def update(self, node_id, name, snr=None, rssi=None, hops=None, now=None):
+        """Registriert eine Nachricht einer Node (O(1))"""
+        now = time.time() if now is None else now
+        entry = self._nodes.get(node_id)
+        if entry is None:
+            if len(self._nodes) >= self.max_nodes:
+                self._evict()
+            entry = self._nodes[node_id] = NodeActivity(node_id, name, now)
+        else:
+            self._nodes.move_to_end(node_id)
+            entry.name = name  # Name kann sich geändert haben
+        entry.last_seen = now
+        if snr is not None:
+            entry.snr = snr
+        if rssi is not None:
+            entry.rssi = rssi
+        if hops is not None:
+            entry.hops = hops
+        self._increment(entry)
+        return entry
+
+    def recent(self, k):
+        """Die k zuletzt aktiven Nodes, neueste zuerst (O(k))"""
+        return list(islice(reversed(self._nodes.values()), k))
+
+    def busiest(self, k):
+        """Die k Nodes mit den meisten Nachrichten, bei Gleichstand die zuletzt aktive zuerst (O(k))"""
+        result = []
+        bucket = self._highest
+        while bucket is not None and len(result) < k:
+            for node_id in reversed(bucket.nodes):
+                result.append(self._nodes[node_id])
+                if len(result) >= k:
+                    break
+            bucket = bucket.prev
+        return result
+
+    def remove(self, node_id):
+        entry = self._nodes.pop(node_id, None)
+        if entry is not None:
+            self._detach(entry)
+        return entry
+
+    def _evict(self):
+        """Entfernt die am längsten nicht gesehene Node"""
+        node_id, entry = self._nodes.popitem(last=False)
+        self._detach(entry)
+        self.evicted += 1
+
+    def _increment(self, entry):
+        """Verschiebt die Node in den Eimer count + 1"""
+        old = entry._bucket
+        count = entry.count + 1
+        target = old.next if old is not None else self._lowest
+        if target is None or target.count != count:
+            target = self._insert_after(old, _CountBucket(count))
+        target.nodes[entry.node_id] = None
+        entry._bucket = target
+        entry.count = count
+        if old is not None:
+            self._discard(old, entry.node_id)
+
+    def _detach(self, entry):
+        if entry._bucket is not None:
+            self._discard(entry._bucket, entry.node_id)
+            entry._bucket = None
+
+    def _discard(self, bucket, node_id):
+        del bucket.nodes[node_id]
+        if bucket.nodes:
+            return
+        # Leeren Eimer aus der Liste lösen
+        if bucket.prev is not None:
+            bucket.prev.next = bucket.next
+        else:
+            self._lowest = bucket.next
+        if bucket.next is not None:
+            bucket.next.prev = bucket.prev
+        else:
+            self._highest = bucket.prev
+
+    def _insert_after(self, previous, bucket):
+        """Fügt einen Eimer hinter previous ein (None = am Anfang)"""
+        following = previous.next if previous is not None else self._lowest
+        bucket.prev = previous
+        bucket.next = following
+        if previous is not None:
+            previous.next = bucket
+        else:
+            self._lowest = bucket
+        if following is not None:
+            following.prev = bucket
+        else:
+            self._highest = bucket
+        return bucket
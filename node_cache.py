@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Node-Namen-Cache für das Meshtastic ↔ Telegram Gateway
+Hält die Anzeigenamen der Nodes nach Node-Nummer vor. Der Cache wird beim
+Verbinden aus der Node-Datenbank gefüllt und über NODEINFO-Updates aktuell
+gehalten, sodass die Namensauflösung pro Nachricht ein Dictionary-Zugriff ist.
+
+Optional werden die Node-Daten (Name, Hardware, zuletzt gehört, Hops,
+Position) wie die privaten Chats als Journal + Snapshot gesichert (chat_store)
+und beim Start geladen. Namen sind dann sofort nach einem Neustart oder einer
+Wiederverbindung bekannt, ohne auf NODEINFO-Pakete zu warten.
+
+NODEINFO-Updates kommen aus dem Reader-Thread der Meshtastic-Bibliothek und
+werden an den Event-Loop übergeben; der Cache wird nur dort verändert.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+import file_logger
+from chat_store import JournalStore
+
+
+def extract_node_name(node_info):
+    """Ermittelt den Anzeigenamen aus einem Node-Eintrag (longName > shortName > id)"""
+    if not node_info:
+        return None
+    user_info = node_info.get('user')
+    if not user_info:
+        return None
+    if user_info.get('longName'):
+        return user_info['longName'].strip()
+    if user_info.get('shortName'):
+        return user_info['shortName'].strip()
+    if user_info.get('id'):
+        return user_info['id']
+    return None
+
+
+def node_record(node_info, name):
+    """Kompakter, speicherbarer Auszug aus einem Node-Eintrag der Node-Datenbank"""
+    user_info = node_info.get('user') or {}
+    position = node_info.get('position') or {}
+    record = {'name': name}
+    if user_info.get('shortName'):
+        record['short'] = user_info['shortName']
+    if user_info.get('hwModel'):
+        record['hw'] = user_info['hwModel']
+    if node_info.get('lastHeard'):
+        record['heard'] = int(node_info['lastHeard'])
+    if node_info.get('hopsAway') is not None:
+        record['hops'] = node_info['hopsAway']
+    if position.get('latitude') is not None and position.get('longitude') is not None:
+        record['pos'] = [round(position['latitude'], 5), round(position['longitude'], 5), position.get('altitude')]
+    return record
+
+
+class NodeNameCache:
+    """Cache Node-Nummer -> Anzeigename, optional mit gesicherten Node-Daten"""
+
+    def __init__(self, path=None, max_nodes=2000, max_age=30 * 86400, heard_resolution=300,
+                 fsync_interval=1.0):
+        self.max_nodes = max_nodes
+        self.max_age = max_age
+        self.heard_resolution = heard_resolution  # "zuletzt gehört" nur in diesem Raster speichern
+        self._names = {}
+        self._nodes = OrderedDict()  # Node-Nummer -> Datensatz (siehe node_record), zuletzt gehört am Ende
+        self._store = None
+        self._loop = None  # Event-Loop, in dem der Cache verändert wird (gesetzt in populate)
+        if path:
+            self._store = JournalStore(path, name='node-db', fsync_interval=fsync_interval,
+                                       compact_threshold=max(500, max_nodes))
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._names)
+
+    def load(self):
+        """Lädt die gesicherten Node-Daten (beim Start, vor der ersten Verbindung)"""
+        if self._store is None or self._loaded:
+            return
+        self._loaded = True
+        try:
+            state = self._store.load()
+        except Exception as e:
+            file_logger.log_error("NodeNameCache", f"Node-Datenbank konnte nicht geladen werden: {e}")
+            state = {}
+        self._store.start()
+
+        cutoff = time.time() - self.max_age
+        records = sorted(state.items(), key=lambda item: item[1].get('heard', 0), reverse=True)
+        kept = []
+        for key, record in records:
+            try:
+                node_num = int(key)
+            except ValueError:
+                continue
+            if len(kept) >= self.max_nodes or record.get('heard', cutoff) < cutoff:
+                self._store.record_delete(key)
+                continue
+            kept.append((node_num, record))
+        for node_num, record in reversed(kept):  # Älteste zuerst, damit die Reihenfolge "zuletzt gehört" stimmt
+            self._nodes[node_num] = record
+            if record.get('name'):
+                self._names.setdefault(node_num, record['name'])
+        file_logger.log_info(f"Node-Datenbank geladen: {len(self._nodes)} Nodes")
+
+    def close(self):
+        """Schreibt ausstehende Änderungen und verdichtet die Node-Datenbank"""
+        if self._store is not None and self._loaded:
+            self._store.close()
+
+    def populate(self, interface, loop=None):
+        """Füllt den Cache aus der Node-Datenbank des Interfaces (im Event-Loop)"""
+        self._loop = loop or asyncio.get_running_loop()
+        nodes_by_num = getattr(interface, 'nodesByNum', None) or {}
+        count = 0
+        # Nach "zuletzt gehört" sortiert übernehmen, damit die Obergrenze die ältesten Nodes verdrängt
+        for node_num, node_info in sorted(nodes_by_num.items(), key=lambda item: item[1].get('lastHeard') or 0):
+            name = extract_node_name(node_info)
+            if name:
+                self._names[node_num] = name
+                self._remember(node_num, node_info, name)
+                count += 1
+        file_logger.log_debug(f"Node-Namen-Cache gefüllt: {count} Nodes")
+
+    def on_node_updated(self, node, interface=None):
+        """PubSub-Listener für 'meshtastic.node.updated' (Reader-Thread der Bibliothek)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._apply_node_update, node)
+        else:
+            self._apply_node_update(node)
+
+    def _apply_node_update(self, node):
+        """Übernimmt ein NODEINFO-/User-Update in den Cache"""
+        try:
+            node_num = node.get('num')
+            name = extract_node_name(node)
+            if node_num is not None and name:
+                self._names[node_num] = name
+                self._remember(node_num, node, name)
+        except Exception as e:
+            file_logger.log_error("NodeNameCache", str(e))
+
+    def set_name(self, node_id, name):
+        """Setzt den Namen einer Node direkt"""
+        if node_id is not None and name:
+            self._names[node_id] = name
+
+    def heard(self, node_id, packet):
+        """Vermerkt ein empfangenes Paket (zuletzt gehört, Hops) für eine bekannte Node"""
+        record = self._nodes.get(node_id)
+        if record is None or self._store is None:
+            return
+        now = int(time.time())
+        hop_start = packet.get('hopStart')
+        hops = hop_start - packet.get('hopLimit', 0) if hop_start is not None else record.get('hops')
+        if now - record.get('heard', 0) < self.heard_resolution and hops == record.get('hops'):
+            return
+        updated = dict(record, heard=now)
+        if hops is not None:
+            updated['hops'] = hops
+        self._nodes[node_id] = updated
+        self._nodes.move_to_end(node_id)
+        self._store.record_put(str(node_id), updated)
+
+    def info(self, node_id):
+        """Gesicherte Node-Daten (Name, Hardware, zuletzt gehört, Hops, Position) oder None"""
+        return self._nodes.get(node_id)
+
+    def _remember(self, node_num, node_info, name):
+        """Übernimmt einen Node-Eintrag; geschrieben wird nur bei relevanten Änderungen"""
+        if self._store is None:
+            return
+        self.load()  # Ohne geladenen Stand würde die Verdichtung gesicherte Nodes verwerfen
+        record = node_record(node_info, name)
+        old = self._nodes.get(node_num)
+        if old is not None:
+            if record.get('heard') is None or record['heard'] - old.get('heard', 0) < self.heard_resolution:
+                record['heard'] = old.get('heard')
+                if record['heard'] is None:
+                    del record['heard']
+            if record == old:
+                return
+            if record.get('heard') != old.get('heard'):
+                self._nodes.move_to_end(node_num)
+        elif len(self._nodes) >= self.max_nodes:
+            self._evict_oldest()
+        self._nodes[node_num] = record
+        self._store.record_put(str(node_num), record)
+
+    def _evict_oldest(self):
+        """Entfernt die am längsten nicht gehörte Node (nur wenn die Obergrenze erreicht ist)"""
+        node_num, _ = self._nodes.popitem(last=False)
+        self._store.record_delete(str(node_num))
+
+    def get(self, node_id):
+        """Gibt den gecachten Namen oder None zurück"""
+        return self._names.get(node_id)
+
+    def resolve(self, node_id, interface=None):
+        """Löst eine Node-Nummer in einen Anzeigenamen auf (mit Fallback 'Node <id>')"""
+        if node_id is None:
+            return "Unbekannter Node"
+
+        name = self._names.get(node_id)
+        if name:
+            return name
+
+        # Cache-Miss: einmalig in der Node-Datenbank nachsehen
+        nodes_by_num = getattr(interface, 'nodesByNum', None)
+        if nodes_by_num:
+            name = extract_node_name(nodes_by_num.get(node_id))
+            if name:
+                self._names[node_id] = name
+                return name
+
+        return f"Node {node_id}"
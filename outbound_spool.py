@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Zwischenspeicher für ausgehende Funk-Nachrichten des Meshtastic ↔ Telegram Gateways
+Nachrichten von Telegram, die während eines Verbindungsabbruchs nicht gesendet
+werden können, landen hier statt verworfen zu werden. Sie werden wie die
+privaten Chats als Journal + Snapshot auf der Platte gesichert (chat_store)
+und überstehen so auch einen Neustart. Sobald wieder ein Radio verbunden ist,
+werden sie gedrosselt und in der ursprünglichen Reihenfolge nachgesendet;
+zu alte Nachrichten verfallen.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+
+import file_logger
+from chat_store import JournalStore
+
+
+class OutboundSpool:
+    """Festplattengestützte Warteschlange für nicht zugestellte Nachrichten an das Mesh"""
+
+    def __init__(self, path='outbound_spool.json', max_age=900, max_entries=200,
+                 replay_interval=2.0, fsync_interval=1.0):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.replay_interval = replay_interval
+        self._store = JournalStore(path, name='outbound-spool', fsync_interval=fsync_interval,
+                                   compact_threshold=max(50, max_entries))
+        self._entries = OrderedDict()  # Schlüssel -> Eintrag, in Einreihungsreihenfolge
+        self._seq = itertools.count()
+        self._replay_task = None
+        self._loaded = False
+
+        self.spooled = 0
+        self.replayed = 0
+        self.expired = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'depth': len(self._entries),
+            'spooled': self.spooled,
+            'replayed': self.replayed,
+            'expired': self.expired,
+            'dropped': self.dropped,
+        }
+
+    def load(self):
+        """Lädt die beim letzten Lauf nicht zugestellten Nachrichten"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            state = self._store.load()
+        except Exception as e:
+            file_logger.log_error("OutboundSpool", f"Zwischenspeicher konnte nicht geladen werden: {e}")
+            state = {}
+        self._store.start()
+
+        for key, entry in sorted(state.items(), key=lambda item: item[1].get('seq', 0)):
+            self._entries[key] = entry
+        self._seq = itertools.count(max((e.get('seq', 0) for e in self._entries.values()), default=-1) + 1)
+        self._expire()
+        if self._entries:
+            file_logger.log_info(f"{len(self._entries)} zwischengespeicherte Nachricht(en) warten auf Zustellung")
+
+    def add(self, text, destination_id=None, priority=None):
+        """Speichert eine nicht zugestellte Nachricht (nicht blockierend, die Platte schreibt der Writer-Thread)"""
+        self.load()
+        seq = next(self._seq)
+        key = f"{seq:012d}"
+        entry = {
+            'seq': seq,
+            'text': text,
+            'destination_id': destination_id,
+            'priority': priority,
+            'created': time.time(),
+        }
+        self._entries[key] = entry
+        self._store.record_put(key, entry)
+        self.spooled += 1
+
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._store.record_delete(old_key)
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 50 == 0:
+                file_logger.log_warning(f"Zwischenspeicher voll ({self.max_entries}): älteste Nachricht verworfen")
+        return key
+
+    def schedule_replay(self, send_func):
+        """Startet das Nachsenden, falls Nachrichten warten und es nicht bereits läuft.
+        send_func(text, destination_id, priority) ist eine Coroutine, die True/False liefert."""
+        self.load()
+        if self._entries and (self._replay_task is None or self._replay_task.done()):
+            self._replay_task = asyncio.create_task(self._replay(send_func))
+        return self._replay_task
+
+    async def _replay(self, send_func):
+        """Sendet die Nachrichten der Reihe nach; bricht beim ersten Fehler ab"""
+        file_logger.log_info(f"Sende {len(self._entries)} zwischengespeicherte Nachricht(en) nach")
+        while self._entries:
+            self._expire()
+            if not self._entries:
+                break
+            key, entry = next(iter(self._entries.items()))
+            try:
+                sent = await send_func(entry['text'], entry.get('destination_id'), entry.get('priority'))
+            except Exception as e:
+                file_logger.log_error("OutboundSpool", f"Nachsenden fehlgeschlagen: {e}")
+                sent = False
+            if not sent:
+                # Verbindung wieder weg: Rest bleibt für die nächste Verbindung liegen
+                file_logger.log_warning(f"Nachsenden unterbrochen, {len(self._entries)} Nachricht(en) warten weiter")
+                return
+            if self._entries.pop(key, None) is not None:
+                self._store.record_delete(key)
+            self.replayed += 1
+            if self._entries:
+                await asyncio.sleep(self.replay_interval)
+        self._store.compact()
+
+    def _expire(self):
+        """Entfernt Nachrichten, die älter als max_age sind"""
+        cutoff = time.time() - self.max_age
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.get('created', 0) >= cutoff:
+                break
+            del self._entries[key]
+            self._store.record_delete(key)
+            self.expired += 1
+            file_logger.log_warning(f"Zwischengespeicherte Nachricht verfallen: {entry.get('text', '')[:40]}")
+
+    async def close(self):
+        """Beendet das Nachsenden und sichert den Zwischenspeicher"""
+        if self._replay_task is not None and not self._replay_task.done():
+            self._replay_task.cancel()
+            try:
+                await self._replay_task
+            except asyncio.CancelledError:
+                pass
+        if self._loaded:
+            self._store.close()
@@ -7,46 +7,46 @@ Verwaltet private Chats zwischen Meshtastic und Telegram über Secret-Authentifi
 import json
 import os
 import asyncio
-import aiohttp
+import html
 from datetime import datetime
 from typing import Dict, Optional, Tuple
-from telegram import Bot
-from config import TELEGRAM_TOKEN
+import config
+from config import TELEGRAM_TOKEN, PRIVATE_CHATS_FSYNC_INTERVAL, PRIVATE_CHATS_COMPACT_THRESHOLD
+from config import BTC_CACHE_TTL, HTTP_LOOKUP_TIMEOUT, HTTP_LOOKUP_STALE_MAX_AGE
+from airtime_scheduler import PRIORITY_COMMAND
+from chat_registry import PrivateChatRegistry
+from chat_store import JournalStore
+from http_lookup import LookupClient, LookupFailed
+from command_router import router
+import telegram_client
 from terminal_output import log_private_chat_secret_registered, log_private_chat_authenticated, log_private_message_telegram_to_meshtastic, log_private_message_meshtastic_to_telegram
 
 # Globale Variablen
 private_chats_file = "private_chats.json"
 pending_secrets: Dict[str, dict] = {}  # Secret -> {meshtastic_node_id, timestamp}
-authenticated_users: Dict[str, dict] = {}  # Secret -> {meshtastic_node_id, telegram_chat_id, meshtastic_name, telegram_name}
-telegram_bot = None  # Wird bei Bedarf initialisiert
+chat_store = JournalStore(
+    private_chats_file,
+    name='private-chats',
+    fsync_interval=PRIVATE_CHATS_FSYNC_INTERVAL,
+    compact_threshold=PRIVATE_CHATS_COMPACT_THRESHOLD
+)  # Journal + Snapshot, geschrieben von einem Hintergrund-Thread
+authenticated_users = PrivateChatRegistry(journal=chat_store)  # Secret -> {meshtastic_node_id, telegram_chat_id, meshtastic_name, telegram_name}, indiziert nach Node und Chat
+lookup_client = LookupClient(
+    timeout=HTTP_LOOKUP_TIMEOUT,
+    cache_ttl=BTC_CACHE_TTL,
+    stale_max_age=HTTP_LOOKUP_STALE_MAX_AGE
+)  # Gemeinsame HTTP-Session mit Cache für !btc & Co.
 bot_username = None  # Wird dynamisch beim Start ermittelt
 
 def get_telegram_bot():
-    """Gibt den Telegram Bot zurück, initialisiert ihn bei Bedarf"""
-    global telegram_bot
-    if telegram_bot is None:
-        # Direkt aus JSON-Datei lesen für aktuellste Konfiguration
-        import setup
-        config_data = setup.get_config()
-        
-        if config_data and config_data.get('telegram_token'):
-            token = config_data['telegram_token']
-        else:
-            # Fallback auf config.py
-            from config import TELEGRAM_TOKEN
-            token = TELEGRAM_TOKEN
-            
-        if not token or token.strip() == '':
-            raise ValueError("Telegram Token ist nicht konfiguriert!")
-        telegram_bot = Bot(token=token)
-    return telegram_bot
+    """Gibt den gemeinsamen Telegram Bot zurück (siehe telegram_client)"""
+    return telegram_client.get_bot()
 
 async def get_bot_info():
     """Ruft Bot-Informationen ab und speichert den Username"""
     global bot_username
     try:
-        bot = get_telegram_bot()
-        bot_info = await bot.get_me()
+        bot_info = await telegram_client.get_me()
         bot_username = f"@{bot_info.username}"
         print(f"[Private Chat] Bot-Username ermittelt: {bot_username}")
         return bot_username
@@ -63,40 +63,43 @@ def get_bot_mention():
         return "an den Bot"  # Fallback wenn Username noch nicht verfügbar
 
 def load_private_chats():
-    """Lädt die gespeicherten privaten Chats aus der JSON-Datei"""
-    global authenticated_users
+    """Lädt die gespeicherten privaten Chats (Snapshot + Journal).
+    Wird beim Start von main.py in einem Hintergrund-Thread aufgerufen, nicht beim Import."""
     try:
-        if os.path.exists(private_chats_file):
-            with open(private_chats_file, 'r', encoding='utf-8') as f:
-                authenticated_users = json.load(f)
-                print(f"[Private Chat] {len(authenticated_users)} authentifizierte Benutzer geladen")
+        if os.path.exists(private_chats_file) or os.path.exists(chat_store.journal_path):
+            authenticated_users.load(chat_store.load())
+            print(f"[Private Chat] {len(authenticated_users)} authentifizierte Benutzer geladen")
         else:
-            authenticated_users = {}
+            authenticated_users.clear()
             print("[Private Chat] Keine gespeicherten privaten Chats gefunden")
     except Exception as e:
         print(f"[Private Chat] Fehler beim Laden der privaten Chats: {e}")
-        authenticated_users = {}
+        authenticated_users.clear()
 
 def save_private_chats():
-    """Speichert die privaten Chats in die JSON-Datei"""
+    """Verdichtet das Journal in die JSON-Datei (Änderungen selbst werden automatisch protokolliert)"""
+    chat_store.compact()
+
+def close_private_chats():
+    """Schreibt ausstehende Änderungen beim Beenden und verdichtet das Journal"""
     try:
-        with open(private_chats_file, 'w', encoding='utf-8') as f:
-            json.dump(authenticated_users, f, ensure_ascii=False, indent=2)
-        print(f"[Private Chat] {len(authenticated_users)} authentifizierte Benutzer gespeichert")
+        chat_store.close()
     except Exception as e:
         print(f"[Private Chat] Fehler beim Speichern der privaten Chats: {e}")
 
-def handle_meshtastic_btc_command(text: str, node_id: int, sender_name: str) -> bool:
-    """
-    Verarbeitet !btc Befehle von Meshtastic
-    Returns True wenn es ein BTC-Befehl war, False sonst
-    """
-    if text.strip().lower() != "!btc":
-        return False
-    
-    print(f"[Private Chat] BTC-Befehl von {sender_name} (Node {node_id})")
-    asyncio.create_task(send_bitcoin_price_to_meshtastic(node_id, sender_name))
-    return True
+async def close_http_lookups():
+    """Schließt die gemeinsame HTTP-Session beim Beenden"""
+    try:
+        await lookup_client.close()
+    except Exception as e:
+        print(f"[Private Chat] Fehler beim Schließen der HTTP-Session: {e}")
+
+def _on_lookup_config_changed(snapshot, changed):
+    """Neue Cache-Zeiten für !btc ohne Neustart übernehmen (die URL wird bei jedem Aufruf gelesen)"""
+    lookup_client.cache_ttl = snapshot.btc_cache_ttl
+    lookup_client.stale_max_age = snapshot.http_lookup_stale_max_age
+
+config.subscribe(_on_lookup_config_changed, ('btc_price_url', 'btc_cache_ttl', 'http_lookup_stale_max_age'))
 
 def handle_telegram_id_command(update, context) -> bool:
     """
@@ -114,12 +117,11 @@ def handle_telegram_id_command(update, context) -> bool:
     chat_title = getattr(update.effective_chat, 'title', 'Privater Chat')
     
     # Prüfe ob wir im Setup-Modus sind
-    import setup
-    config_data = setup.get_config()
-    
-    if config_data and config_data.get('chat_id_pending', False):
+    if config.current().get('chat_id_pending', False):
         # Setup-Modus: Chat-ID automatisch übernehmen und Setup abschließen
+        import setup
         if setup.complete_setup(chat_id):
+            config.reload_config()
             if chat_type == 'private':
                 response = (f"✅ Setup abgeschlossen!\n\n"
                            f"🆔 Chat-ID: `{chat_id}`\n"
@@ -160,93 +162,43 @@ def handle_telegram_id_command(update, context) -> bool:
     print(f"[Private Chat] ID-Befehl in Chat {chat_id} ({chat_type}) verarbeitet")
     return True
 
-def handle_meshtastic_help_command(text: str, node_id: int, sender_name: str) -> bool:
-    """
-    Verarbeitet !help Befehle von Meshtastic
-    Returns True wenn es ein Help-Befehl war, False sonst
-    """
-    if text.strip().lower() != "!help":
-        return False
-    
-    print(f"[Private Chat] Help-Befehl von {sender_name} (Node {node_id})")
-    asyncio.create_task(send_help_commands_to_meshtastic(node_id, sender_name))
-    return True
+# ——— Mesh-Befehle (über den Befehls-Router) ———
 
-def handle_meshtastic_invalid_command(text: str, node_id: int, sender_name: str) -> bool:
+def handle_meshtastic_command(text: str, node_id: int, sender_name: str) -> bool:
     """
-    Erkennt ungültige Befehle und sendet Hilfe
-    Returns True wenn es ein ungültiger Befehl war, False sonst
+    Verteilt Meshtastic-Befehle (!help, !btc, !secret ...) über den Befehls-Router
+    Returns True wenn es ein Befehl war (auch ein ungültiger), False sonst
     """
-    text_lower = text.strip().lower()
-    
-    # Liste möglicher Tippfehler für Befehle
-    invalid_commands = [
-        "!seceret", "!secert", "!secrat", "!sekret", "!secret", 
-        "!secrte", "!secre", "!scret", "!screet", "!sekreet",
-        "!hlep", "!hepl", "!hep", "!halp", "!helop"
-    ]
-    
-    # Prüfe auf Befehls-ähnliche Muster die mit ! beginnen
-    if text.startswith("!") and len(text) > 1:
-        # Extrahiere den Befehlsteil (ohne Parameter)
-        command_part = text_lower.split()[0] if " " in text_lower else text_lower
-        
-        # Prüfe ob es ein bekannter gültiger Befehl ist
-        valid_commands = ["!help", "!secret", "!btc"]
-        if command_part not in valid_commands:
-            # Es ist ein ungültiger Befehl
-            print(f"[Private Chat] Ungültiger Befehl '{command_part}' von {sender_name} (Node {node_id})")
-            asyncio.create_task(send_invalid_command_help_to_meshtastic(node_id, sender_name, command_part))
-            return True
-    
-    return False
+    return router.dispatch(text, node_id, sender_name)
 
-def handle_meshtastic_secret_command(text: str, node_id: int, sender_name: str) -> bool:
-    """
-    Verarbeitet !secret Befehle von Meshtastic
-    Returns True wenn es ein Secret-Befehl war, False sonst
-    """
-    global pending_secrets, authenticated_users
-    
-    # Case-insensitive Prüfung
-    if not text.lower().startswith("!secret "):
-        return False
-    
-    # Secret extrahieren (originaler Text beibehalten für das Secret selbst)
-    secret_part = text[8:].strip()  # "!secret " entfernen
+@router.command('secret', "Privaten Chat einrichten",
+                help=[("!secret WORT", "Privaten Chat einrichten"), ("!secret del", "Privaten Chat löschen")])
+async def meshtastic_secret_command(ctx):
+    """Verarbeitet !secret Befehle von Meshtastic"""
+    node_id, sender_name = ctx.node_id, ctx.sender_name
+    secret_part = ctx.args  # Originaler Text beibehalten für das Secret selbst
     
     # Prüfe auf "del" Befehl (case-insensitive)
     if secret_part.lower() == "del":
         # Lösche bestehende Authentifizierung für diese Node
-        deleted_secret = None
-        for secret, user_data in list(authenticated_users.items()):
-            if user_data['meshtastic_node_id'] == node_id:
-                deleted_secret = secret
-                del authenticated_users[secret]
-                break
+        deleted_secret, _ = authenticated_users.remove_by_node(node_id)
         
         if deleted_secret:
-            save_private_chats()
             print(f"[Private Chat] Authentifizierung von {sender_name} (Node {node_id}) gelöscht")
-            asyncio.create_task(send_deletion_confirmation_to_meshtastic(node_id, sender_name))
+            await send_deletion_confirmation_to_meshtastic(node_id, sender_name)
         else:
             print(f"[Private Chat] Keine Authentifizierung für {sender_name} (Node {node_id}) gefunden")
-            asyncio.create_task(send_no_auth_found_to_meshtastic(node_id, sender_name))
-        
-        return True
+            await send_no_auth_found_to_meshtastic(node_id, sender_name)
+        return
     
     # Neues Secret setzen
     if len(secret_part) < 4:
         print(f"[Private Chat] Secret von {sender_name} zu kurz (min. 4 Zeichen)")
-        asyncio.create_task(send_secret_too_short_to_meshtastic(node_id, sender_name))
-        return True
+        await send_secret_too_short_to_meshtastic(node_id, sender_name)
+        return
     
     # Lösche zuerst bestehende Authentifizierung für diese Node
-    for secret, user_data in list(authenticated_users.items()):
-        if user_data['meshtastic_node_id'] == node_id:
-            del authenticated_users[secret]
-            save_private_chats()
-            break
+    authenticated_users.remove_by_node(node_id)
     
     # Secret in Pending-Liste speichern
     pending_secrets[secret_part] = {
@@ -259,9 +211,28 @@ def handle_meshtastic_secret_command(text: str, node_id: int, sender_name: str)
     print(f"[Private Chat] Benutzer kann jetzt das Secret in Telegram-DM eingeben")
     
     # Bestätigung an Meshtastic-Benutzer senden
-    asyncio.create_task(send_secret_confirmation_to_meshtastic(node_id, sender_name, secret_part))
-    
-    return True
+    await send_secret_confirmation_to_meshtastic(node_id, sender_name, secret_part)
+
+@router.command('btc', "Bitcoin-Preis anzeigen")
+async def meshtastic_btc_command(ctx):
+    """Verarbeitet !btc Befehle von Meshtastic"""
+    print(f"[Private Chat] BTC-Befehl von {ctx.sender_name} (Node {ctx.node_id})")
+    await send_bitcoin_price_to_meshtastic(ctx.node_id, ctx.sender_name)
+
+@router.command('help', "Diese Hilfe anzeigen")
+async def meshtastic_help_command(ctx):
+    """Verarbeitet !help Befehle von Meshtastic"""
+    print(f"[Private Chat] Help-Befehl von {ctx.sender_name} (Node {ctx.node_id})")
+    await send_help_commands_to_meshtastic(ctx.node_id, ctx.sender_name)
+
+router.document("!id", "Chat-ID anzeigen (nur Telegram)")
+
+@router.on_unknown
+async def meshtastic_invalid_command(ctx):
+    """Beantwortet unbekannte Befehle mit der Befehlsübersicht"""
+    command = f"{router.prefix}{ctx.command}"
+    print(f"[Private Chat] Ungültiger Befehl '{command}' von {ctx.sender_name} (Node {ctx.node_id})")
+    await send_invalid_command_help_to_meshtastic(ctx.node_id, ctx.sender_name, command)
 
 async def handle_telegram_private_message(telegram_chat_id: int, telegram_username: str, text: str) -> bool:
     """
@@ -276,20 +247,17 @@ async def handle_telegram_private_message(telegram_chat_id: int, telegram_userna
         pending_info = pending_secrets[secret]
         
         # Authentifizierung vervollständigen
-        authenticated_users[secret] = {
+        authenticated_users.add(secret, {
             'meshtastic_node_id': pending_info['meshtastic_node_id'],
             'telegram_chat_id': telegram_chat_id,
             'meshtastic_name': pending_info['meshtastic_name'],
             'telegram_name': telegram_username,
             'created': datetime.now().isoformat()
-        }
+        })
         
-        # Secret aus Pending entfernen
+        # Secret aus Pending entfernen (die Verknüpfung wurde bereits ins Journal geschrieben)
         del pending_secrets[secret]
         
-        # Speichern
-        save_private_chats()
-        
         # Bestätigung senden
         try:
             bot = get_telegram_bot()
@@ -307,11 +275,7 @@ async def handle_telegram_private_message(telegram_chat_id: int, telegram_userna
         return True
     
     # Prüfen ob Benutzer bereits authentifiziert ist
-    user_secret = None
-    for secret, user_data in authenticated_users.items():
-        if user_data['telegram_chat_id'] == telegram_chat_id:
-            user_secret = secret
-            break
+    user_secret, _ = authenticated_users.find_by_chat(telegram_chat_id)
     
     if user_secret:
         # Nachricht an Meshtastic weiterleiten
@@ -337,16 +301,8 @@ async def handle_telegram_group_message(telegram_chat_id: int, telegram_username
     Verarbeitet Telegram-Gruppen-Nachrichten für private Chats
     Returns True wenn es verarbeitet wurde, False sonst
     """
-    global authenticated_users
-    
     # Prüfen ob diese Chat-ID von einem authentifizierten Benutzer verwendet wird
-    user_secret = None
-    authenticated_user_data = None
-    for secret, user_data in authenticated_users.items():
-        if user_data['telegram_chat_id'] == telegram_chat_id:
-            user_secret = secret
-            authenticated_user_data = user_data
-            break
+    user_secret, authenticated_user_data = authenticated_users.find_by_chat(telegram_chat_id)
     
     if user_secret and authenticated_user_data:
         # Alle Nachrichten aus dieser Gruppe an Meshtastic weiterleiten
@@ -362,11 +318,7 @@ async def handle_meshtastic_private_message(node_id: int, sender_name: str, text
     Returns True wenn es verarbeitet wurde, False sonst
     """
     # Prüfen ob Benutzer authentifiziert ist
-    user_secret = None
-    for secret, user_data in authenticated_users.items():
-        if user_data['meshtastic_node_id'] == node_id:
-            user_secret = secret
-            break
+    user_secret, _ = authenticated_users.find_by_node(node_id)
     
     if user_secret:
         # Nachricht an Telegram weiterleiten
@@ -379,7 +331,7 @@ async def handle_meshtastic_private_message(node_id: int, sender_name: str, text
 
 async def forward_telegram_to_meshtastic(secret: str, text: str, telegram_username: str):
     """Leitet Telegram-Nachricht an Meshtastic weiter"""
-    from message_handler import send_to_meshtastic_safe
+    from message_handler import send_to_meshtastic_safe, SPOOLED
     import file_logger
     
     user_data = authenticated_users[secret]
@@ -388,8 +340,10 @@ async def forward_telegram_to_meshtastic(secret: str, text: str, telegram_userna
     try:
         # Private Nachricht an spezifische Node senden
         message = f"@{telegram_username}: {text}"
-        success = await send_to_meshtastic_safe(message, target_node_id)
-        if success:
+        success = await send_to_meshtastic_safe(message, target_node_id, spool=True)
+        if success is SPOOLED:
+            print(f"[Private Chat] Telegram → Meshtastic zwischengespeichert: @{telegram_username} → {user_data['meshtastic_name']}")
+        elif success:
             print(f"[Private Chat] Telegram → Meshtastic: @{telegram_username} → {user_data['meshtastic_name']}")
             log_private_message_telegram_to_meshtastic(telegram_username, user_data['meshtastic_name'], text)
         else:
@@ -403,7 +357,7 @@ async def forward_telegram_to_meshtastic(secret: str, text: str, telegram_userna
 
 async def forward_telegram_group_to_meshtastic(secret: str, text: str, sender_username: str, authenticated_user_data: dict):
     """Leitet Telegram-Gruppen-Nachricht an Meshtastic weiter"""
-    from message_handler import send_to_meshtastic_safe
+    from message_handler import send_to_meshtastic_safe, SPOOLED
     import file_logger
     
     target_node_id = authenticated_user_data['meshtastic_node_id']
@@ -411,8 +365,10 @@ async def forward_telegram_group_to_meshtastic(secret: str, text: str, sender_us
     try:
         # Gruppen-Nachricht an spezifische Node senden mit Sender-Info
         message = f"[TG] @{sender_username}: {text}"
-        success = await send_to_meshtastic_safe(message, target_node_id)
-        if success:
+        success = await send_to_meshtastic_safe(message, target_node_id, spool=True)
+        if success is SPOOLED:
+            print(f"[Private Chat] Telegram-Gruppe → Meshtastic zwischengespeichert: @{sender_username} → {authenticated_user_data['meshtastic_name']}")
+        elif success:
             print(f"[Private Chat] Telegram-Gruppe → Meshtastic: @{sender_username} → {authenticated_user_data['meshtastic_name']}")
             log_private_message_telegram_to_meshtastic(f"{sender_username} (Gruppe)", authenticated_user_data['meshtastic_name'], text)
         else:
@@ -432,15 +388,21 @@ async def forward_meshtastic_to_telegram(secret: str, text: str, sender_name: st
     telegram_chat_id = user_data['telegram_chat_id']
     
     try:
-        message = f"<b>{sender_name}</b>: {text}"
-        bot = get_telegram_bot()
-        await bot.send_message(
-            chat_id=telegram_chat_id,
-            text=message,
-            parse_mode='HTML'
-        )
-        print(f"[Private Chat] Meshtastic → Telegram: {sender_name} → @{user_data['telegram_name']}")
-        log_private_message_meshtastic_to_telegram(sender_name, user_data['telegram_name'], text)
+        from message_handler import telegram_sender
+        message = f"<b>{html.escape(sender_name)}</b>: {html.escape(text)}"
+        
+        def on_delivered(delivery):
+            if not delivery.cancelled() and delivery.result():
+                print(f"[Private Chat] Meshtastic → Telegram: {sender_name} → @{user_data['telegram_name']}")
+                log_private_message_meshtastic_to_telegram(sender_name, user_data['telegram_name'], text)
+            else:
+                error_msg = f"[Private Chat] Nachricht von {sender_name} konnte nicht an Telegram zugestellt werden"
+                print(error_msg)
+                file_logger.log_error(error_msg)
+        
+        # Gedrosselt senden, ohne auf das Zusammenfassen zu warten
+        delivery = telegram_sender.submit(telegram_chat_id, message, parse_mode='HTML')
+        delivery.add_done_callback(on_delivered)
     except Exception as e:
         error_msg = f"[Private Chat] Fehler beim Senden an Telegram: {e}"
         print(error_msg)
@@ -455,7 +417,7 @@ async def send_help_message_to_meshtastic(node_id: int, sender_name: str):
                        "1. Sende: !secret DEINWORT\n"
                        f"2. Schreibe das gleiche Wort an {get_bot_mention()} in Telegram")
         
-        success = await send_to_meshtastic_safe(help_message, node_id)
+        success = await send_to_meshtastic_safe(help_message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] Hilfe-Nachricht an {sender_name} (Node {node_id}) gesendet")
         else:
@@ -468,14 +430,9 @@ async def send_help_commands_to_meshtastic(node_id: int, sender_name: str):
     from message_handler import send_to_meshtastic_safe
     
     try:
-        help_message = ("📋 Verfügbare Befehle:\n"
-                       "!secret WORT - Privaten Chat einrichten\n"
-                       "!secret del - Privaten Chat löschen\n"
-                       "!btc - Bitcoin-Preis anzeigen\n"
-                       "!help - Diese Hilfe anzeigen\n"
-                       "!id - Chat-ID anzeigen (nur Telegram)")
+        help_message = router.help_text()
         
-        success = await send_to_meshtastic_safe(help_message, node_id)
+        success = await send_to_meshtastic_safe(help_message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] Befehls-Hilfe an {sender_name} (Node {node_id}) gesendet")
         else:
@@ -489,7 +446,7 @@ async def send_deletion_confirmation_to_meshtastic(node_id: int, sender_name: st
     
     try:
         message = "✅ Privater Chat wurde gelöscht!"
-        success = await send_to_meshtastic_safe(message, node_id)
+        success = await send_to_meshtastic_safe(message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] Löschbestätigung an {sender_name} (Node {node_id}) gesendet")
         else:
@@ -503,7 +460,7 @@ async def send_no_auth_found_to_meshtastic(node_id: int, sender_name: str):
     
     try:
         message = "ℹ️ Kein privater Chat aktiv"
-        success = await send_to_meshtastic_safe(message, node_id)
+        success = await send_to_meshtastic_safe(message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] 'Keine Auth'-Nachricht an {sender_name} (Node {node_id}) gesendet")
         else:
@@ -517,7 +474,7 @@ async def send_secret_too_short_to_meshtastic(node_id: int, sender_name: str):
     
     try:
         message = "❌ Secret zu kurz! Min. 4 Zeichen"
-        success = await send_to_meshtastic_safe(message, node_id)
+        success = await send_to_meshtastic_safe(message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] 'Secret zu kurz'-Nachricht an {sender_name} (Node {node_id}) gesendet")
         else:
@@ -530,14 +487,9 @@ async def send_invalid_command_help_to_meshtastic(node_id: int, sender_name: str
     from message_handler import send_to_meshtastic_safe
     
     try:
-        message = (f"❌ Ungültiger Befehl: {invalid_command}\n"
-                   f"Verfügbare Befehle:\n"
-                   f"!help - Hilfe anzeigen\n"
-                   f"!secret WORT - Chat einrichten\n"
-                   f"!btc - Bitcoin-Preis\n"
-                   f"!id - Chat-ID (nur Telegram)")
+        message = router.help_text(header=f"❌ Ungültiger Befehl: {invalid_command}\nVerfügbare Befehle:")
         
-        success = await send_to_meshtastic_safe(message, node_id)
+        success = await send_to_meshtastic_safe(message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] 'Ungültiger Befehl'-Hilfe an {sender_name} (Node {node_id}) gesendet")
         else:
@@ -553,7 +505,7 @@ async def send_secret_confirmation_to_meshtastic(node_id: int, sender_name: str,
         message = (f"✅ Secret '{secret}' empfangen!\n"
                    f"Jetzt schreibe '{secret}' an {get_bot_mention()} in Telegram")
         
-        success = await send_to_meshtastic_safe(message, node_id)
+        success = await send_to_meshtastic_safe(message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] Secret-Bestätigung an {sender_name} (Node {node_id}) gesendet")
         else:
@@ -562,17 +514,17 @@ async def send_secret_confirmation_to_meshtastic(node_id: int, sender_name: str,
         print(f"[Private Chat] Fehler beim Senden der Secret-Bestätigung: {e}")
 
 async def get_bitcoin_price() -> str:
-    """Holt den aktuellen Bitcoin-Preis von der CoinGecko API"""
+    """Holt den aktuellen Bitcoin-Preis von der CoinGecko API
+    (zwischengespeichert, gleichzeitige Anfragen teilen sich einen Abruf)"""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-            async with session.get(url, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    price = data['bitcoin']['usd']
-                    return f"₿ Bitcoin: ${price:,.2f} USD"
-                else:
-                    return "❌ Fehler beim Abrufen des Bitcoin-Preises"
+        result = await lookup_client.get_json(config.current().btc_price_url)
+        price = result.data['bitcoin']['usd']
+        if result.stale:
+            return f"₿ Bitcoin: ${price:,.2f} USD (Stand vor {int(result.age() // 60)} Min.)"
+        return f"₿ Bitcoin: ${price:,.2f} USD"
+    except LookupFailed as e:
+        print(f"[Private Chat] Fehler beim Bitcoin-Preis abrufen: {e}")
+        return "❌ Fehler beim Abrufen des Bitcoin-Preises"
     except Exception as e:
         print(f"[Private Chat] Fehler beim Bitcoin-Preis abrufen: {e}")
         return "❌ Bitcoin-Preis derzeit nicht verfügbar"
@@ -583,7 +535,7 @@ async def send_bitcoin_price_to_meshtastic(node_id: int, sender_name: str):
     
     try:
         price_message = await get_bitcoin_price()
-        success = await send_to_meshtastic_safe(price_message, node_id)
+        success = await send_to_meshtastic_safe(price_message, node_id, priority=PRIORITY_COMMAND)
         if success:
             print(f"[Private Chat] Bitcoin-Preis an {sender_name} (Node {node_id}) gesendet: {price_message}")
         else:
@@ -629,6 +581,3 @@ def cleanup_old_pending_secrets():
     for secret in old_secrets:
         del pending_secrets[secret]
         print(f"[Private Chat] Altes pending secret '{secret}' entfernt")
-
-# Beim Import laden
-load_private_chats()
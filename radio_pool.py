@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Radio-Pool für das Meshtastic ↔ Telegram Gateway
+Verwaltet mehrere gleichzeitig verbundene Meshtastic-Geräte. Jedes Radio hat
+eine eigene Verbindung und einen eigenen Health-Zustand. Pakete, die mehrere
+Radios hören, werden über (from, id) nur einmal verarbeitet; ausgehende
+Nachrichten gehen über das Radio mit der besten aktuellen Verbindung zum Ziel.
+"""
+
+import time
+
+import file_logger
+from dedupe_cache import DedupeCache
+from health_monitor import MeshtasticHealth
+
+
+class Radio:
+    """Ein Meshtastic-Gerät mit Verbindung, Health-Zustand und Link-Statistik"""
+
+    def __init__(self, host, health, channel_index=0):
+        self.host = host
+        self.health = health
+        self.interface = None
+        self.channel_index = channel_index
+        self.packets_received = 0
+        # Node-Nummer -> (Hops, SNR, Zeitpunkt) des zuletzt gehörten Pakets
+        self._links = {}
+
+    @property
+    def is_connected(self):
+        return self.interface is not None and self.health.is_connected
+
+    def record_link(self, packet):
+        """Merkt sich, wie gut dieses Radio den Absender eines Pakets gehört hat"""
+        self.packets_received += 1
+        node_id = packet.get('from')
+        if node_id is None:
+            return
+        hop_start = packet.get('hopStart')
+        hop_limit = packet.get('hopLimit')
+        hops = hop_start - hop_limit if hop_start is not None and hop_limit is not None else 0
+        snr = packet.get('rxSnr', 0.0)
+        self._links[node_id] = (hops, snr, time.monotonic())
+
+    def link_quality(self, node_id, max_age):
+        """Gibt (Hops, -SNR) als Sortierschlüssel zurück oder None, wenn kein aktueller Link bekannt ist"""
+        link = self._links.get(node_id)
+        if link is None:
+            return None
+        hops, snr, heard_at = link
+        if time.monotonic() - heard_at > max_age:
+            del self._links[node_id]
+            return None
+        return hops, -snr
+
+
+class RadioPool:
+    """Alle konfigurierten Radios des Gateways"""
+
+    def __init__(self, hosts, channel_index=0, quiet_threshold=120, probe_interval=60,
+                 probe_timeout=2, link_max_age=900, dedupe_ttl=600, dedupe_max_entries=4096):
+        self.radios = [
+            Radio(host, MeshtasticHealth(host, quiet_threshold, probe_interval, probe_timeout), channel_index)
+            for host in hosts
+        ]
+        self.link_max_age = link_max_age
+        self.dedupe = DedupeCache(max_entries=dedupe_max_entries, ttl=dedupe_ttl)  # (from, id) bereits verarbeiteter Pakete
+
+    def __iter__(self):
+        return iter(self.radios)
+
+    def __len__(self):
+        return len(self.radios)
+
+    @property
+    def is_connected(self):
+        """Mindestens ein Radio verbunden"""
+        return any(radio.is_connected for radio in self.radios)
+
+    def connected(self):
+        """Alle verbundenen Radios (in Konfigurationsreihenfolge)"""
+        return [radio for radio in self.radios if radio.is_connected]
+
+    def get(self, host):
+        """Sucht ein Radio über seinen Host"""
+        for radio in self.radios:
+            if radio.host == host:
+                return radio
+        return None
+
+    def for_interface(self, interface):
+        """Sucht das Radio zu einem Meshtastic-Interface"""
+        for radio in self.radios:
+            if radio.interface is interface:
+                return radio
+        return None
+
+    def on_receive(self, packet, interface):
+        """PubSub-Listener für 'meshtastic.receive': Link-Statistik des empfangenden Radios"""
+        radio = self.for_interface(interface)
+        if radio is not None:
+            radio.record_link(packet)
+
+    def is_duplicate(self, packet):
+        """True, wenn dasselbe Paket (from, id) bereits über ein Radio verarbeitet wurde"""
+        packet_id = packet.get('id')
+        if not packet_id:
+            return False  # Ohne Paket-ID keine sichere Erkennung
+        return self.dedupe.check_and_add((packet.get('from'), packet_id))
+
+    def select_radio(self, destination_id=None):
+        """Wählt das Radio für eine ausgehende Nachricht.
+        Direktnachrichten gehen über das Radio mit dem besten aktuellen Link zum Ziel
+        (wenigste Hops, dann bester SNR), sonst über das erste verbundene Radio."""
+        candidates = self.connected()
+        if not candidates:
+            return None
+
+        if destination_id is not None:
+            best = None
+            best_quality = None
+            for radio in candidates:
+                quality = radio.link_quality(destination_id, self.link_max_age)
+                if quality is not None and (best_quality is None or quality < best_quality):
+                    best, best_quality = radio, quality
+            if best is not None:
+                file_logger.log_debug("Sende an %s über %s (Hops/SNR %s)", destination_id, best.host, best_quality)
+                return best
+
+        return candidates[0]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Startzeit-Messung für das Meshtastic ↔ Telegram Gateway
+Misst, wie lange die einzelnen Startphasen (Module importieren, Daten laden,
+Bibliotheken laden, Telegram starten, erstes Radio verbinden) dauern und wann
+das Gateway bereit zur ersten Weiterleitung ist. Mit "python main.py
+--profile-startup" wird der Bericht nach dem Start ausgegeben und das Gateway
+wieder beendet; ohne den Schalter wird nur die Gesamtzeit protokolliert.
+
+Dieses Modul muss als erstes importiert werden (Zeitnullpunkt).
+"""
+
+import asyncio
+import importlib
+import time
+from contextlib import contextmanager
+
+READY_TELEGRAM = 'Telegram gestartet'
+READY_MESHTASTIC = 'Erstes Radio verbunden'
+
+_origin = time.perf_counter()  # Zeitnullpunkt: Import dieses Moduls
+_phases = []                   # (Name, Beginn, Dauer) in Sekunden seit dem Nullpunkt
+_milestones = {}               # Name -> Sekunden seit dem Nullpunkt
+_expected = set()              # Meilensteine, nach denen das Gateway als bereit gilt
+_ready = None                  # asyncio.Event, gesetzt wenn alle erwarteten Meilensteine erreicht sind
+enabled = False
+
+
+def elapsed():
+    """Sekunden seit dem Zeitnullpunkt"""
+    return time.perf_counter() - _origin
+
+
+def enable():
+    """Schaltet den ausführlichen Bericht ein (--profile-startup)"""
+    global enabled
+    enabled = True
+
+
+@contextmanager
+def phase(name):
+    """Misst eine Startphase; darf auch um await-Ausdrücke gelegt werden"""
+    start = elapsed()
+    try:
+        yield
+    finally:
+        _phases.append((name, start, elapsed() - start))
+
+
+def record_phase(name, start):
+    """Trägt eine Phase nachträglich ein (z.B. 'Module importieren' bis jetzt)"""
+    _phases.append((name, start, elapsed() - start))
+
+
+def expect(*names):
+    """Legt fest, welche Meilensteine zum 'bereit' gehören"""
+    global _ready
+    _expected.update(names)
+    _ready = asyncio.Event()
+    _check_ready()
+
+
+def milestone(name):
+    """Meldet einen Meilenstein (nur das erste Erreichen zählt)"""
+    if name in _milestones:
+        return
+    _milestones[name] = elapsed()
+    _check_ready()
+
+
+def _check_ready():
+    if _ready is not None and not _ready.is_set() and _expected <= set(_milestones):
+        _ready.set()
+        import file_logger
+        file_logger.log_info(f"Gateway bereit nach {ready_time():.2f}s")
+
+
+def ready_time():
+    """Zeit bis alle erwarteten Meilensteine erreicht waren (oder None)"""
+    reached = [_milestones[name] for name in _expected if name in _milestones]
+    if not _expected or len(reached) < len(_expected):
+        return None
+    return max(reached)
+
+
+async def wait_ready(timeout=120):
+    """Wartet bis das Gateway bereit ist; gibt False bei Zeitüberschreitung zurück"""
+    if _ready is None:
+        return True
+    try:
+        await asyncio.wait_for(_ready.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def preload(*module_names):
+    """Importiert schwere Bibliotheken in Hintergrund-Threads, während der Event-Loop weiterläuft.
+    Fehler werden ignoriert - sie treten beim eigentlichen Import an der Verwendungsstelle erneut auf."""
+    async def load(module_name):
+        with phase(f"Import {module_name}"):
+            try:
+                await asyncio.to_thread(importlib.import_module, module_name)
+            except Exception:
+                pass
+    await asyncio.gather(*(load(module_name) for module_name in module_names))
+
+
+def report():
+    """Bericht über alle Phasen und Meilensteine als Text"""
+    lines = ["⏱️  Startzeit-Profil (Sekunden seit Programmstart)",
+             f"{'Phase':<40} {'Beginn':>8} {'Dauer':>8}"]
+    for name, start, duration in sorted(_phases, key=lambda p: p[1]):
+        lines.append(f"{name:<40} {start:>8.3f} {duration:>8.3f}")
+    if _milestones:
+        lines.append("")
+        for name, at in sorted(_milestones.items(), key=lambda m: m[1]):
+            lines.append(f"{name:<40} {at:>8.3f}")
+    ready = ready_time()
+    lines.append("")
+    lines.append(f"Bereit zur ersten Weiterleitung nach {ready:.3f}s" if ready is not None
+                 else "Gateway wurde nicht vollständig bereit (fehlende Meilensteine: "
+                      f"{', '.join(sorted(_expected - set(_milestones)))})")
+    return "\n".join(lines)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer Telegram-Client für das Meshtastic ↔ Telegram Gateway
+Es gibt genau eine Telegram-Application und damit einen Bot mit einem
+Verbindungspool für das ganze Gateway: Nachrichtenweiterleitung, private
+Chats und Webhook-Registrierung verwenden denselben Client. Poolgröße,
+Keep-Alive und Timeouts kommen aus gateway_config.json. Long-Polling
+bekommt einen eigenen kleinen Pool, damit wartende getUpdates-Anfragen
+keine Sendeverbindung blockieren.
+"""
+
+import config
+import file_logger
+
+_application = None  # telegram.ext.Application, erstellt beim ersten Gebrauch
+_bot = None          # Bot der Application (oder per set_bot gesetzt)
+_bot_info = None     # Ergebnis von get_me, nur einmal abgefragt
+
+
+def make_request(pool_size):
+    """HTTP-Client für die Bot-API mit Verbindungspool und Keep-Alive"""
+    from telegram.request import HTTPXRequest
+
+    settings = config.current()
+    timeouts = dict(
+        connect_timeout=settings.telegram_connect_timeout,
+        read_timeout=settings.telegram_read_timeout,
+        write_timeout=settings.telegram_write_timeout,
+        pool_timeout=settings.telegram_pool_timeout,
+    )
+    try:
+        import httpx
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=settings.telegram_keepalive_expiry
+        )
+        return HTTPXRequest(connection_pool_size=pool_size, httpx_kwargs={'limits': limits}, **timeouts)
+    except TypeError:
+        # Ältere python-telegram-bot-Versionen ohne httpx_kwargs: Keep-Alive-Standard von httpx
+        return HTTPXRequest(connection_pool_size=pool_size, **timeouts)
+
+
+def get_application():
+    """Gibt die gemeinsame Application zurück und erstellt sie bei Bedarf (ohne Netzwerkzugriff)"""
+    global _application, _bot
+    if _application is None:
+        token = config.current().telegram_token
+        if not token or token.strip() == '':
+            raise ValueError("Telegram Token ist nicht konfiguriert!")
+
+        from telegram.ext import Application
+        pool_size = max(1, int(config.current().telegram_connection_pool_size))
+        _application = (
+            Application.builder()
+            .token(token)
+            .request(make_request(pool_size))
+            .get_updates_request(make_request(1))
+            .build()
+        )
+        if _bot is None:
+            _bot = _application.bot
+        file_logger.log_info(f"Telegram-Client erstellt (Verbindungspool: {pool_size})")
+    return _application
+
+
+def get_bot():
+    """Gemeinsamer Bot für alle Sender"""
+    if _bot is None:
+        get_application()
+    return _bot
+
+
+def set_bot(bot):
+    """Setzt den Bot direkt (Benchmarks, Tests)"""
+    global _bot, _bot_info
+    _bot = bot
+    _bot_info = None
+
+
+async def get_me():
+    """Bot-Informationen; nach application.initialize() ohne weitere Anfrage verfügbar"""
+    global _bot_info
+    if _bot_info is None:
+        bot = get_bot()
+        try:
+            _bot_info = bot.bot  # Bereits von initialize() abgefragt
+        except RuntimeError:
+            _bot_info = await bot.get_me()
+    return _bot_info
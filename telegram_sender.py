@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Telegram-Sende-Modul für das Meshtastic ↔ Telegram Gateway
+Drosselt ausgehende Telegram-Nachrichten pro Chat und global (Token-Bucket),
+fasst kurz aufeinanderfolgende Mesh-Nachrichten zu einer Nachricht zusammen
+und wartet RetryAfter-Vorgaben von Telegram automatisch ab.
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import file_logger
+import metrics
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+MAX_SEND_ATTEMPTS = 5
+
+
+class TokenBucket:
+    """Einfacher asynchroner Token-Bucket"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate  # Tokens pro Sekunde
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def configure(self, rate, capacity):
+        """Ändert Rate und Kapazität, ohne angesammelte Tokens zu verschenken"""
+        self._refill()
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = min(self._tokens, self.capacity)
+
+    async def acquire(self):
+        """Wartet bis ein Token verfügbar ist und verbraucht es"""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class _ChatQueue:
+    """Warteschlange und Rate-Limit für einen einzelnen Chat"""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.pending = []  # Liste von (text, parse_mode, future, trace)
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+
+class TelegramSender:
+    """Gedrosselter Telegram-Versand mit Zusammenfassen von Nachrichten"""
+
+    def __init__(self, get_bot, global_rate_per_second=25, group_rate_per_minute=20,
+                 private_rate_per_second=1, coalesce_window=1.0, idle_timeout=60):
+        self._get_bot = get_bot
+        self.group_rate = group_rate_per_minute / 60.0
+        self.private_rate = private_rate_per_second
+        self.coalesce_window = coalesce_window
+        self.idle_timeout = idle_timeout
+        self._global_rate = global_rate_per_second
+        self._global_bucket = None
+        self._chats = {}
+
+        self.messages_sent = 0
+        self.messages_coalesced = 0
+        self.messages_failed = 0
+        self.retry_after_count = 0
+
+    def submit(self, chat_id, text, parse_mode=None, trace=None):
+        """
+        Reiht eine Nachricht für einen Chat ein.
+        Gibt ein asyncio-Future zurück, das mit dem Ergebnis (True/False) aufgelöst wird.
+        """
+        if self._global_bucket is None:
+            self._global_bucket = TokenBucket(self._global_rate, self._global_rate)
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._chats.get(chat_id)
+        if queue is None:
+            queue = self._chats[chat_id] = _ChatQueue(self._create_chat_bucket(chat_id))
+
+        queue.pending.append((text, parse_mode, future, trace))
+        queue.wakeup.set()
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.create_task(self._chat_worker(chat_id, queue))
+        return future
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        """Sendet eine Nachricht gedrosselt und wartet auf das Ergebnis"""
+        return await self.submit(chat_id, text, parse_mode)
+
+    def set_rates(self, global_rate_per_second, group_rate_per_minute, private_rate_per_second, coalesce_window):
+        """Übernimmt neue Limits (Konfiguration neu geladen), auch für bestehende Chats"""
+        self.group_rate = group_rate_per_minute / 60.0
+        self.private_rate = private_rate_per_second
+        self.coalesce_window = coalesce_window
+        self._global_rate = global_rate_per_second
+        if self._global_bucket is not None:
+            self._global_bucket.configure(self._global_rate, self._global_rate)
+        for chat_id, queue in self._chats.items():
+            template = self._create_chat_bucket(chat_id)
+            queue.bucket.configure(template.rate, template.capacity)
+
+    def queue_depth(self):
+        """Anzahl noch nicht gesendeter Nachrichten über alle Chats"""
+        return sum(len(queue.pending) for queue in self._chats.values())
+
+    def _create_chat_bucket(self, chat_id):
+        """Gruppen (negative IDs) haben ein strengeres Limit als private Chats"""
+        try:
+            is_group = int(chat_id) < 0
+        except (TypeError, ValueError):
+            is_group = str(chat_id).startswith('@')
+        if is_group:
+            return TokenBucket(self.group_rate, max(1, int(self.group_rate * 60 // 4)))
+        return TokenBucket(self.private_rate, max(1, int(self.private_rate)))
+
+    def _take_batch(self, queue):
+        """Entnimmt aufeinanderfolgende Nachrichten gleichen Formats bis zur Telegram-Maximallänge.
+        Gibt das Format und die Liste der (text, future, trace) zurück."""
+        text, parse_mode, future, trace = queue.pending.pop(0)
+        batch = [(text, future, trace)]
+        length = len(text)
+
+        while queue.pending:
+            next_text, next_mode, next_future, next_trace = queue.pending[0]
+            if next_mode != parse_mode or length + 1 + len(next_text) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                break
+            queue.pending.pop(0)
+            batch.append((next_text, next_future, next_trace))
+            length += 1 + len(next_text)
+
+        return parse_mode, batch
+
+    async def _chat_worker(self, chat_id, queue):
+        """Arbeitet die Warteschlange eines Chats ab und beendet sich bei Leerlauf"""
+        while True:
+            if not queue.pending:
+                queue.wakeup.clear()
+                try:
+                    await asyncio.wait_for(queue.wakeup.wait(), timeout=self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if not queue.pending:
+                        self._chats.pop(chat_id, None)
+                        return
+                continue
+
+            # Kurz warten, damit weitere Nachrichten zusammengefasst werden können
+            if self.coalesce_window > 0:
+                await asyncio.sleep(self.coalesce_window)
+
+            parse_mode, batch = self._take_batch(queue)
+            traces = [trace for _, _, trace in batch if trace is not None]
+            for trace in traces:
+                trace.mark('telegram_batched')
+            if len(batch) > 1:
+                self.messages_coalesced += len(batch) - 1
+
+            await self._acquire(queue, traces)
+            if len(batch) == 1:
+                results = [await self._send_with_retry(chat_id, batch[0][0], parse_mode, traces)]
+            else:
+                results = await self._send_batch(chat_id, queue, parse_mode, batch, traces)
+
+            for (_, future, _), success in zip(batch, results):
+                if not future.done():
+                    future.set_result(success)
+
+    async def _acquire(self, queue, traces=()):
+        """Wartet auf ein Token des Chats und ein globales Token"""
+        await queue.bucket.acquire()
+        await self._global_bucket.acquire()
+        for trace in traces:
+            trace.mark('telegram_rate_limit_passed')
+
+    async def _send_batch(self, chat_id, queue, parse_mode, batch, traces):
+        """Sendet zusammengefasste Nachrichten als eine Nachricht. Lehnt Telegram sie ab
+        (BadRequest), werden die Nachrichten einzeln gesendet, damit nur die fehlerhafte verloren geht."""
+        from telegram.error import BadRequest
+        text = "\n".join(text for text, _, _ in batch)
+        try:
+            success = await self._send_with_retry(chat_id, text, parse_mode, traces, raise_bad_request=True)
+            return [success] * len(batch)
+        except BadRequest as e:
+            file_logger.log_warning(f"Zusammengefasste Nachricht für Chat {chat_id} abgelehnt ({e}) - sende einzeln")
+
+        results = []
+        for index, (text, _, trace) in enumerate(batch):
+            member_traces = [trace] if trace is not None else []
+            if index > 0:
+                await self._acquire(queue, member_traces)
+            results.append(await self._send_with_retry(chat_id, text, parse_mode, member_traces))
+        return results
+
+    async def _send_with_retry(self, chat_id, text, parse_mode, traces=(), raise_bad_request=False):
+        """Sendet eine Nachricht und folgt RetryAfter-Vorgaben sowie Netzwerkfehlern.
+        Mit raise_bad_request wird ein BadRequest an den Aufrufer weitergereicht."""
+        from telegram.error import BadRequest, RetryAfter, NetworkError, TimedOut
+        cause = 'retries_exhausted'
+        for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+            try:
+                bot = self._get_bot()
+                for trace in traces:
+                    trace.mark('bot_ready')
+                await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                for trace in traces:
+                    trace.mark('telegram_sent')
+                self.messages_sent += 1
+                return True
+            except RetryAfter as e:
+                self.retry_after_count += 1
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                file_logger.log_warning(f"Telegram RetryAfter für Chat {chat_id}: warte {delay} Sekunden")
+                await asyncio.sleep(float(delay) + 0.5)
+            except BadRequest as e:
+                if raise_bad_request:
+                    raise
+                # Fehlerhafte Nachricht - erneutes Senden ist zwecklos
+                file_logger.log_error("Telegram Send", str(e))
+                cause = 'bad_request'
+                break
+            except (TimedOut, NetworkError) as e:
+                file_logger.log_warning(f"Telegram-Netzwerkfehler (Versuch {attempt}/{MAX_SEND_ATTEMPTS}): {e}")
+                await asyncio.sleep(min(2 ** attempt, 30))
+            except Exception as e:
+                file_logger.log_error("Telegram Send", str(e))
+                cause = 'error'
+                break
+
+        self.messages_failed += 1
+        metrics.SEND_FAILURES.inc(target='telegram', cause=cause)
+        return False
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Webhook-Modul für das Meshtastic ↔ Telegram Gateway
+Nimmt Telegram-Updates über einen lokalen aiohttp-Endpunkt entgegen
+(statt Long-Polling) und reicht sie an die Update-Queue der
+Telegram-Application weiter. Jede Anfrage muss das beim setWebhook
+hinterlegte Secret im Header X-Telegram-Bot-Api-Secret-Token mitschicken.
+"""
+
+import hmac
+import secrets
+
+from aiohttp import web
+from telegram import Update
+
+import file_logger
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+MAX_UPDATE_SIZE = 1024 * 1024  # Telegram-Updates sind deutlich kleiner
+
+
+def generate_secret_token():
+    """Erzeugt ein zufälliges Secret (erlaubt sind A-Z, a-z, 0-9, _ und -)"""
+    return secrets.token_urlsafe(32)
+
+
+class TelegramWebhookServer:
+    """Lokaler HTTP-Endpunkt für Telegram-Webhook-Updates"""
+
+    def __init__(self, application, listen='127.0.0.1', port=8443, path='/telegram', secret_token=None):
+        self.application = application
+        self.listen = listen
+        self.port = port
+        self.path = path if path.startswith('/') else f"/{path}"
+        self.secret_token = secret_token or generate_secret_token()
+
+        self.updates_received = 0
+        self.updates_rejected = 0
+
+        self._runner = None
+
+    async def start(self):
+        """Startet den HTTP-Server"""
+        app = web.Application(client_max_size=MAX_UPDATE_SIZE)
+        app.router.add_post(self.path, self.handle_update)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.listen, self.port)
+        await site.start()
+        file_logger.log_info(f"Telegram-Webhook lauscht auf {self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        """Beendet den HTTP-Server"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def register(self, bot, public_url):
+        """Meldet die öffentliche URL (z.B. eines Reverse-Proxys) samt Secret bei Telegram an"""
+        await bot.set_webhook(
+            url=public_url,
+            secret_token=self.secret_token,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=True
+        )
+        file_logger.log_info(f"Telegram-Webhook registriert: {public_url}")
+
+    async def handle_update(self, request):
+        """Prüft das Secret und reicht das Update an die Application weiter"""
+        received_token = request.headers.get(SECRET_HEADER, '')
+        if not hmac.compare_digest(received_token.encode(), self.secret_token.encode()):
+            self.updates_rejected += 1
+            file_logger.log_warning(f"Webhook-Anfrage mit ungültigem Secret von {request.remote} abgewiesen")
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+            update = Update.de_json(data, self.application.bot)
+        except Exception as e:
+            self.updates_rejected += 1
+            file_logger.log_warning(f"Ungültiges Webhook-Update abgewiesen: {e}")
+            return web.Response(status=400)
+
+        if update is None:
+            self.updates_rejected += 1
+            return web.Response(status=400)
+
+        # Sofort bestätigen, die Verarbeitung übernimmt die Application
+        await self.application.update_queue.put(update)
+        self.updates_received += 1
+        return web.Response(status=200)
@@ -7,8 +7,7 @@ Jetzt mit Dashboard-Integration und File-Logging.
 import asyncio
 import sys
 from datetime import datetime
-from collections import deque
-from config import NODE_STATUS_INTERVAL, MAX_RECENT_NODES
+from config import NODE_STATUS_INTERVAL
 import file_logger
 import dashboard
 
@@ -42,9 +41,6 @@ def get_emoji(emoji_char, fallback=""):
     """
     return emoji_char if UNICODE_SUPPORT else fallback
 
-# Node-Tracking für Status-Updates
-recent_nodes = deque(maxlen=MAX_RECENT_NODES)
-
 def get_timestamp():
     """Gibt aktuellen Zeitstempel formatiert zurück"""
     return datetime.now().strftime("%H:%M:%S")
@@ -61,10 +57,6 @@ def log_network_available(host):
     """Zeigt verfügbares Netzwerk an"""
     file_logger.log_info(f"Gerät {host} ist wieder im Netzwerk erreichbar")
 
-def log_waiting_for_device():
-    """Zeigt Warten auf Gerät an"""
-    file_logger.log_debug("Warte auf Gerät-Bereitschaft...")
-
 def log_meshtastic_connecting(host):
     """Zeigt Meshtastic-Verbindungsversuch an"""
     file_logger.log_info(f"Verbinde mit Meshtastic-Node {host}...")
@@ -98,6 +90,10 @@ def log_telegram_polling_started():
     """Zeigt Start des Telegram-Pollings an"""
     file_logger.log_info("Telegram Polling gestartet")
 
+def log_telegram_webhook_started(listen, port, path):
+    """Zeigt Start des Telegram-Webhooks an"""
+    file_logger.log_info(f"Telegram Webhook gestartet auf {listen}:{port}{path}")
+
 def log_telegram_error(error):
     """Zeigt Telegram-Bot-Fehler an"""
     file_logger.log_error("Telegram", str(error))
@@ -161,28 +157,27 @@ def log_unknown_command(sender, command):
 
 def log_packet_debug(packet_info):
     """Zeigt Debug-Informationen für empfangenes Packet an"""
-    file_logger.log_debug(f"Empfangenes Packet: {packet_info}")
+    file_logger.log_debug("Empfangenes Packet: %s", packet_info)
 
 def log_message_filtering(sender, recipient, broadcast, text):
     """Zeigt Nachrichten-Filterung an"""
-    file_logger.log_debug(f"Von: {sender}, An: {recipient}, Broadcast: {broadcast}, Text: '{text}'")
+    file_logger.log_debug("Von: %s, An: %s, Broadcast: %s, Text: '%s'", sender, recipient, broadcast, text)
 
 def log_message_type(message_type):
     """Zeigt Nachrichten-Typ an"""
     file_logger.log_debug(message_type)
 
-def log_node_activity(node_id, node_name):
-    """Registriert Node-Aktivität"""
-    file_logger.log_debug(f"Node-Aktivität: {node_name} (ID: {node_id})")
-    dashboard.update_node_activity(node_id, node_name)
-
-def add_recent_node(node_info):
-    """Fügt Node zu den recent nodes hinzu (für Kompatibilität)"""
-    recent_nodes.append({
-        'id': node_info.get('id', 'Unknown'),
-        'name': node_info.get('name', 'Unknown'),
-        'last_seen': datetime.now()
-    })
+def log_node_activity(node_id, node_name, packet=None):
+    """Registriert Node-Aktivität (mit SNR/RSSI und Hops aus dem Paket, falls vorhanden)"""
+    file_logger.log_debug("Node-Aktivität: %s (ID: %s)", node_name, node_id)
+    snr = rssi = hops = None
+    if packet is not None:
+        snr = packet.get('rxSnr')
+        rssi = packet.get('rxRssi')
+        hop_start = packet.get('hopStart')
+        if hop_start is not None:
+            hops = hop_start - packet.get('hopLimit', 0)
+    dashboard.update_node_activity(node_id, node_name, snr, rssi, hops)
 
 def log_reconnect_attempt(attempt, max_attempts):
     """Zeigt Wiederverbindungsversuch an"""
@@ -239,10 +234,6 @@ def log_telegram_stopping():
     """Zeigt Telegram-Stop an"""
     file_logger.log_info("Telegram-Bot wird gestoppt")
 
-def add_node_to_recent(node_id, node_name):
-    """Fügt Node zu den recent nodes hinzu"""
-    log_node_activity(node_id, node_name)
-
 def log_private_chat_secret_registered(secret, node_name):
     """Zeigt registriertes Secret für private Chats an"""
     file_logger.log_info(f"Private Chat Secret registriert für {node_name}: {secret}")
@@ -267,7 +258,7 @@ async def node_status_loop():
         try:
             await asyncio.sleep(NODE_STATUS_INTERVAL)
             # Dashboard zeigt bereits alle Node-Informationen an
-            file_logger.log_debug(f"Node-Status-Update: {len(recent_nodes)} aktive Nodes")
+            file_logger.log_debug(f"Node-Status-Update: {len(dashboard.dashboard_data.node_activity)} aktive Nodes")
         except asyncio.CancelledError:
             break
         except Exception as e:
@@ -0,0 +1,9 @@
+"""
+Gemeinsame Einstellungen für die Tests: die Module liegen flach im
+Projektverzeichnis und werden direkt importiert.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,101 @@
+"""
+Tests für config: Prüfung der Werte und Neuladen ohne Neustart
+"""
+
+import json
+
+import pytest
+
+import config
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """Eigene Konfigurationsdatei im Temp-Verzeichnis; der globale Stand wird danach wiederhergestellt"""
+    monkeypatch.chdir(tmp_path)  # file_logger legt logs/ im aktuellen Verzeichnis an
+    path = tmp_path / "gateway_config.json"
+    monkeypatch.setattr(config, 'CONFIG_FILE', str(path))
+    monkeypatch.setattr(config, '_subscribers', [])
+    monkeypatch.setattr(config, '_file_state', None)
+    original = config._snapshot
+    yield path
+    config._snapshot = original
+    config._publish_constants(original)
+
+
+def write_config(path, values):
+    path.write_text(json.dumps(values), encoding='utf-8')
+
+
+@pytest.mark.parametrize('key, value', [
+    ('meshtastic_ingress_workers', 0),
+    ('meshtastic_ingress_workers', -1),
+    ('meshtastic_ingress_workers', 2.5),
+    ('meshtastic_ingress_queue_size', 0),
+    ('telegram_private_rate_per_second', 0),
+    ('meshtastic_send_timeout', 0),
+    ('meshtastic_heartbeat_interval', 0),
+    ('meshtastic_network_check_interval', -5),
+])
+def test_rejects_zero_and_negative_values(key, value):
+    values, errors = config.validate_config({key: value})
+    assert len(errors) == 1 and errors[0].startswith(key)
+    assert values[key] == config.DEFAULT_CONFIG[key]
+
+
+def test_zero_allowed_where_it_disables_a_feature():
+    values, errors = config.validate_config({'config_watch_interval': 0, 'telegram_coalesce_window': 0,
+                                             'meshtastic_ingress_workers': 2.0})
+    assert errors == []
+    assert values['meshtastic_ingress_workers'] == 2
+
+
+@pytest.mark.parametrize('key, value', [
+    ('meshtastic_ingress_overflow_policy', 'drop_olest'),
+    ('log_level', 'LOUD'),
+    ('channel_index', 'drei'),
+])
+def test_rejects_unknown_and_mistyped_values(key, value):
+    values, errors = config.validate_config({key: value})
+    assert len(errors) == 1 and errors[0].startswith(key)
+    assert values[key] == config.DEFAULT_CONFIG[key]
+
+
+def test_every_overflow_policy_is_accepted():
+    from ingress_queue import OVERFLOW_POLICIES
+    for policy in OVERFLOW_POLICIES:
+        assert config.validate_config({'meshtastic_ingress_overflow_policy': policy})[1] == []
+
+
+def test_reload_applies_valid_config(config_file):
+    write_config(config_file, {'channel_index': 3})
+    seen = []
+    config.subscribe(lambda snapshot, keys: seen.append((snapshot.channel_index, keys)), ('channel_index',))
+
+    assert config.reload_config() == {'channel_index'}
+    assert config.current().channel_index == 3
+    assert config.CHANNEL_INDEX == 3
+    assert seen == [(3, {'channel_index'})]
+
+
+def test_failed_reload_keeps_previous_snapshot(config_file):
+    write_config(config_file, {'channel_index': 3})
+    config.reload_config()
+    before = config.current()
+    seen = []
+    config.subscribe(lambda snapshot, keys: seen.append(keys))
+
+    # Ein gültiger und ein ungültiger Wert: die ganze Datei wird verworfen
+    write_config(config_file, {'channel_index': 5, 'meshtastic_send_timeout': 0})
+    assert config.reload_config() == set()
+    assert config.current() is before
+    assert config.CHANNEL_INDEX == 3
+    assert seen == []
+
+    write_config(config_file, {'channel_index': 5, 'meshtastic_ingress_overflow_policy': 'drop_olest'})
+    assert config.reload_config() == set()
+    assert config.current() is before
+
+    config_file.write_text("{kein json", encoding='utf-8')
+    assert config.reload_config() == set()
+    assert config.current() is before
@@ -0,0 +1,118 @@
+"""
+Tests für mesh_framing: Zerlegen in nummerierte Teile und Zusammensetzen
+"""
+
+from mesh_framing import (ELLIPSIS, MISSING_PART, MultipartAssembler, byte_length,
+                          frame_text, parse_part, part_header)
+
+LONG_TEXT = " ".join(f"Wort{i}" for i in range(60))  # ca. 400 Bytes, passt in 8 Teile
+
+
+def test_short_message_stays_single_packet():
+    assert frame_text("Hallo Mesh", max_bytes=200) == ["Hallo Mesh"]
+
+
+def test_parts_are_numbered_and_fit_payload():
+    parts = frame_text(LONG_TEXT, max_bytes=100, compact=False)
+    total = len(parts)
+    assert total > 1
+    for index, part in enumerate(parts, 1):
+        assert part.startswith(part_header(index, total))
+        assert byte_length(part) <= 100
+        assert parse_part(part) == (index, total, part[len(part_header(index, total)):])
+
+
+def test_parts_reassemble_to_original():
+    parts = frame_text(LONG_TEXT, max_bytes=100, compact=False)
+    assembler = MultipartAssembler()
+    results = [assembler.add('node', part, now=0) for part in parts]
+    assert results[:-1] == [None] * (len(parts) - 1)
+    assert results[-1] == LONG_TEXT
+    assert len(assembler) == 0
+    assert assembler.completed == 1
+
+
+def test_multibyte_characters_are_not_split():
+    text = "Grüße aus dem Mesh 🚀 " * 30
+    parts = frame_text(text, max_bytes=64, max_parts=30, compact=False)
+    assert all(byte_length(part) <= 64 for part in parts)
+    joined = "".join(parse_part(part, max_parts=30)[2] for part in parts)
+    assert joined == text
+
+
+def test_too_many_parts_are_truncated():
+    parts = frame_text(LONG_TEXT * 5, max_bytes=64, max_parts=3, compact=False)
+    assert len(parts) == 3
+    assert parts[0].startswith("[1/3] ")
+    assert parts[-1].endswith(ELLIPSIS)
+
+
+def test_parse_part_rejects_invalid_headers():
+    assert parse_part("[0/3] Text") is None
+    assert parse_part("[4/3] Text") is None
+    assert parse_part("[1/1] Text") is None
+    assert parse_part("[1/9] Text", max_parts=8) is None
+    assert parse_part("Kein Kopf") is None
+
+
+def test_plain_text_passes_through_assembler():
+    assembler = MultipartAssembler()
+    assert assembler.add('node', "Hallo") == "Hallo"
+    assert len(assembler) == 0
+
+
+def test_out_of_order_parts_are_reassembled():
+    assembler = MultipartAssembler()
+    assert assembler.add('node', "[3/3] drei", now=0) is None
+    assert assembler.add('node', "[1/3] eins ", now=1) is None
+    assert assembler.add('node', "[2/3] zwei ", now=2) == "eins zwei drei"
+
+
+def test_senders_are_assembled_separately():
+    assembler = MultipartAssembler()
+    assert assembler.add('a', "[1/2] A1 ", now=0) is None
+    assert assembler.add('b', "[1/2] B1 ", now=0) is None
+    assert assembler.add('b', "[2/2] B2", now=1) == "B1 B2"
+    assert assembler.add('a', "[2/2] A2", now=1) == "A1 A2"
+
+
+def test_missing_part_is_marked_after_timeout():
+    assembler = MultipartAssembler(timeout=10)
+    packet = {'from': 1}
+    assert assembler.add('node', "[1/3] eins ", packet, now=0) is None
+    assert assembler.add('node', "[3/3] drei", packet, now=1) is None
+    assert assembler.take_expired(now=5) == []
+
+    released = assembler.take_expired(now=10)
+    assert released == [(packet, f"eins {MISSING_PART}drei")]
+    assert assembler.incomplete == 1
+    assert len(assembler) == 0
+
+
+def test_new_message_releases_incomplete_one():
+    assembler = MultipartAssembler()
+    assert assembler.add('node', "[1/2] alt ", now=0) is None
+    # Gleicher Index erneut: eine neue Nachricht beginnt
+    assert assembler.add('node', "[1/2] neu ", now=1) is None
+    assert assembler.take_expired(now=1) == [(None, f"alt {MISSING_PART}".strip())]
+    assert assembler.add('node', "[2/2] Ende", now=2) == "neu Ende"
+
+
+def test_pending_limit_releases_oldest_sender():
+    assembler = MultipartAssembler(max_pending=2)
+    assembler.add('a', "[1/2] a ", now=0)
+    assembler.add('b', "[1/2] b ", now=0)
+    assembler.add('c', "[1/2] c ", now=0)
+    assert len(assembler) == 2
+    assert [text for _, text in assembler.take_expired(now=0)] == [f"a {MISSING_PART}".strip()]
+
+
+def test_opened_counts_messages_not_parts():
+    assembler = MultipartAssembler(timeout=10)
+    assembler.add('a', "[1/3] eins ", now=0)
+    assembler.add('a', "[2/3] zwei ", now=1)
+    assembler.add('b', "[1/2] B1 ", now=1)
+    assert assembler.opened == 2
+    assembler.add('a', "[1/3] neu ", now=2)
+    assert assembler.opened == 3
+    assert assembler.take_expired(now=5) == [(None, f"eins zwei {MISSING_PART}".strip())]
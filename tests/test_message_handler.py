@@ -0,0 +1,118 @@
+"""
+Tests für message_handler: Freigabe unvollständiger mehrteiliger Nachrichten nach Ablauf der Wartezeit
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('pubsub')
+pytest.importorskip('telegram')
+pytest.importorskip('meshtastic')
+
+import message_handler
+import tracing
+from mesh_framing import MISSING_PART, MultipartAssembler
+from tracing import TRACE_MESH_TO_TELEGRAM
+
+BROADCAST = 4294967295
+TIMEOUT = 0.05
+
+
+class Recorder:
+    """Zeichnet Aufrufe auf"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, *args):
+        self.calls.append(args)
+
+
+class FakeNodeNames:
+    def __init__(self):
+        self.heard_calls = []
+
+    def resolve(self, node_id, interface=None):
+        return f"Node {node_id}"
+
+    def heard(self, node_id, packet=None):
+        self.heard_calls.append(node_id)
+
+
+class FakeTelegramSender:
+    def __init__(self):
+        self.messages = []
+
+    def submit(self, chat_id, text, parse_mode=None, trace=None):
+        self.messages.append(text)
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(True)
+        return delivery
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setattr(message_handler, 'multipart_assembler', MultipartAssembler(timeout=TIMEOUT))
+    monkeypatch.setattr(message_handler, 'MESHTASTIC_MULTIPART_TIMEOUT', TIMEOUT)
+    monkeypatch.setattr(message_handler, 'CHANNEL_INDEX', 0)
+    monkeypatch.setattr(message_handler, 'TELEGRAM_CHAT_ID', '-100')
+    monkeypatch.setattr(message_handler, 'node_names', FakeNodeNames())
+    monkeypatch.setattr(message_handler, 'telegram_sender', FakeTelegramSender())
+    monkeypatch.setattr(message_handler, 'log_node_activity', Recorder())
+    monkeypatch.setattr(message_handler, 'log_packet_debug', Recorder())
+    monkeypatch.setattr(message_handler, 'log_message_filtering', Recorder())
+    monkeypatch.setattr(message_handler, 'log_message_meshtastic_to_telegram', Recorder())
+    monkeypatch.setattr(message_handler.ingress_queue, 'put', Recorder())
+
+    release = Recorder()
+    original_release = message_handler._release_expired_multipart
+
+    def counting_release(*args):
+        release(*args)
+        original_release(*args)
+
+    monkeypatch.setattr(message_handler, '_release_expired_multipart', counting_release)
+    return message_handler, release
+
+
+def text_packet(text):
+    return {'from': 7, 'to': BROADCAST, 'channel': 0, 'decoded': {'text': text}}
+
+
+def test_incomplete_message_is_released_once_through_ingress_queue(handler):
+    handler, release = handler
+    first_trace = tracing.start_trace(TRACE_MESH_TO_TELEGRAM, node=7)
+
+    async def scenario():
+        await handler.handle_text(text_packet("[1/3] eins "), None, 0, first_trace)
+        await handler.handle_text(text_packet("[3/3] drei"), None, 0)
+        await asyncio.sleep(TIMEOUT * 3)
+
+    asyncio.run(scenario())
+
+    # Ein Timer für die Nachricht, nicht einer pro Teil
+    assert len(release.calls) == 1
+    (node_id, is_broadcast, packet, interface, channel, trace, released), = handler.ingress_queue.put.calls
+    assert (node_id, is_broadcast, released) == (7, True, True)
+    assert packet['decoded']['text'] == f"eins {MISSING_PART}drei"
+    # Neue Ablaufverfolgung, Laufzeit ab dem ersten Teil
+    assert trace is not first_trace and trace.start == first_trace.start
+    assert handler.telegram_sender.messages == []
+
+
+def test_released_message_is_forwarded_without_recounting_activity(handler):
+    handler, _ = handler
+
+    async def scenario():
+        await handler.handle_text(text_packet("[1/2] eins "), None, 0)
+        await asyncio.sleep(TIMEOUT * 3)
+        args = handler.ingress_queue.put.calls[0][2:]
+        await handler.handle_text(*args)
+
+    asyncio.run(scenario())
+
+    assert handler.node_names.heard_calls == [7]
+    assert len(handler.log_node_activity.calls) == 1
+    assert handler.telegram_sender.messages == [f"<b>Node 7</b>: eins {MISSING_PART}".strip()]
+    assert len(handler.multipart_assembler) == 0
@@ -0,0 +1,117 @@
+"""
+Tests für node_activity: Zähl-Eimer (aktivste Nodes), Aktualität und LRU-Obergrenze
+"""
+
+import random
+
+from node_activity import NodeActivityTable
+
+
+def bucket_counts(table):
+    """Nachrichtenzahlen der Eimer von unten nach oben (prüft dabei die Verkettung)"""
+    counts = []
+    bucket, previous = table._lowest, None
+    while bucket is not None:
+        assert bucket.prev is previous
+        assert bucket.nodes, "leere Eimer müssen entfernt werden"
+        counts.append(bucket.count)
+        previous, bucket = bucket, bucket.next
+    assert table._highest is previous
+    return counts
+
+
+def test_update_records_signal_data():
+    table = NodeActivityTable()
+    table.update(1, "Alpha", snr=5.5, rssi=-90, hops=2, now=100)
+    entry = table.update(1, "Alpha neu", now=110)
+    assert entry.count == 2
+    assert entry.name == "Alpha neu"
+    assert (entry.first_seen, entry.last_seen) == (100, 110)
+    # Fehlende Werte überschreiben die zuletzt bekannten nicht
+    assert (entry.snr, entry.rssi, entry.hops) == (5.5, -90, 2)
+
+
+def test_bucket_promotion():
+    table = NodeActivityTable()
+    table.update(1, "A", now=0)
+    table.update(2, "B", now=1)
+    assert bucket_counts(table) == [1]
+
+    table.update(1, "A", now=2)
+    assert bucket_counts(table) == [1, 2]
+
+    # B folgt A in den Eimer 2, Eimer 1 wird leer und entfernt
+    table.update(2, "B", now=3)
+    assert bucket_counts(table) == [2]
+
+    table.update(2, "B", now=4)
+    table.update(3, "C", now=5)
+    assert bucket_counts(table) == [1, 2, 3]
+    assert [entry.node_id for entry in table.busiest(3)] == [2, 1, 3]
+
+
+def test_busiest_prefers_recent_on_tie():
+    table = NodeActivityTable()
+    for node_id in (1, 2, 3):
+        table.update(node_id, str(node_id), now=node_id)
+    table.update(1, "1", now=10)
+    table.update(3, "3", now=11)
+    assert [entry.node_id for entry in table.busiest(2)] == [3, 1]
+    assert [entry.node_id for entry in table.busiest(10)] == [3, 1, 2]
+
+
+def test_recent_order():
+    table = NodeActivityTable()
+    for node_id in (1, 2, 3):
+        table.update(node_id, str(node_id), now=node_id)
+    table.update(1, "1", now=4)
+    assert [entry.node_id for entry in table.recent(2)] == [1, 3]
+    assert [entry.node_id for entry in table.recent(10)] == [1, 3, 2]
+
+
+def test_eviction_removes_least_recently_seen():
+    table = NodeActivityTable(max_nodes=3)
+    for node_id in (1, 2, 3):
+        table.update(node_id, str(node_id), now=node_id)
+    # Node 1 wird wieder gesehen; danach ist Node 2 am längsten nicht gesehen worden
+    table.update(1, "1", now=4)
+    table.update(1, "1", now=5)
+    table.update(4, "4", now=6)
+
+    assert len(table) == 3
+    assert 2 not in table
+    assert table.evicted == 1
+    assert [entry.node_id for entry in table.recent(3)] == [4, 1, 3]
+    assert bucket_counts(table) == [1, 3]
+
+
+def test_remove_detaches_from_bucket():
+    table = NodeActivityTable()
+    table.update(1, "A", now=0)
+    table.update(1, "A", now=1)
+    table.update(2, "B", now=2)
+    assert table.remove(1).count == 2
+    assert table.remove(1) is None
+    assert bucket_counts(table) == [1]
+    assert [entry.node_id for entry in table.busiest(5)] == [2]
+
+
+def test_matches_brute_force():
+    rng = random.Random(42)
+    table = NodeActivityTable(max_nodes=50)
+    counts, last_seen = {}, {}
+    for now in range(5000):
+        node_id = rng.randrange(80)
+        if node_id not in counts and len(counts) >= 50:
+            oldest = min(last_seen, key=last_seen.get)
+            del counts[oldest], last_seen[oldest]
+        counts[node_id] = counts.get(node_id, 0) + 1
+        last_seen[node_id] = now
+        table.update(node_id, str(node_id), now=now)
+
+    expected_busiest = sorted(counts, key=lambda n: (counts[n], last_seen[n]), reverse=True)[:10]
+    expected_recent = sorted(last_seen, key=last_seen.get, reverse=True)[:10]
+    assert [entry.node_id for entry in table.busiest(10)] == expected_busiest
+    assert [entry.node_id for entry in table.recent(10)] == expected_recent
+    assert {entry.node_id: entry.count for entry in table.recent(50)} == counts
+    bucket_counts(table)
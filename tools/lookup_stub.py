@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Lokaler Ersatz-Server für die CoinGecko-API
+Beantwortet /api/v3/simple/price wie CoinGecko, zählt die Anfragen und kann
+Verzögerungen und Ausfälle simulieren. Damit lassen sich Cache, Bündelung
+gleichzeitiger Anfragen und der Rückfall auf den letzten Wert ohne Internet
+prüfen (btc_price_url in gateway_config.json auf den Stub zeigen lassen).
+
+Aufruf:
+    python tools/lookup_stub.py --port 8089 [--delay 0.5] [--fail]
+    python tools/lookup_stub.py --self-test      # Prüft http_lookup.LookupClient gegen den Stub
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+from http_lookup import LookupClient, LookupFailed
+
+PRICE_PATH = '/api/v3/simple/price'
+
+
+class StubServer:
+    """CoinGecko-Ersatz mit Anfragezähler, Verzögerung und Ausfall-Schalter"""
+
+    def __init__(self, listen='127.0.0.1', port=8089, delay=0.0, fail=False):
+        self.listen = listen
+        self.port = port
+        self.delay = delay
+        self.fail = fail
+        self.requests = 0
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.listen}:{self.port}{PRICE_PATH}?ids=bitcoin&vs_currencies=usd"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get(PRICE_PATH, self.handle_price)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.listen, self.port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_price(self, request):
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            return web.json_response({'status': {'error_message': 'stub down'}}, status=503)
+        return web.json_response({'bitcoin': {'usd': round(random.uniform(60000, 70000), 2)}})
+
+
+async def self_test(port):
+    """Prüft Bündelung, Cache und Rückfall auf den letzten Wert"""
+    stub = StubServer(port=port, delay=0.3)
+    client = LookupClient(timeout=2, cache_ttl=60, stale_max_age=3600)
+    await stub.start()
+    ok = True
+    try:
+        results = await asyncio.gather(*(client.get_json(stub.url) for _ in range(10)))
+        same = len({id(r) for r in results}) == 1
+        print(f"10 gleichzeitige Abfragen: {stub.requests} Anfrage(n) an den Server, gemeinsames Ergebnis: {same}")
+        ok &= stub.requests == 1 and same
+
+        await client.get_json(stub.url)
+        print(f"Abfrage innerhalb der Ablaufzeit: {stub.requests} Anfrage(n) insgesamt (Cache-Treffer: {client.cache_hits})")
+        ok &= stub.requests == 1
+
+        stub.fail = True
+        result = await client.get_json(stub.url, ttl=0)
+        print(f"Server-Ausfall: letzter Wert geliefert = {result.stale} ({result.data['bitcoin']['usd']} USD)")
+        ok &= result.stale
+
+        client.stale_max_age = 0
+        try:
+            await client.get_json(stub.url, ttl=0)
+            print("Server-Ausfall ohne gültigen Wert: kein Fehler ❌")
+            ok = False
+        except LookupFailed as e:
+            print(f"Server-Ausfall ohne gültigen Wert: {e}")
+    finally:
+        await client.close()
+        await stub.stop()
+
+    print(f"Statistik: {client.stats()}")
+    print("✅ Self-Test bestanden" if ok else "❌ Self-Test fehlgeschlagen")
+    return 0 if ok else 1
+
+
+async def serve(args):
+    stub = StubServer(args.listen, args.port, args.delay, args.fail)
+    await stub.start()
+    print(f"Stub lauscht: {stub.url}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"Anfragen bisher: {stub.requests}")
+    finally:
+        await stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CoinGecko-Ersatz für !btc-Tests")
+    parser.add_argument('--listen', default='127.0.0.1', help="Adresse")
+    parser.add_argument('--port', type=int, default=8089, help="Port")
+    parser.add_argument('--delay', type=float, default=0.0, help="Antwortverzögerung in Sekunden")
+    parser.add_argument('--fail', action='store_true', help="Alle Anfragen mit 503 beantworten")
+    parser.add_argument('--self-test', action='store_true', help="LookupClient gegen den Stub prüfen")
+    args = parser.parse_args()
+
+    if args.self_test:
+        return asyncio.run(self_test(args.port))
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
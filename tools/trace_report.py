@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Auswertung der Nachrichten-Traces
+Liest die JSONL-Dateien des Tracings (inklusive rotierter Dateien) und gibt
+je Richtung die Perzentile der Gesamtdauer und jeder Station aus. Die Dauer
+einer Station ist die Zeit seit der vorherigen Station desselben Traces.
+
+Aufruf:
+    python tools/trace_report.py                       # logs/traces.jsonl*
+    python tools/trace_report.py --kind mesh_to_telegram --status ok
+    python tools/trace_report.py --since 3600 alte_traces.jsonl
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+
+DEFAULT_PATTERN = os.path.join('logs', 'traces.jsonl*')
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(ordered, p):
+    """Perzentil einer sortierten Liste (nächster Rang)"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def load_traces(paths, kind=None, status=None, since=None):
+    """Liest Traces und filtert nach Richtung, Status und Alter"""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    trace = json.loads(line)
+                except ValueError:
+                    continue  # Abgeschnittene Zeile
+                if kind and trace.get('kind') != kind:
+                    continue
+                if status and trace.get('status') != status:
+                    continue
+                if since and trace.get('ts', 0) < since:
+                    continue
+                yield trace
+
+
+def summarize(traces):
+    """Sammelt Gesamt- und Stationsdauern je Richtung"""
+    totals = defaultdict(list)
+    stages = defaultdict(lambda: defaultdict(list))
+    stage_order = defaultdict(dict)
+    statuses = defaultdict(lambda: defaultdict(int))
+
+    for trace in traces:
+        kind = trace.get('kind', '?')
+        statuses[kind][trace.get('status', '?')] += 1
+        totals[kind].append(trace.get('total_ms', 0.0))
+        previous = 0.0
+        for position, (stage, offset) in enumerate(trace.get('stages', [])):
+            stages[kind][stage].append(offset - previous)
+            stage_order[kind].setdefault(stage, position)
+            previous = offset
+
+    return totals, stages, stage_order, statuses
+
+
+def print_report(totals, stages, stage_order, statuses):
+    header = f"{'Station':<30}{'Anzahl':>8}" + ''.join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'max':>10}"
+    for kind in sorted(totals):
+        status_text = ', '.join(f"{name}={count}" for name, count in sorted(statuses[kind].items()))
+        print(f"\n=== {kind} ({len(totals[kind])} Traces: {status_text}) — Angaben in ms ===")
+        print(header)
+        print('-' * len(header))
+        ordered_stages = sorted(stages[kind], key=lambda stage: stage_order[kind][stage])
+        for stage in ordered_stages:
+            print_row(stage, stages[kind][stage])
+        print('-' * len(header))
+        print_row('gesamt', totals[kind])
+
+
+def print_row(name, values):
+    ordered = sorted(values)
+    cells = ''.join(f"{percentile(ordered, p):>10.2f}" for p in PERCENTILES)
+    print(f"{name:<30}{len(ordered):>8}{cells}{ordered[-1] if ordered else 0.0:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perzentile je Station aus den Nachrichten-Traces")
+    parser.add_argument('files', nargs='*', help=f"Trace-Dateien (Standard: {DEFAULT_PATTERN})")
+    parser.add_argument('--kind', choices=('mesh_to_telegram', 'telegram_to_mesh'), help="Nur eine Richtung")
+    parser.add_argument('--status', help="Nur Traces mit diesem Status (z.B. ok)")
+    parser.add_argument('--since', type=float, help="Nur Traces der letzten N Sekunden")
+    args = parser.parse_args()
+
+    paths = args.files or sorted(glob.glob(DEFAULT_PATTERN))
+    if not paths:
+        print("❌ Keine Trace-Dateien gefunden (trace_enabled in der Konfiguration aktivieren)")
+        return 1
+
+    since = time.time() - args.since if args.since else None
+    totals, stages, stage_order, statuses = summarize(load_traces(paths, args.kind, args.status, since))
+    if not totals:
+        print("Keine passenden Traces gefunden")
+        return 1
+
+    print_report(totals, stages, stage_order, statuses)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
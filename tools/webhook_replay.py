@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test-Harness für den Telegram-Webhook
+Schickt aufgezeichnete Telegram-Updates (eine JSON-Zeile pro Update) an den
+lokalen Webhook-Endpunkt und misst Antwortstatus und Latenz. Zusätzlich wird
+geprüft, dass Anfragen mit falschem Secret abgewiesen werden.
+
+Aufruf:
+    python tools/webhook_replay.py                     # an das laufende Gateway
+    python tools/webhook_replay.py --self-test         # eigenen Webhook-Server starten
+    python tools/webhook_replay.py --file meine.jsonl --repeat 10 --group-chat-id -100123
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+
+from config import (TELEGRAM_CHAT_ID, TELEGRAM_WEBHOOK_LISTEN, TELEGRAM_WEBHOOK_PORT,
+                    TELEGRAM_WEBHOOK_PATH, TELEGRAM_WEBHOOK_SECRET)
+from telegram_webhook import SECRET_HEADER
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'webhook_updates.jsonl')
+
+
+def load_updates(path, group_chat_id=None):
+    """Liest aufgezeichnete Updates; Gruppen-Chat-IDs werden optional ersetzt"""
+    updates = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            update = json.loads(line)
+            chat = update.get('message', {}).get('chat', {})
+            if group_chat_id is not None and chat.get('type') in ('group', 'supergroup'):
+                chat['id'] = group_chat_id
+            updates.append(update)
+    return updates
+
+
+async def post_update(session, url, secret, update):
+    """Sendet ein Update und gibt (Status, Latenz in ms) zurück"""
+    start = time.perf_counter()
+    async with session.post(url, json=update, headers={SECRET_HEADER: secret}) as response:
+        await response.read()
+        return response.status, (time.perf_counter() - start) * 1000
+
+
+async def replay(url, secret, updates, repeat):
+    """Spielt die Updates nacheinander ab und prüft die Secret-Abweisung"""
+    statuses = {}
+    latencies = []
+    update_id = max(u['update_id'] for u in updates)
+
+    async with aiohttp.ClientSession() as session:
+        status, _ = await post_update(session, url, secret + 'x', updates[0])
+        wrong_secret_rejected = status == 403
+
+        for _ in range(repeat):
+            for update in updates:
+                # Jede Wiederholung bekommt eine neue update_id
+                update_id += 1
+                status, latency = await post_update(session, url, secret, dict(update, update_id=update_id))
+                statuses[status] = statuses.get(status, 0) + 1
+                latencies.append(latency)
+
+    return statuses, latencies, wrong_secret_rejected
+
+
+async def run_self_test(args, updates):
+    """Startet einen eigenen Webhook-Server und prüft, dass alle Updates in der Update-Queue landen"""
+    from telegram.ext import Application
+    from telegram_webhook import TelegramWebhookServer
+
+    # Die Application wird nicht initialisiert: es findet kein Kontakt zu Telegram statt
+    application = Application.builder().token('123456:SELFTEST').updater(None).build()
+    server = TelegramWebhookServer(application, listen='127.0.0.1', port=args.port,
+                                   path=args.path, secret_token=args.secret or None)
+    await server.start()
+    try:
+        url = f"http://127.0.0.1:{args.port}{server.path}"
+        result = await replay(url, server.secret_token, updates, args.repeat)
+    finally:
+        await server.stop()
+    return result, application.update_queue.qsize()
+
+
+def print_report(statuses, latencies, wrong_secret_rejected):
+    print(f"Gesendet:          {len(latencies)} Updates")
+    print(f"Statuscodes:       {dict(sorted(statuses.items()))}")
+    if latencies:
+        ordered = sorted(latencies)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"Latenz p50/p99:    {statistics.median(ordered):.2f} / {p99:.2f} ms")
+    print(f"Falsches Secret:   {'abgewiesen (403)' if wrong_secret_rejected else 'NICHT abgewiesen'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aufgezeichnete Telegram-Updates an den Webhook senden")
+    parser.add_argument('--file', default=DEFAULT_FILE, help="JSONL-Datei mit aufgezeichneten Updates")
+    parser.add_argument('--url', default=None, help="Webhook-URL (Standard aus der Konfiguration)")
+    parser.add_argument('--secret', default=TELEGRAM_WEBHOOK_SECRET, help="Secret-Token (Standard aus der Konfiguration)")
+    parser.add_argument('--port', type=int, default=TELEGRAM_WEBHOOK_PORT)
+    parser.add_argument('--path', default=TELEGRAM_WEBHOOK_PATH)
+    parser.add_argument('--repeat', type=int, default=1, help="Anzahl Durchläufe")
+    parser.add_argument('--group-chat-id', type=int, default=None,
+                        help="Gruppen-Chat-ID in den Updates ersetzen (Standard: telegram_chat_id)")
+    parser.add_argument('--self-test', action='store_true', help="Eigenen Webhook-Server starten statt das Gateway anzusprechen")
+    args = parser.parse_args()
+
+    group_chat_id = args.group_chat_id
+    if group_chat_id is None and str(TELEGRAM_CHAT_ID).lstrip('-').isdigit():
+        group_chat_id = int(TELEGRAM_CHAT_ID)
+    updates = load_updates(args.file, group_chat_id)
+    if not updates:
+        print("❌ Keine Updates in der Datei gefunden")
+        return 1
+
+    if args.self_test:
+        (statuses, latencies, rejected), queued = asyncio.run(run_self_test(args, updates))
+        print_report(statuses, latencies, rejected)
+        print(f"In Update-Queue:   {queued}")
+        ok = rejected and statuses.get(200) == len(latencies) == queued
+    else:
+        if not args.secret:
+            print("❌ Kein Secret angegeben (telegram_webhook_secret in der Konfiguration oder --secret)")
+            return 1
+        url = args.url or f"http://{TELEGRAM_WEBHOOK_LISTEN}:{args.port}{args.path}"
+        statuses, latencies, rejected = asyncio.run(replay(url, args.secret, updates, args.repeat))
+        print_report(statuses, latencies, rejected)
+        ok = rejected and statuses.get(200) == len(latencies)
+
+    print("✅ Webhook-Test erfolgreich" if ok else "❌ Webhook-Test fehlgeschlagen")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tracing-Modul für das Meshtastic ↔ Telegram Gateway
+Jede weitergeleitete Nachricht bekommt eine Trace-ID und sammelt an jeder
+Station der Pipeline einen monotonen Zeitstempel. Abgeschlossene Traces
+werden (optional nur eine Stichprobe) als JSON-Zeile in eine rotierende
+Datei geschrieben; die Aufbereitung und das Schreiben übernimmt wie beim
+File-Logging ein Hintergrund-Thread.
+
+Auswertung: python tools/trace_report.py [logs/traces.jsonl]
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import time
+import uuid
+from logging.handlers import RotatingFileHandler, QueueListener
+
+from file_logger import DeferredQueueHandler
+
+TRACE_MESH_TO_TELEGRAM = 'mesh_to_telegram'
+TRACE_TELEGRAM_TO_MESH = 'telegram_to_mesh'
+
+_exit_flush_registered = False  # atexit-Handler nur einmal eintragen, auch wenn configure mehrfach läuft
+
+
+class Trace:
+    """Zeitstempel einer Nachricht auf ihrem Weg durch das Gateway"""
+    __slots__ = ('trace_id', 'kind', 'start', 'wall_start', 'sampled', 'stages', 'attrs', 'finished')
+
+    def __init__(self, kind, start=None, sampled=False, **attrs):
+        self.trace_id = uuid.uuid4().hex[:16] if sampled else None
+        self.kind = kind
+        self.start = time.monotonic() if start is None else start
+        self.wall_start = time.time() - (time.monotonic() - self.start)
+        self.sampled = sampled
+        self.stages = []
+        self.attrs = attrs
+        self.finished = False
+
+    def mark(self, stage):
+        """Hält den Zeitpunkt einer Station fest (auch aus anderen Threads aufrufbar)"""
+        if self.sampled:
+            self.stages.append((stage, time.monotonic()))
+
+    def elapsed(self):
+        """Sekunden seit Beginn des Traces"""
+        return time.monotonic() - self.start
+
+    def finish(self, status='ok'):
+        """Schließt den Trace ab und übergibt ihn an den Writer"""
+        if not self.sampled or self.finished:
+            return
+        self.finished = True
+        self.mark('done')
+        _tracer.write(self, status)
+
+    def to_record(self, status):
+        return {
+            'trace_id': self.trace_id,
+            'kind': self.kind,
+            'status': status,
+            'ts': round(self.wall_start, 3),
+            'total_ms': round((self.stages[-1][1] - self.start) * 1000, 3) if self.stages else 0.0,
+            'stages': [[stage, round((t - self.start) * 1000, 3)] for stage, t in self.stages],
+            **self.attrs,
+        }
+
+
+class _JsonFormatter(logging.Formatter):
+    """Formatiert Trace-Records erst im Writer-Thread als JSON-Zeile"""
+
+    def format(self, record):
+        trace, status = record.msg
+        return json.dumps(trace.to_record(status), ensure_ascii=False, separators=(',', ':'))
+
+
+class Tracer:
+    """Entscheidet über die Stichprobe und schreibt abgeschlossene Traces"""
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.traces_written = 0
+        self._logger = None
+        self._listener = None
+
+    def configure(self, enabled, path='logs/traces.jsonl', sample_rate=1.0, max_bytes=10 * 1024 * 1024, backup_count=5):
+        """Aktiviert das Tracing; die Datei wird erst hier angelegt"""
+        self.stop()
+        self.enabled = bool(enabled)
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        if not self.enabled:
+            return
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(_JsonFormatter())
+
+        trace_queue = queue.SimpleQueue()
+        self._listener = QueueListener(trace_queue, handler)
+        self._listener.start()
+        global _exit_flush_registered
+        if not _exit_flush_registered:
+            atexit.register(self.stop)
+            _exit_flush_registered = True
+
+        self._logger = logging.getLogger('gateway.trace')
+        self._logger.setLevel(logging.INFO)
+        self._logger.handlers = [DeferredQueueHandler(trace_queue)]
+        self._logger.propagate = False
+
+    def start_trace(self, kind, start=None, **attrs):
+        """Beginnt einen Trace; nicht ausgewählte Traces kosten nur das Objekt"""
+        sampled = self.enabled and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+        return Trace(kind, start, sampled, **attrs)
+
+    def write(self, trace, status):
+        if self._logger is not None:
+            self._logger.info((trace, status))
+            self.traces_written += 1
+
+    def stop(self):
+        """Schreibt ausstehende Traces und beendet den Writer-Thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        self._logger = None
+
+
+_tracer = Tracer()
+configure = _tracer.configure
+start_trace = _tracer.start_trace